@@ -0,0 +1,255 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import main
+from flight_archive import attach_archive, find_archive_periods, qualify_archive_tables
+from summary_tables import PILOT_ASSIGNMENT_INTERVAL_QUERY
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Number of FlightId ranges per worker process: more ranges than workers, so that a worker that finishes early takes another one.
+PARTITIONS_PER_WORKER = 4
+
+# Each report is computed per FlightId range (the two ? of the range are the first and last FlightId), and the partial
+# results of the ranges are merged. The first columns are the group key and the others are aggregates that can be merged
+# across ranges (see ANALYTICS_REPORTS). Cancelled flights are not flown, so they only count in the route punctuality.
+# The archived flights are scanned with the same queries on each archive (see build_archive_query()), one range per month.
+AIRCRAFT_UTILISATION_QUERY = """
+    SELECT AircraftId, COUNT(*), SUM(DestinationArrivalMinute - DepartureMinute), MIN(DepartureMinute), MAX(DestinationArrivalMinute)
+    FROM Flight
+    WHERE FlightId BETWEEN ? AND ? AND FlightStatus <> 'CANCELLED'
+    GROUP BY AircraftId;
+"""
+
+# PilotAssignmentInterval holds the times and status of every assignment, keyed on (FlightId, PilotId), so no join is needed.
+PILOT_HOURS_QUERY = """
+    SELECT PilotId, strftime('%Y-%m', DepartureMinute * 60, 'unixepoch') AS Month, COUNT(*), SUM(DestinationArrivalMinute - DepartureMinute)
+    FROM PilotAssignmentInterval
+    WHERE FlightId BETWEEN ? AND ? AND FlightStatus <> 'CANCELLED'
+    GROUP BY PilotId, Month;
+"""
+
+ROUTE_PUNCTUALITY_QUERY = """
+    SELECT DepartureAirportId, DestinationAirportId, COUNT(*), SUM(FlightStatus = 'DELAYED'), SUM(FlightStatus = 'CANCELLED')
+    FROM Flight
+    WHERE FlightId BETWEEN ? AND ?
+    GROUP BY DepartureAirportId, DestinationAirportId;
+"""
+
+# Departures and arrivals of each airport per hour of the day (the times are local airport times).
+AIRPORT_HOURS_QUERY = """
+    SELECT AirportId, Hour, SUM(Departures), SUM(Arrivals)
+    FROM (
+        SELECT DepartureAirportId AS AirportId, DepartureMinute / 60 % 24 AS Hour, 1 AS Departures, 0 AS Arrivals
+        FROM Flight
+        WHERE FlightId BETWEEN ? AND ? AND FlightStatus <> 'CANCELLED'
+        UNION ALL
+        SELECT DestinationAirportId, DestinationArrivalMinute / 60 % 24, 0, 1
+        FROM Flight
+        WHERE FlightId BETWEEN ? AND ? AND FlightStatus <> 'CANCELLED'
+    )
+    GROUP BY AirportId, Hour;
+"""
+
+# Labels of the ids in the merged results (read once, in the main process).
+AIRCRAFT_LABELS_QUERY = "SELECT AircraftId, Model, PassengerCapacity FROM Aircraft;"
+AIRPORT_LABELS_QUERY = "SELECT DestinationId, AirportCode FROM Destination;"
+PILOT_LABELS_QUERY = "SELECT PilotId, LicenseNumber FROM Pilot;"
+
+# For each report: its query, the number of key columns and how each aggregate column is merged across the FlightId ranges.
+ANALYTICS_REPORTS = {
+    "aircraft-utilisation": {"query": AIRCRAFT_UTILISATION_QUERY, "keys": 1, "aggregates": (sum, sum, min, max)},
+    "pilot-hours": {"query": PILOT_HOURS_QUERY, "keys": 2, "aggregates": (sum, sum)},
+    "route-punctuality": {"query": ROUTE_PUNCTUALITY_QUERY, "keys": 2, "aggregates": (sum, sum, sum)},
+    "airport-hours": {"query": AIRPORT_HOURS_QUERY, "keys": 2, "aggregates": (sum, sum)},
+}
+
+AIRCRAFT_UTILISATION_HEADERS = ["Aircraft Id", "Model", "Passenger Capacity", "Flights", "Block Hours", "Block Hours per Day", "Available Seat Hours"]
+PILOT_HOURS_HEADERS = ["License Number", "Month", "Flights", "Flying Hours"]
+ROUTE_PUNCTUALITY_HEADERS = ["Departure Airport", "Destination Airport", "Flights", "Delayed", "Cancelled", "On-Time Rate", "Delay Rate"]
+AIRPORT_HOURS_HEADERS = ["Airport Code", *(f"{hour:02d}" for hour in range(24)), "Movements"]
+
+# ==============================================================
+# Scan the FlightId ranges
+# ==============================================================
+def build_archive_query(report_name: str, schema: str) -> str:
+    """
+    Return the query of the report on the flights of the archive attached as schema. An archive has no PilotAssignmentInterval
+    table, so the pilot assignments are read from its Flight_Pilot table joined with its flights.
+    """
+    query = ANALYTICS_REPORTS[report_name]["query"].replace("FROM PilotAssignmentInterval", f"FROM ({PILOT_ASSIGNMENT_INTERVAL_QUERY})")
+    return qualify_archive_tables(query, schema)
+
+# Read-only connection of a worker process, opened once by init_worker() and used for every range the worker scans.
+worker_conn = None
+
+def init_worker(db_path: Path, profile: str) -> None:
+    """Open the read-only connection of a worker process."""
+    global worker_conn
+    worker_conn = main.connect_db(db_path, read_only=True, profile=profile)
+
+def partition_flight_ids(conn: sqlite3.Connection, n_partitions: int) -> list:
+    """Split the FlightIds into n_partitions contiguous (first, last) ranges of about the same size (rowid ranges, no scan)."""
+    first_flight_id, last_flight_id = conn.execute("SELECT MIN(FlightId), MAX(FlightId) FROM Flight;").fetchone()
+    if first_flight_id is None:
+        return []
+    step = -(-(last_flight_id - first_flight_id + 1) // n_partitions)
+    return [(start, min(start + step - 1, last_flight_id)) for start in range(first_flight_id, last_flight_id + 1, step)]
+
+def scan_partition(conn: sqlite3.Connection, report_name: str, first_flight_id: int, last_flight_id: int, period: str = None) -> dict:
+    """
+    Run the query of the report on one FlightId range and return its partial result: {key: [aggregates]}.
+    With a period (YYYY-MM), the range of the flights of that archived month is scanned instead of the Flight table.
+    """
+    report = ANALYTICS_REPORTS[report_name]
+    query = build_archive_query(report_name, attach_archive(conn, period)) if period else report["query"]
+    params = (first_flight_id, last_flight_id) * (query.count("?") // 2)
+    return {tuple(row[:report["keys"]]): list(row[report["keys"]:]) for row in conn.execute(query, params)}
+
+def scan_worker_partition(report_name: str, first_flight_id: int, last_flight_id: int, period: str = None) -> dict:
+    """scan_partition() on the connection of the worker process."""
+    return scan_partition(worker_conn, report_name, first_flight_id, last_flight_id, period)
+
+def merge_partitions(report_name: str, partial_results) -> dict:
+    """Merge the partial results of the FlightId ranges with the merge function of each aggregate column."""
+    aggregates = ANALYTICS_REPORTS[report_name]["aggregates"]
+    merged = {}
+    for partial_result in partial_results:
+        for key, values in partial_result.items():
+            current = merged.get(key)
+            merged[key] = values if current is None else [merge((a, b)) for merge, a, b in zip(aggregates, current, values)]
+    return merged
+
+def compute_reports(db_path: Path, report_names: list, workers: int = None, partitions_per_worker: int = PARTITIONS_PER_WORKER,
+                    profile: str = main.DEFAULT_CONNECTION_PROFILE) -> dict:
+    """
+    Compute the merged aggregates of the reports over the whole Flight table and the archived flights. The FlightId ranges of
+    all reports, and the archive of each month, are scanned by a pool of worker processes, each with its own read-only
+    connection; with workers=1, the table and each archive are scanned in one query per report on a single connection (the
+    baseline the parallel scans are compared with).
+    Returns {report name: {key: [aggregates]}}.
+    """
+    if workers == 1:
+        conn = main.connect_db(db_path, read_only=True, profile=profile)
+        try:
+            periods = [None, *find_archive_periods(conn)]
+            return {name: merge_partitions(name, (scan_partition(conn, name, 0, 2 ** 63 - 1, period) for period in periods)) for name in report_names}
+        finally:
+            conn.close()
+
+    workers = workers or os.cpu_count()
+    conn = main.connect_db(db_path, read_only=True, profile=profile)
+    try:
+        partitions = partition_flight_ids(conn, workers * partitions_per_worker)
+        partitions += [(0, 2 ** 63 - 1, period) for period in find_archive_periods(conn)]
+    finally:
+        conn.close()
+
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=init_worker, initargs=(db_path, profile)) as pool:
+        futures = {name: [pool.submit(scan_worker_partition, name, *partition) for partition in partitions] for name in report_names}
+        return {name: merge_partitions(name, (future.result() for future in report_futures)) for name, report_futures in futures.items()}
+
+# ==============================================================
+# Format the reports
+# ==============================================================
+def format_aircraft_utilisation(conn: sqlite3.Connection, merged: dict) -> list:
+    """Block hours of each aircraft, per day of the period covered by all flights, and its seat hours (busiest aircraft first)."""
+    aircraft = {aircraft_id: (model, capacity) for aircraft_id, model, capacity in conn.execute(AIRCRAFT_LABELS_QUERY)}
+    if not merged:
+        return []
+    period_days = max(1, (max(values[3] for values in merged.values()) - min(values[2] for values in merged.values())) / 1440)
+    rows = []
+    for (aircraft_id,), (n_flights, block_minutes, _, _) in sorted(merged.items(), key=lambda item: -item[1][1]):
+        model, capacity = aircraft.get(aircraft_id, (None, 0))
+        rows.append((aircraft_id, model, capacity, n_flights, round(block_minutes / 60, 1), round(block_minutes / 60 / period_days, 2),
+                     round(block_minutes / 60 * capacity)))
+    return rows
+
+def format_pilot_hours(conn: sqlite3.Connection, merged: dict) -> list:
+    """Flying hours of each pilot per month, by license number and month."""
+    license_numbers = dict(conn.execute(PILOT_LABELS_QUERY))
+    return sorted((license_numbers.get(pilot_id), month, n_flights, round(flight_minutes / 60, 1))
+                  for (pilot_id, month), (n_flights, flight_minutes) in merged.items())
+
+def format_route_punctuality(conn: sqlite3.Connection, merged: dict) -> list:
+    """Share of the flights of each route that are not delayed or cancelled, and share of delayed flights (busiest routes first)."""
+    airport_codes = dict(conn.execute(AIRPORT_LABELS_QUERY))
+    rows = []
+    for (departure_airport_id, destination_airport_id), (n_flights, n_delayed, n_cancelled) in sorted(merged.items(), key=lambda item: -item[1][0]):
+        rows.append((airport_codes.get(departure_airport_id), airport_codes.get(destination_airport_id), n_flights, n_delayed, n_cancelled,
+                     f"{(n_flights - n_delayed - n_cancelled) / n_flights:.1%}", f"{n_delayed / n_flights:.1%}"))
+    return rows
+
+def format_airport_hours(conn: sqlite3.Connection, merged: dict) -> list:
+    """Heatmap of the departures and arrivals of each airport per hour of the day (busiest airports first)."""
+    airport_codes = dict(conn.execute(AIRPORT_LABELS_QUERY))
+    movements = {}
+    for (airport_id, hour), (n_departures, n_arrivals) in merged.items():
+        movements.setdefault(airport_id, [0] * 24)[hour] += n_departures + n_arrivals
+    return [(airport_codes.get(airport_id), *hours, sum(hours)) for airport_id, hours in sorted(movements.items(), key=lambda item: -sum(item[1]))]
+
+REPORT_FORMATTERS = {
+    "aircraft-utilisation": (format_aircraft_utilisation, AIRCRAFT_UTILISATION_HEADERS),
+    "pilot-hours": (format_pilot_hours, PILOT_HOURS_HEADERS),
+    "route-punctuality": (format_route_punctuality, ROUTE_PUNCTUALITY_HEADERS),
+    "airport-hours": (format_airport_hours, AIRPORT_HOURS_HEADERS),
+}
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main_analytics() -> None:
+    """Compute the analytics reports over the Flight history (including the archived flights) with a pool of worker processes and print them."""
+    parser = argparse.ArgumentParser(description="Analytics reports over the Flight history, scanned in parallel by worker processes.")
+    parser.add_argument("reports", type=main.parse_list_argument, nargs="?", default=list(ANALYTICS_REPORTS),
+                        help=f"Reports to compute (comma-separated): {', '.join(ANALYTICS_REPORTS)}. Default: all.")
+    parser.add_argument("--db", type=Path, default=main.DB_PATH, help="Path to the SQLite database file.")
+    parser.add_argument("--format", choices=main.OUTPUT_FORMATS, default="table", help="Output format of the results.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes (1: a single connection, no pool).")
+    parser.add_argument("--partitions-per-worker", type=int, default=PARTITIONS_PER_WORKER, help="Number of FlightId ranges per worker.")
+    parser.add_argument("--profile", choices=main.CONNECTION_PROFILES, default=main.DEFAULT_CONNECTION_PROFILE, help="Connection profile of the workers.")
+    parser.add_argument("--limit", type=int, help="Print only the first rows of each report.")
+    parser.add_argument("--compare", action="store_true", help="Also compute the reports on a single connection and report the speedup.")
+    args = parser.parse_args()
+
+    unknown_reports = [name for name in args.reports if name not in ANALYTICS_REPORTS]
+    if unknown_reports:
+        parser.error(f"unknown report(s): {', '.join(unknown_reports)}.")
+    if not args.db.exists():
+        sys.exit(f"Error. Database {args.db} not found.")
+
+    start = time.perf_counter()
+    results = compute_reports(args.db, args.reports, args.workers, args.partitions_per_worker, args.profile)
+    elapsed = time.perf_counter() - start
+
+    conn = main.connect_db(args.db, read_only=True, profile=args.profile)
+    try:
+        for name in args.reports:
+            formatter, headers = REPORT_FORMATTERS[name]
+            if args.format == "table":
+                print(f"\n{name}")
+            main.print_rows(formatter(conn, results[name])[:args.limit], headers, args.format)
+    finally:
+        conn.close()
+
+    print(f"Computed {len(args.reports)} report(s) in {elapsed:.2f} s with {args.workers} worker(s).", file=sys.stderr)
+    if args.compare:
+        start = time.perf_counter()
+        baseline_results = compute_reports(args.db, args.reports, 1, profile=args.profile)
+        baseline_elapsed = time.perf_counter() - start
+        if baseline_results != results:
+            sys.exit("Error. The single-connection results differ from the parallel results.")
+        print(f"Single connection: {baseline_elapsed:.2f} s. Speedup: {baseline_elapsed / elapsed:.2f}x with {args.workers} worker(s).", file=sys.stderr)
+
+if __name__ == "__main__":
+    main_analytics()
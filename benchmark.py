@@ -0,0 +1,448 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import main
+from flight_times import FLIGHT_TIME_FORMAT, to_epoch_minutes
+from seed_data import seed_database
+
+# ==============================================================
+# Parameters
+# ==============================================================
+DEFAULT_SCALES = "1k,100k,10M"
+BENCHMARK_DB_DIR = Path("./benchmark_dbs")
+BENCHMARK_RESULTS_PATH = Path("./benchmark_results.json")
+
+# Measured calls per operation (the measurement of an operation stops early after MAX_SECONDS_PER_OPERATION).
+ITERATIONS = 200
+WARMUP_ITERATIONS = 5
+MAX_SECONDS_PER_OPERATION = 30.0
+
+# Relative slowdown of p50 / p99 (compared with a baseline file) reported as a regression.
+REGRESSION_TOLERANCE = 0.25
+
+# Size of the other tables for a number of flights: (flights per row, minimum number of rows).
+SCALE_RATIOS = {"pilots": (50, 20), "aircraft": (200, 15), "destinations": (1000, 15)}
+
+# Number of flight numbers and license numbers sampled as the inputs of the operations.
+N_SAMPLED_INPUTS = 1000
+
+# The seeded flights depart over one year from this date (see seed_data.seed_database()).
+SEED_START_DATE = datetime(2026, 1, 1)
+SEED_DAYS = 365
+
+# Cold start of the interactive menu: launches of "python main.py" on each benchmark database, timed up to the first prompt.
+# The run fails if the median launch takes longer than the budget.
+STARTUP_RUNS = 20
+STARTUP_BUDGET_MS = 250
+MENU_PROMPT = b"Please, select one of the above options"
+
+# Online backup (--backup): the latency of view_flights_by_criteria on its own for BACKUP_IDLE_SECONDS, then while another
+# process takes a snapshot of the database with db_backup.py (the snapshot is deleted afterwards).
+BACKUP_IDLE_SECONDS = 10.0
+
+BENCHMARK_HEADERS = ["Scale", "Operation", "Iterations", "Rejected", "p50 (ms)", "p99 (ms)", "Throughput (ops/s)", "Peak RSS (MiB)"]
+
+# ==============================================================
+# Helper functions
+# ==============================================================
+def parse_scale_argument(value: str) -> list:
+    """Argument type for comma-separated numbers of flights with an optional k or M suffix, e.g., 1k,100k,10M."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    scales = []
+    for item in main.parse_list_argument(value):
+        try:
+            scales.append(int(item[:-1]) * multipliers[item[-1].lower()] if item[-1].lower() in multipliers else int(item))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid scale {item!r}. Correct format: a number of flights, e.g., 1000, 100k or 10M.") from None
+    return scales
+
+def format_scale(n_flights: int) -> str:
+    """Helper function that formats a number of flights like the --scales argument, e.g., 100k."""
+    for suffix, multiplier in (("M", 1_000_000), ("k", 1_000)):
+        if n_flights % multiplier == 0:
+            return f"{n_flights // multiplier}{suffix}"
+    return str(n_flights)
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of the current process, in MiB (ru_maxrss is in KiB on Linux and in bytes on macOS)."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 2 ** 20 if sys.platform == "darwin" else peak_rss / 2 ** 10
+
+def run_in_fresh_process(function, *args):
+    """Run the function in a new process, so that the peak RSS it reports only covers that call."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+def benchmark_environment() -> dict:
+    """Describe the machine and the code the benchmark ran on, so that only comparable runs are compared."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python_version": platform.python_version(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+# ==============================================================
+# Benchmark databases
+# ==============================================================
+def build_benchmark_database(db_path: Path, n_flights: int, rebuild: bool = False) -> dict:
+    """
+    Create a database with n_flights synthetic flights (see seed_data.seed_database()), the other tables scaled with SCALE_RATIOS.
+    An existing database with the same number of flights is reused unless rebuild is set.
+    Returns the build time, the peak RSS of the build and the size of the database file.
+    """
+    if db_path.exists() and not rebuild:
+        conn = sqlite3.connect(db_path)
+        try:
+            if conn.execute("SELECT COUNT(*) FROM Flight;").fetchone()[0] == n_flights:
+                return {"reused": True, "seconds": 0.0, "peak_rss_mib": peak_rss_mib(), "size_mib": db_path.stat().st_size / 2 ** 20}
+        except sqlite3.DatabaseError:
+            pass
+        finally:
+            conn.close()
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    conn = main.connect_db(db_path)
+    with redirect_stdout(sys.stderr):
+        main.initialise_db(conn)
+    scaled_rows = {table: max(n_flights // ratio, minimum) for table, (ratio, minimum) in SCALE_RATIOS.items()}
+    seed_database(
+        conn,
+        n_flights=n_flights,
+        n_pilots=scaled_rows["pilots"],
+        n_aircraft=scaled_rows["aircraft"],
+        n_destinations=scaled_rows["destinations"],
+        n_days=SEED_DAYS,
+        start_date=SEED_START_DATE,
+    )
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    conn.close()
+    return {"reused": False, "seconds": time.perf_counter() - start, "peak_rss_mib": peak_rss_mib(), "size_mib": db_path.stat().st_size / 2 ** 20}
+
+def load_benchmark_inputs(conn: sqlite3.Connection, rng: random.Random) -> dict:
+    """Sample the flight numbers, license numbers and airport codes that the operations are called with."""
+    n_flights = conn.execute("SELECT MAX(FlightId) FROM Flight;").fetchone()[0]
+    n_pilots = conn.execute("SELECT MAX(PilotId) FROM Pilot;").fetchone()[0]
+    flight_ids = rng.sample(range(1, n_flights + 1), min(N_SAMPLED_INPUTS, n_flights))
+    pilot_ids = rng.sample(range(1, n_pilots + 1), min(N_SAMPLED_INPUTS, n_pilots))
+    return {
+        "flight_numbers": [row[0] for flight_id in flight_ids for row in conn.execute("SELECT FlightNumber FROM Flight WHERE FlightId = ?;", (flight_id,))],
+        "license_numbers": [row[0] for pilot_id in pilot_ids for row in conn.execute("SELECT LicenseNumber FROM Pilot WHERE PilotId = ?;", (pilot_id,))],
+        "airport_codes": [airport_code for (airport_code,) in conn.execute("SELECT AirportCode FROM Destination ORDER BY DestinationId;")],
+    }
+
+# ==============================================================
+# Benchmarked operations - the query and write path of each menu option, with the user input drawn from the sampled inputs.
+# Each operation returns False if it is rejected like in the menu (e.g., a scheduling conflict), and appends the statements
+# that undo its changes to undo_statements, so that the benchmark databases can be reused.
+# ==============================================================
+def benchmark_view_flights_by_criteria(db: main.ConnectionManager, rng: random.Random, inputs: dict, undo_statements: list) -> bool:
+    """First page of a flight search by destination, by destination and week of departure, or by departure airport and statuses."""
+    criteria = {}
+    search = rng.randrange(3)
+    airport_id = main.destination_cache.get(db.reader, rng.choice(inputs["airport_codes"]))[1]
+    if search == 2:
+        criteria["departure_airport_ids"] = [airport_id]
+        criteria["flight_statuses"] = ["SCHEDULED", "DELAYED"]
+    else:
+        criteria["destination_airport_ids"] = [airport_id]
+    if search == 1:
+        departure_from = SEED_START_DATE + timedelta(days=rng.randrange(SEED_DAYS))
+        criteria["departure_from"] = departure_from.strftime(FLIGHT_TIME_FORMAT)
+        criteria["departure_to"] = (departure_from + timedelta(days=7)).strftime(FLIGHT_TIME_FORMAT)
+    next(main.iter_flight_pages(db.reader, **criteria), [])
+    return True
+
+def benchmark_view_pilot_schedule(db: main.ConnectionManager, rng: random.Random, inputs: dict, undo_statements: list) -> bool:
+    """Look up a pilot by license number and read their schedule."""
+    pilot_information = main.pilot_cache.get(db.reader, rng.choice(inputs["license_numbers"]))
+    list(main.get_pilot_schedule(db.reader, pilot_information[4]))
+    return True
+
+def benchmark_update_flight_information(db: main.ConnectionManager, rng: random.Random, inputs: dict, undo_statements: list) -> bool:
+    """Look up a flight, move its departure by 5 minutes, toggle its status between SCHEDULED and DELAYED."""
+    flight_number = rng.choice(inputs["flight_numbers"])
+    _, departure_time, flight_status, flight_id = main.get_flight_information(db.reader, flight_number)
+    departure_minute = to_epoch_minutes(departure_time)
+    undo_statements.append(("UPDATE Flight SET DepartureMinute = ?, FlightStatus = ? WHERE FlightId = ?;", (departure_minute, flight_status, flight_id)))
+
+    new_departure_time = datetime.strptime(departure_time, FLIGHT_TIME_FORMAT) + timedelta(minutes=5)
+    new_flight_status = "SCHEDULED" if flight_status == "DELAYED" else "DELAYED"
+    main.update_flight(db, flight_id, flight_number, new_departure_time.strftime(FLIGHT_TIME_FORMAT), new_flight_status)
+    return True
+
+def benchmark_assign_pilot_to_flight(db: main.ConnectionManager, rng: random.Random, inputs: dict, undo_statements: list) -> bool:
+    """Look up a pilot and a flight and assign the pilot, including the scheduling conflict checks."""
+    pilot_information = main.pilot_cache.get(db.reader, rng.choice(inputs["license_numbers"]))
+    if not pilot_information[3]: # IsActive column
+        return False
+    flight_information = main.flight_cache.get(db.reader, rng.choice(inputs["flight_numbers"]))
+    try:
+        main.assign_pilot(db, flight_information[1], pilot_information[4])
+    except (ValueError, sqlite3.IntegrityError):
+        return False
+    undo_statements.append(("DELETE FROM Flight_Pilot WHERE FlightId = ? AND PilotId = ?;", (flight_information[1], pilot_information[4])))
+    return True
+
+def benchmark_additional_summary_queries(db: main.ConnectionManager, rng: random.Random, inputs: dict, undo_statements: list) -> bool:
+    """Read the number of flights per destination and per pilot."""
+    main.get_flights_per_destination(db.reader).fetchall()
+    main.get_flights_per_pilot(db.reader).fetchall()
+    return True
+
+BENCHMARKED_OPERATIONS = {
+    "view_flights_by_criteria": benchmark_view_flights_by_criteria,
+    "view_pilot_schedule": benchmark_view_pilot_schedule,
+    "update_flight_information": benchmark_update_flight_information,
+    "assign_pilot_to_flight": benchmark_assign_pilot_to_flight,
+    "additional_summary_queries": benchmark_additional_summary_queries,
+}
+
+# ==============================================================
+# Measure the operations
+# ==============================================================
+def measure_operation(db_path: Path, operation_name: str, iterations: int, warmup_iterations: int, max_seconds: float, seed: int) -> dict:
+    """
+    Call the operation warmup_iterations times, then measure up to iterations calls (at most max_seconds in total).
+    The changes made by the operation are undone afterwards. Returns the latency percentiles, throughput and peak RSS.
+    """
+    operation = BENCHMARKED_OPERATIONS[operation_name]
+    rng = random.Random(seed)
+    db = main.ConnectionManager(db_path)
+    undo_statements = []
+    try:
+        inputs = load_benchmark_inputs(db.reader, rng)
+        for _ in range(warmup_iterations):
+            operation(db, rng, inputs, undo_statements)
+
+        latencies = []
+        n_rejected = 0
+        start = time.perf_counter()
+        while len(latencies) < iterations and time.perf_counter() - start < max_seconds:
+            call_start = time.perf_counter()
+            performed = operation(db, rng, inputs, undo_statements)
+            latencies.append(time.perf_counter() - call_start)
+            n_rejected += not performed
+        elapsed = time.perf_counter() - start
+    finally:
+        with db.writer:
+            for sql, params in reversed(undo_statements):
+                db.writer.execute(sql, params)
+        db.close()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "operation": operation_name,
+        "iterations": len(latencies),
+        "rejected": n_rejected,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "throughput_ops_per_s": len(latencies) / elapsed,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+def measure_startup(db_path: Path, runs: int) -> dict:
+    """Launch the menu of main.py runs times on the database, timing each launch up to the first prompt (answered with 0, Exit)."""
+    command = [sys.executable, str(Path(main.__file__).resolve()), "--db", str(db_path)]
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        output = b""
+        while MENU_PROMPT not in output:
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                process.wait()
+                raise RuntimeError(f"main.py exited with code {process.returncode} before showing the menu.")
+            output += chunk
+        latencies.append(time.perf_counter() - start)
+        process.communicate(b"0\n")
+    latencies.sort()
+    return {
+        "runs": runs,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+def measure_backup_impact(db_path: Path, backup_dir: Path, seed: int, idle_seconds: float = BACKUP_IDLE_SECONDS) -> dict:
+    """
+    Measure the flight search on its own, then while db_backup.py takes a snapshot of the database in another process.
+    Returns the duration and size of the snapshot and the latency percentiles of the search without and during the backup.
+    """
+    operation = BENCHMARKED_OPERATIONS["view_flights_by_criteria"]
+    rng = random.Random(seed)
+    db = main.ConnectionManager(db_path)
+    try:
+        inputs = load_benchmark_inputs(db.reader, rng)
+        for _ in range(WARMUP_ITERATIONS):
+            operation(db, rng, inputs, [])
+
+        def measure(keep_going) -> list:
+            latencies = []
+            while keep_going():
+                call_start = time.perf_counter()
+                operation(db, rng, inputs, [])
+                latencies.append(time.perf_counter() - call_start)
+            return latencies
+
+        idle_end = time.perf_counter() + idle_seconds
+        idle_latencies = measure(lambda: time.perf_counter() < idle_end)
+        command = [sys.executable, str(Path(main.__file__).with_name("db_backup.py")), "create", "--db", str(db_path), "--output", str(backup_dir)]
+        backup = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        backup_latencies = measure(lambda: backup.poll() is None)
+        if backup.returncode:
+            raise RuntimeError(f"db_backup.py exited with code {backup.returncode}.")
+    finally:
+        db.close()
+
+    snapshot_dir = max(backup_dir.iterdir())
+    manifest = json.loads((snapshot_dir / "manifest.json").read_text(encoding="utf-8"))
+    shutil.rmtree(snapshot_dir)
+    idle_percentiles = statistics.quantiles(idle_latencies, n=100, method="inclusive")
+    backup_percentiles = statistics.quantiles(backup_latencies, n=100, method="inclusive") if len(backup_latencies) > 1 else backup_latencies * 99
+    return {
+        "size_mib": sum(file["size"] for file in manifest["files"].values()) / 2 ** 20,
+        "compressed_mib": sum(file["compressed_size"] for file in manifest["files"].values()) / 2 ** 20,
+        "copy_seconds": manifest["copy_seconds"],
+        "seconds": manifest["seconds"],
+        "idle_p50_ms": idle_percentiles[49] * 1000,
+        "idle_p99_ms": idle_percentiles[98] * 1000,
+        "backup_iterations": len(backup_latencies),
+        "backup_p50_ms": backup_percentiles[49] * 1000,
+        "backup_p99_ms": backup_percentiles[98] * 1000,
+    }
+
+def run_benchmarks(scales: list, operation_names: list, db_dir: Path, iterations: int, warmup_iterations: int, max_seconds: float,
+                   seed: int, rebuild: bool = False, startup_runs: int = STARTUP_RUNS, backup: bool = False) -> dict:
+    """
+    Build (or reuse) the database of every scale, measure the cold start of the menu and every operation on it, each in a fresh
+    process, and optionally the effect of an online backup on the flight search.
+    """
+    results = {"environment": benchmark_environment(), "builds": [], "startup": [], "results": [], "backup": []}
+    for n_flights in scales:
+        db_path = db_dir / f"benchmark_{format_scale(n_flights)}.db"
+        print(f"Preparing {db_path} ({n_flights:,} flights)...", file=sys.stderr)
+        build = run_in_fresh_process(build_benchmark_database, db_path, n_flights, rebuild)
+        results["builds"].append({"scale": n_flights, **build})
+
+        if startup_runs:
+            print(f"Measuring the cold start at {format_scale(n_flights)} flights...", file=sys.stderr)
+            results["startup"].append({"scale": n_flights, **measure_startup(db_path, startup_runs)})
+
+        for operation_name in operation_names:
+            print(f"Measuring {operation_name} at {format_scale(n_flights)} flights...", file=sys.stderr)
+            measurement = run_in_fresh_process(measure_operation, db_path, operation_name, iterations, warmup_iterations, max_seconds, seed)
+            results["results"].append({"scale": n_flights, **measurement})
+
+        if backup:
+            print(f"Measuring view_flights_by_criteria during an online backup at {format_scale(n_flights)} flights...", file=sys.stderr)
+            results["backup"].append({"scale": n_flights, **run_in_fresh_process(measure_backup_impact, db_path, db_dir / "backups", seed)})
+    return results
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return (scale, operation, metric, baseline value, value) for every latency that grew by more than tolerance."""
+    baseline_results = {(result["scale"], result["operation"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        baseline_result = baseline_results.get((result["scale"], result["operation"]))
+        if not baseline_result:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if result[metric] > baseline_result[metric] * (1 + tolerance):
+                regressions.append((format_scale(result["scale"]), result["operation"], metric, f"{baseline_result[metric]:.3f}", f"{result[metric]:.3f}"))
+    return regressions
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main_benchmark() -> int:
+    """Run the benchmarks, write the results to a JSON file and optionally compare them with a baseline file."""
+    parser = argparse.ArgumentParser(description="Benchmark the operations of the Flight Management System at several data scales.")
+    parser.add_argument("--scales", type=parse_scale_argument, default=parse_scale_argument(DEFAULT_SCALES), help=f"Numbers of flights, e.g., {DEFAULT_SCALES}.")
+    parser.add_argument("--operations", type=main.parse_list_argument, default=list(BENCHMARKED_OPERATIONS),
+                        help=f"Operations to measure (comma-separated): {', '.join(BENCHMARKED_OPERATIONS)}.")
+    parser.add_argument("--db-dir", type=Path, default=BENCHMARK_DB_DIR, help="Directory of the benchmark databases (reused between runs).")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the benchmark databases even if they exist.")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS, help="Number of measured calls per operation.")
+    parser.add_argument("--warmup", type=int, default=WARMUP_ITERATIONS, help="Number of calls before the measurement starts.")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS_PER_OPERATION, help="Maximum measurement time per operation.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the random inputs.")
+    parser.add_argument("--startup-runs", type=int, default=STARTUP_RUNS, help="Launches of the menu timed per scale (0 to skip).")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Maximum median time from launch to the first prompt.")
+    parser.add_argument("--backup", action="store_true", help="Also measure the flight search while an online backup of each database is taken.")
+    parser.add_argument("--output", type=Path, default=BENCHMARK_RESULTS_PATH, help="JSON file the results are written to.")
+    parser.add_argument("--baseline", type=Path, help="JSON file of an earlier run; latencies that grew by more than --tolerance are reported.")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="Relative latency increase reported as a regression.")
+    args = parser.parse_args()
+
+    unknown_operations = [name for name in args.operations if name not in BENCHMARKED_OPERATIONS]
+    if unknown_operations:
+        parser.error(f"unknown operation(s): {', '.join(unknown_operations)}.")
+
+    results = run_benchmarks(args.scales, args.operations, args.db_dir, args.iterations, args.warmup, args.max_seconds, args.seed, args.rebuild,
+                             args.startup_runs, args.backup)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    main.print_table([
+        (format_scale(result["scale"]), result["operation"], result["iterations"], result["rejected"], f"{result['p50_ms']:.3f}",
+         f"{result['p99_ms']:.3f}", f"{result['throughput_ops_per_s']:,.1f}", f"{result['peak_rss_mib']:.1f}")
+        for result in results["results"]
+    ], BENCHMARK_HEADERS)
+    print(f"Results written to {args.output}.")
+
+    if results["startup"]:
+        main.print_table([(format_scale(startup["scale"]), startup["runs"], f"{startup['p50_ms']:.1f}", f"{startup['max_ms']:.1f}")
+                          for startup in results["startup"]], ["Scale", "Launches", "Startup p50 (ms)", "Startup max (ms)"])
+        slow_startups = [startup for startup in results["startup"] if startup["p50_ms"] > args.startup_budget_ms]
+        if slow_startups:
+            print(f"Error. The menu took more than {args.startup_budget_ms:g} ms to start at {len(slow_startups)} scale(s).")
+            return 1
+        print(f"The menu started within {args.startup_budget_ms:g} ms at every scale.")
+
+    if results["backup"]:
+        main.print_table([
+            (format_scale(backup["scale"]), f"{backup['size_mib']:,.0f}", f"{backup['compressed_mib']:,.0f}", f"{backup['copy_seconds']:.1f}",
+             f"{backup['seconds']:.1f}", f"{backup['idle_p50_ms']:.3f}", f"{backup['idle_p99_ms']:.3f}", f"{backup['backup_p50_ms']:.3f}",
+             f"{backup['backup_p99_ms']:.3f}")
+            for backup in results["backup"]
+        ], ["Scale", "Size (MiB)", "Snapshot (MiB)", "Copy (s)", "Backup (s)", "Idle p50 (ms)", "Idle p99 (ms)", "Backup p50 (ms)", "Backup p99 (ms)"])
+
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            main.print_table(regressions, ["Scale", "Operation", "Metric", "Baseline (ms)", "Now (ms)"])
+            print(f"Error. {len(regressions)} latency regression(s) of more than {args.tolerance:.0%} compared with {args.baseline}.")
+            return 1
+        print(f"No latency regression of more than {args.tolerance:.0%} compared with {args.baseline}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
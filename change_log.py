@@ -0,0 +1,106 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import sqlite3
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Number of changes read per query by the export (keyset pages on ChangeSeq).
+CHANGE_EXPORT_PAGE_SIZE = 5000
+
+# Retention policy of compact_change_log(): changes older than CHANGE_LOG_RETENTION_DAYS are removed, and at most
+# CHANGE_LOG_MAX_CHANGES of the most recent changes are kept.
+CHANGE_LOG_RETENTION_DAYS = 30
+CHANGE_LOG_MAX_CHANGES = 1_000_000
+
+# One change as a line of JSON: the key and data are embedded as JSON objects (not strings), the time as UTC text.
+CHANGE_EXPORT_QUERY = """
+    SELECT
+      ChangeSeq,
+      json_object(
+        'seq', ChangeSeq,
+        'table', TableName,
+        'op', Operation,
+        'key', json(RowKey),
+        'data', json(RowData),
+        'changed_at', datetime(ChangedAt, 'unixepoch')
+      )
+    FROM ChangeLog
+    WHERE ChangeSeq > ?
+    ORDER BY ChangeSeq
+    LIMIT ?;
+"""
+
+# ==============================================================
+# Export the changes
+# ==============================================================
+def get_change_cursor(conn: sqlite3.Connection) -> int:
+    """Return the ChangeSeq of the last recorded change (0 if there are none); a cheap poll for new changes."""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'ChangeLog';").fetchone()[0]
+
+def iter_changes(conn: sqlite3.Connection, since: int, limit: int = None, page_size: int = CHANGE_EXPORT_PAGE_SIZE):
+    """
+    Lazily yield (ChangeSeq, JSON line) for the changes recorded after the cursor since, in order, at most limit changes.
+    The changes are read one page at a time, each page a range scan of the ChangeLog primary key.
+    Raises ValueError if changes after since have already been removed by the retention policy (the consumer has to re-read
+    the tables and continue from the cursor returned by get_change_cursor() before it started reading them).
+    """
+    purged_through = conn.execute("SELECT PurgedThroughSeq FROM ChangeLogState WHERE StateId = 1;").fetchone()[0]
+    if since < purged_through:
+        raise ValueError(f"The changes up to {purged_through} have been removed by the retention policy (or the flight archiving). "
+                         f"Please, re-read the Flight and Flight_Pilot tables and continue from the current cursor.")
+
+    n_changes = 0
+    while limit is None or n_changes < limit:
+        page_limit = page_size if limit is None else min(page_size, limit - n_changes)
+        page = conn.execute(CHANGE_EXPORT_QUERY, (since, page_limit)).fetchall()
+        yield from page
+        n_changes += len(page)
+        if len(page) < page_limit:
+            return
+        since = page[-1][0]
+
+# ==============================================================
+# Compact the change log
+# ==============================================================
+def compact_change_log(conn: sqlite3.Connection, retention_days: int = CHANGE_LOG_RETENTION_DAYS, max_changes: int = CHANGE_LOG_MAX_CHANGES) -> dict:
+    """
+    Keep the change log bounded, in one transaction:
+    1. Compaction: a change followed by a later change of the same row is removed, as applying the later change alone gives
+       the same result. The cursors of the consumers remain valid.
+    2. Retention: the changes older than retention_days, and the oldest changes beyond the max_changes most recent ones, are
+       removed. Consumers whose cursor is before the last removed change must re-read the tables (see iter_changes()).
+    Returns the number of changes removed by each step and the new PurgedThroughSeq.
+    """
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        n_compacted = conn.execute(
+            """
+            DELETE FROM ChangeLog
+            WHERE EXISTS (
+                SELECT 1
+                FROM ChangeLog AS later
+                WHERE later.TableName = ChangeLog.TableName AND later.RowKey = ChangeLog.RowKey AND later.ChangeSeq > ChangeLog.ChangeSeq
+            );
+            """
+        ).rowcount
+
+        purged_through = conn.execute("SELECT PurgedThroughSeq FROM ChangeLogState WHERE StateId = 1;").fetchone()[0]
+        expired_through = conn.execute(
+            "SELECT MAX(ChangeSeq) FROM ChangeLog WHERE ChangedAt < unixepoch('now', ?);", (f"-{retention_days} days",)
+        ).fetchone()[0]
+        overflow_through = conn.execute(
+            "SELECT ChangeSeq FROM ChangeLog ORDER BY ChangeSeq DESC LIMIT 1 OFFSET ?;", (max_changes,)
+        ).fetchone()
+        new_purged_through = max(purged_through, expired_through or 0, overflow_through[0] if overflow_through else 0)
+
+        n_purged = 0
+        if new_purged_through > purged_through:
+            n_purged = conn.execute("DELETE FROM ChangeLog WHERE ChangeSeq <= ?;", (new_purged_through,)).rowcount
+            conn.execute("UPDATE ChangeLogState SET PurgedThroughSeq = ? WHERE StateId = 1;", (new_purged_through,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"compacted": n_compacted, "purged": n_purged, "purged_through": new_purged_through}
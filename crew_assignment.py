@@ -0,0 +1,157 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import heapq
+import sqlite3
+from collections import defaultdict, deque
+
+from flight_times import to_epoch_minutes
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Flights departing in the window that still need pilots (cancelled flights and flights that have departed are not staffed).
+UNDERSTAFFED_FLIGHTS_QUERY = """
+    SELECT
+      f.FlightId,
+      f.FlightNumber,
+      f.DepartureTime,
+      f.DepartureMinute,
+      f.DestinationArrivalMinute,
+      (SELECT COUNT(*) FROM Flight_Pilot AS fp WHERE fp.FlightId = f.FlightId) AS AssignedPilots
+    FROM Flight AS f
+    WHERE f.DepartureMinute BETWEEN ? AND ?
+      AND f.FlightStatus IN ('SCHEDULED', 'DELAYED')
+      AND AssignedPilots < ?
+    ORDER BY f.DepartureMinute, f.FlightId;
+"""
+
+# Active pilots with their employment dates and the arrival time of their last non-cancelled flight departing before the window
+# (all in INTEGER minutes).
+ACTIVE_PILOTS_QUERY = """
+    SELECT
+      p.PilotId,
+      unixepoch(p.EmploymentStartDate) / 60,
+      unixepoch(p.EmploymentEndDate) / 60,
+      (SELECT i.DestinationArrivalMinute
+       FROM PilotAssignmentInterval AS i
+       WHERE i.PilotId = p.PilotId AND i.DepartureMinute < ? AND i.FlightStatus <> 'CANCELLED'
+       ORDER BY i.DepartureMinute DESC
+       LIMIT 1) AS LastArrivalMinute
+    FROM Pilot AS p
+    WHERE p.IsActive = 1;
+"""
+
+# Existing assignments departing in the window (and the rest period after it), including the flights being staffed.
+ASSIGNED_FLIGHTS_QUERY = """
+    SELECT fp.PilotId, f.DepartureMinute, f.DestinationArrivalMinute
+    FROM Flight AS f
+    JOIN Flight_Pilot AS fp
+        ON fp.FlightId = f.FlightId
+    WHERE f.DepartureMinute >= ? AND f.DepartureMinute < ?
+      AND f.FlightStatus <> 'CANCELLED'
+    ORDER BY f.DepartureMinute;
+"""
+
+UNCOVERED_FLIGHT_HEADERS = ["Flight Number", "Departure Time", "Assigned Pilots", "Missing Pilots"]
+
+# ==============================================================
+# Assign pilots to the understaffed flights
+# ==============================================================
+def plan_assignments(flights: list, pilots: list, assigned_flights: list, pilots_per_flight: int, min_rest_minutes: int):
+    """
+    Greedily choose pilots for the flights, taken in departure order (all times in INTEGER minutes).
+    For each flight, the available pilots who have been free the longest are tried first (a min-heap on the time from which
+    each pilot is free), which spreads the flights over the pilots. A pilot is only chosen if the flight is within their
+    employment dates and leaves min_rest_minutes of rest before their next existing assignment.
+    Returns (assignments, uncovered) where assignments is a list of (FlightId, PilotId) and uncovered a list of
+    (FlightNumber, DepartureTime, assigned pilots, missing pilots).
+    """
+    # Time from which each pilot is free, and each pilot's existing assignments that are still ahead of the current flight.
+    free_from = {}
+    employment_end = {}
+    for pilot_id, employment_start_minute, employment_end_minute, last_arrival_minute in pilots:
+        free_from[pilot_id] = employment_start_minute
+        if last_arrival_minute is not None:
+            free_from[pilot_id] = max(free_from[pilot_id], last_arrival_minute + min_rest_minutes)
+        employment_end[pilot_id] = employment_end_minute
+    upcoming_assignments = defaultdict(deque)
+    for pilot_id, departure_minute, arrival_minute in assigned_flights:
+        if pilot_id in free_from:
+            upcoming_assignments[pilot_id].append((departure_minute, arrival_minute))
+    pending_assignments = [(departure, arrival, pilot_id) for pilot_id, intervals in upcoming_assignments.items() for departure, arrival in intervals]
+    pending_assignments.sort(reverse=True)
+
+    free_pilots = [(minute, pilot_id) for pilot_id, minute in free_from.items()]
+    heapq.heapify(free_pilots)
+
+    assignments = []
+    uncovered = []
+    for flight_id, flight_number, departure_time, departure, arrival, n_assigned_pilots in flights:
+        # Existing assignments that have started by this departure keep their pilot busy until the end of the rest period.
+        while pending_assignments and pending_assignments[-1][0] <= departure:
+            _, existing_arrival, pilot_id = pending_assignments.pop()
+            upcoming_assignments[pilot_id].popleft()
+            if existing_arrival + min_rest_minutes > free_from[pilot_id]:
+                free_from[pilot_id] = existing_arrival + min_rest_minutes
+                heapq.heappush(free_pilots, (free_from[pilot_id], pilot_id))
+
+        n_missing_pilots = pilots_per_flight - n_assigned_pilots
+        skipped_pilots = []
+        while n_missing_pilots and free_pilots and free_pilots[0][0] <= departure:
+            minute, pilot_id = heapq.heappop(free_pilots)
+            if minute != free_from[pilot_id]:
+                continue # Outdated heap entry.
+            if employment_end[pilot_id] is not None and departure > employment_end[pilot_id]:
+                continue # Employment has ended: the pilot is dropped for the later flights as well.
+            next_assignment = upcoming_assignments[pilot_id][0] if upcoming_assignments[pilot_id] else None
+            if (employment_end[pilot_id] is not None and arrival > employment_end[pilot_id]) or \
+                    (next_assignment and arrival + min_rest_minutes > next_assignment[0]):
+                skipped_pilots.append((minute, pilot_id))
+                continue
+            assignments.append((flight_id, pilot_id))
+            free_from[pilot_id] = arrival + min_rest_minutes
+            heapq.heappush(free_pilots, (free_from[pilot_id], pilot_id))
+            n_missing_pilots -= 1
+        for skipped_pilot in skipped_pilots:
+            heapq.heappush(free_pilots, skipped_pilot)
+
+        if n_missing_pilots:
+            uncovered.append((flight_number, departure_time, pilots_per_flight - n_missing_pilots, n_missing_pilots))
+    return assignments, uncovered
+
+def auto_assign_pilots(conn: sqlite3.Connection, departure_from: str, departure_to: str, pilots_per_flight: int,
+                       min_rest_minutes: int, dry_run: bool = False) -> dict:
+    """
+    Assign active pilots to the flights departing between departure_from and departure_to (YYYY-MM-DD HH:MM) that have fewer
+    than pilots_per_flight pilots (see plan_assignments()). The flights and pilots are read and all the assignments are written
+    in one transaction, which holds the write lock from the start so that no other assignment can interfere.
+    With dry_run, the transaction is rolled back. Returns the statistics of the run and the list of uncovered flights.
+    """
+    window_start, window_end = to_epoch_minutes(departure_from), to_epoch_minutes(departure_to)
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        flights = conn.execute(UNDERSTAFFED_FLIGHTS_QUERY, (window_start, window_end, pilots_per_flight)).fetchall()
+        pilots = conn.execute(ACTIVE_PILOTS_QUERY, (window_start,)).fetchall()
+        assigned_flights = []
+        if flights:
+            assigned_until = max(flight[4] for flight in flights) + min_rest_minutes
+            assigned_flights = conn.execute(ASSIGNED_FLIGHTS_QUERY, (window_start, assigned_until)).fetchall()
+
+        assignments, uncovered = plan_assignments(flights, pilots, assigned_flights, pilots_per_flight, min_rest_minutes)
+        conn.executemany("INSERT INTO Flight_Pilot(FlightId, PilotId) VALUES (?, ?);", assignments)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    return {
+        "flights": len(flights),
+        "pilots": len(pilots),
+        "assignments": len(assignments),
+        "uncovered_flights": len(uncovered),
+        "uncovered": uncovered,
+    }
@@ -0,0 +1,341 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import main
+from change_log import get_change_cursor
+from flight_archive import ARCHIVE_DIR_SUFFIX, remove_unarchived_copies
+
+# ==============================================================
+# Parameters
+# ==============================================================
+BACKUP_DIR = Path("./backups")
+MANIFEST_NAME = "manifest.json"
+
+# A snapshot is a directory named after the time it was taken, e.g., backups/20261017T093000.
+SNAPSHOT_NAME_FORMAT = "%Y%m%dT%H%M%S"
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Pages copied per step of the online backup, and the pause after each step. The database is only read during a step; the
+# pauses leave the disk and the CPU to the operators (1024 pages of 4 KiB take a few milliseconds to copy).
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_PAUSE_SECONDS = 0.005
+
+# CPU priority of the backup command (added to its niceness): the compression is CPU-bound, and without it the backup competes
+# with the operators for the CPU and slows their queries.
+BACKUP_NICENESS = 10
+
+# gzip level 1 compresses the database about 3.5 times faster than level 6 for a slightly larger file (43 % instead of 41 % of
+# the size), so the CPU of the server is freed sooner.
+GZIP_LEVEL = 1
+COPY_CHUNK_SIZE = 1024 * 1024
+
+SNAPSHOT_HEADERS = ["Snapshot", "Created", "Schema Version", "Change Cursor", "Files", "Size (MiB)", "Compressed (MiB)"]
+
+# ==============================================================
+# Snapshot files
+# ==============================================================
+def read_manifest(snapshot_dir: Path) -> dict:
+    """Return the manifest of the snapshot, or None if the directory holds no complete snapshot."""
+    manifest_path = snapshot_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+def write_manifest(snapshot_dir: Path, manifest: dict) -> None:
+    """Write the manifest last and atomically, once the files of the snapshot are on disk: it marks the snapshot as complete."""
+    temporary_path = snapshot_dir / (MANIFEST_NAME + ".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+        manifest_file.flush()
+        os.fsync(manifest_file.fileno())
+    os.replace(temporary_path, snapshot_dir / MANIFEST_NAME)
+
+def list_snapshots(backup_dir: Path) -> list:
+    """Return (snapshot directory, manifest) of the complete snapshots in the backup directory, oldest first."""
+    if not backup_dir.is_dir():
+        return []
+    snapshots = [(path, read_manifest(path)) for path in sorted(backup_dir.iterdir()) if path.is_dir()]
+    return [(path, manifest) for path, manifest in snapshots if manifest]
+
+def find_snapshot(backup_dir: Path, at: str = None) -> Path:
+    """
+    Return the directory of the latest snapshot taken at or before the time at (YYYY-MM-DD HH:MM), or of the latest snapshot.
+    Raises ValueError if there is none.
+    """
+    snapshots = [path for path, manifest in list_snapshots(backup_dir) if at is None or manifest["created_at"][:16] <= at]
+    if not snapshots:
+        raise ValueError(f"No snapshot{' taken before ' + at if at else ''} in {backup_dir}.")
+    return snapshots[-1]
+
+def snapshot_file_path(snapshot_dir: Path, name: str) -> Path:
+    """Return the compressed file of the snapshot that holds the database file name (e.g., flight_management_archive/2026-01.db)."""
+    return snapshot_dir / (name.replace("/", "-") + ".gz")
+
+def compress_file(source_path: Path, target_path: Path, level: int = GZIP_LEVEL) -> dict:
+    """Compress the file with gzip and return its size and the SHA-256 checksum of its (uncompressed) content."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=level, mtime=0) as compressed:
+            while chunk := source.read(COPY_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                compressed.write(chunk)
+        target.flush()
+        os.fsync(target.fileno())
+    return {"sha256": digest.hexdigest(), "size": size, "compressed_size": target_path.stat().st_size}
+
+def decompress_file(source_path: Path, target_path: Path, expected: dict) -> None:
+    """Decompress a file of a snapshot and check its size and checksum against the manifest. Raises ValueError if they differ."""
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with gzip.open(source_path, "rb") as source, open(target_path, "wb") as target:
+            while chunk := source.read(COPY_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                target.write(chunk)
+    except (OSError, EOFError) as e:
+        raise ValueError(f"{source_path.name} cannot be decompressed: {e}") from None
+    if size != expected["size"] or digest.hexdigest() != expected["sha256"]:
+        raise ValueError(f"{source_path.name} does not match the checksum of the manifest.")
+
+# ==============================================================
+# Take a snapshot
+# ==============================================================
+def copy_database(source: sqlite3.Connection, target_path: Path, pages_per_step: int, pause_seconds: float) -> int:
+    """Copy the database of the source connection to target_path with the online backup API, pages_per_step pages per step."""
+    def pause(status: int, remaining: int, total: int) -> None:
+        if remaining:
+            time.sleep(pause_seconds)
+
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages_per_step, progress=pause)
+        return target.execute("PRAGMA page_count;").fetchone()[0]
+    finally:
+        target.close()
+
+def remove_flights_of_database_copy(copy_path: Path, archive_copy_path: Path) -> None:
+    """Remove from the copy of an archive the flights (and their pilots) that are in the copy of the database."""
+    conn = sqlite3.connect(copy_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive;", (str(archive_copy_path),))
+        with conn:
+            remove_unarchived_copies(conn, "archive")
+    finally:
+        conn.close()
+
+def create_snapshot(db_path: Path, backup_dir: Path, pages_per_step: int = BACKUP_PAGES_PER_STEP,
+                    pause_seconds: float = BACKUP_STEP_PAUSE_SECONDS, level: int = GZIP_LEVEL) -> Path:
+    """
+    Take a snapshot of the database and of its flight archives in a new directory of backup_dir and return it.
+
+    The database is copied inside one read transaction, so the copy is consistent although the operators keep writing; the
+    backup is not restarted by their commits, but the WAL file cannot be checkpointed past the snapshot until the copy ends.
+    The archives (only written by archive-flights) are those listed in the snapshot of the database. They are copied after
+    it, so they can hold flights archived during the snapshot, which are still in the copy of the database: those flights
+    are removed from the copies of the archives, so that a restored database does not return them twice.
+    """
+    created_at = datetime.now()
+    snapshot_dir = backup_dir / created_at.strftime(SNAPSHOT_NAME_FORMAT)
+    snapshot_dir.mkdir(parents=True)
+    archive_dir_name = db_path.stem + ARCHIVE_DIR_SUFFIX
+    manifest = {"created_at": created_at.strftime(SNAPSHOT_TIME_FORMAT), "source": str(db_path.resolve()), "files": {}}
+    start = time.perf_counter()
+    try:
+        source = main.connect_db(db_path, read_only=True)
+        try:
+            source.execute("BEGIN;")
+            manifest["schema_version"] = main.get_schema_version(source)
+            manifest["change_cursor"] = get_change_cursor(source)
+            periods = []
+            if source.execute("SELECT 1 FROM sqlite_master WHERE name = 'FlightArchivePartition';").fetchone():
+                periods = [period for period, in source.execute("SELECT Period FROM FlightArchivePartition ORDER BY StartMinute;")]
+
+            copy_path = snapshot_dir / (db_path.name + ".partial")
+            manifest["page_count"] = copy_database(source, copy_path, pages_per_step, pause_seconds)
+            source.rollback()
+        finally:
+            source.close()
+        manifest["copy_seconds"] = time.perf_counter() - start
+
+        manifest["files"][db_path.name] = compress_file(copy_path, snapshot_file_path(snapshot_dir, db_path.name), level)
+        for period in periods:
+            name = f"{archive_dir_name}/{period}.db"
+            archive = sqlite3.connect(f"{(db_path.parent / name).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                archive_copy_path = snapshot_dir / f"{archive_dir_name}-{period}.db.partial"
+                copy_database(archive, archive_copy_path, pages_per_step, pause_seconds)
+            finally:
+                archive.close()
+            remove_flights_of_database_copy(copy_path, archive_copy_path)
+            manifest["files"][name] = compress_file(archive_copy_path, snapshot_file_path(snapshot_dir, name), level)
+            archive_copy_path.unlink()
+        copy_path.unlink()
+    except BaseException:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        raise
+    manifest["seconds"] = time.perf_counter() - start
+    write_manifest(snapshot_dir, manifest)
+    return snapshot_dir
+
+# ==============================================================
+# Verify and restore a snapshot
+# ==============================================================
+def check_database(db_path: Path) -> list:
+    """Run PRAGMA integrity_check and PRAGMA foreign_key_check on a database file and return the problems found."""
+    conn = sqlite3.connect(db_path)
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA integrity_check;") if row[0] != "ok"]
+        problems += [
+            f"{table} row {rowid} refers to a missing row of {parent}"
+            for table, rowid, parent, _ in conn.execute("PRAGMA foreign_key_check;")
+        ]
+    except sqlite3.DatabaseError as e: # Damaged beyond what the checks can report, e.g., the schema.
+        problems = [str(e)]
+    finally:
+        conn.close()
+    return problems
+
+def extract_snapshot(snapshot_dir: Path, output_dir: Path) -> dict:
+    """
+    Decompress the files of the snapshot into output_dir (the archives into its archive subdirectory), checking their checksums,
+    and check every database. Returns the manifest. Raises ValueError if a file is missing, corrupt or fails a check.
+    """
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise ValueError(f"{snapshot_dir} holds no complete snapshot.")
+    for name, expected in manifest["files"].items():
+        compressed_path = snapshot_file_path(snapshot_dir, name)
+        if not compressed_path.exists():
+            raise ValueError(f"{compressed_path.name} is missing.")
+        output_path = output_dir / name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        decompress_file(compressed_path, output_path, expected)
+        problems = check_database(output_path)
+        if problems:
+            raise ValueError(f"{name} fails the integrity checks: {'; '.join(problems[:10])}")
+    return manifest
+
+def verify_snapshot(snapshot_dir: Path) -> dict:
+    """Check a snapshot (see extract_snapshot()) in a temporary directory next to it. Returns the manifest."""
+    with tempfile.TemporaryDirectory(dir=snapshot_dir.parent, prefix=".verify-") as work_dir:
+        return extract_snapshot(snapshot_dir, Path(work_dir))
+
+def restore_snapshot(snapshot_dir: Path, db_path: Path, force: bool = False) -> dict:
+    """
+    Restore the database (and its archives) from a snapshot, after checking it. The files are first extracted and checked
+    next to the database, then moved into place; an existing database is kept as <name>.before-restore, unless force is not
+    set, in which case ValueError is raised. The program must not be running on the database. Returns the manifest.
+    """
+    if db_path.exists() and not force:
+        raise ValueError(f"{db_path} exists. Use --force to replace it (it is kept as {db_path.name}.before-restore).")
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise ValueError(f"{snapshot_dir} holds no complete snapshot.")
+    snapshot_db_name = next(name for name in manifest["files"] if "/" not in name)
+    snapshot_archive_dir_name = Path(snapshot_db_name).stem + ARCHIVE_DIR_SUFFIX
+    archive_dir = db_path.with_name(db_path.stem + ARCHIVE_DIR_SUFFIX)
+
+    with tempfile.TemporaryDirectory(dir=db_path.parent, prefix=f".{db_path.name}.restore-") as work_dir:
+        work_dir = Path(work_dir)
+        extract_snapshot(snapshot_dir, work_dir)
+        # The WAL file of the replaced database moves with it: left in place, it would be applied to the restored database.
+        kept_db_path = db_path.with_name(db_path.name + ".before-restore")
+        for path, kept_path in ((db_path, kept_db_path), (Path(f"{db_path}-wal"), Path(f"{kept_db_path}-wal")),
+                                (Path(f"{db_path}-shm"), Path(f"{kept_db_path}-shm")), (archive_dir, archive_dir.with_name(archive_dir.name + ".before-restore"))):
+            if path.exists():
+                if kept_path.is_dir():
+                    shutil.rmtree(kept_path)
+                os.replace(path, kept_path)
+        if (work_dir / snapshot_archive_dir_name).exists():
+            os.replace(work_dir / snapshot_archive_dir_name, archive_dir)
+        os.replace(work_dir / snapshot_db_name, db_path)
+    return manifest
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def format_snapshot(snapshot_dir: Path, manifest: dict) -> tuple:
+    """Row of SNAPSHOT_HEADERS describing a snapshot."""
+    files = manifest["files"].values()
+    return (
+        snapshot_dir.name, manifest["created_at"], manifest["schema_version"], manifest["change_cursor"], len(files),
+        f"{sum(file['size'] for file in files) / 2 ** 20:,.1f}", f"{sum(file['compressed_size'] for file in files) / 2 ** 20:,.1f}",
+    )
+
+def main_backup() -> None:
+    """
+    Take, list, verify or restore the snapshots of the database. A snapshot is copied with the SQLite online backup API on a
+    read-only connection, a batch of pages at a time with a pause between the batches, so the operators keep reading and
+    writing (WAL mode). The copy and the flight archives are compressed with gzip and recorded with their SHA-256 checksums
+    in the manifest of the snapshot; a snapshot is verified and restored with the checksums, PRAGMA integrity_check and
+    PRAGMA foreign_key_check.
+    """
+    parser = argparse.ArgumentParser(description="Online backups of the Flight Management System database.")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    create_parser = commands.add_parser("create", help="Take a snapshot of the database while it is in use.")
+    create_parser.add_argument("--db", type=Path, default=main.DB_PATH, help="Path to the SQLite database file.")
+    create_parser.add_argument("--output", type=Path, default=BACKUP_DIR, help="Directory of the snapshots.")
+    create_parser.add_argument("--pages-per-step", type=int, default=BACKUP_PAGES_PER_STEP, help="Pages copied per step of the backup (-1: all at once).")
+    create_parser.add_argument("--pause-ms", type=float, default=BACKUP_STEP_PAUSE_SECONDS * 1000, help="Pause after each step, in milliseconds.")
+    create_parser.add_argument("--nice", type=int, default=BACKUP_NICENESS, help="Niceness added to the backup process (0: same CPU priority as the operators).")
+    create_parser.add_argument("--level", type=int, choices=range(1, 10), default=GZIP_LEVEL, metavar="1-9", help="gzip compression level.")
+
+    list_parser = commands.add_parser("list", help="List the snapshots.")
+    list_parser.add_argument("--output", type=Path, default=BACKUP_DIR, help="Directory of the snapshots.")
+    list_parser.add_argument("--format", choices=main.OUTPUT_FORMATS, default="table", help="Output format of the results.")
+
+    verify_parser = commands.add_parser("verify", help="Check the checksums and the integrity of a snapshot.")
+    verify_parser.add_argument("snapshot", type=Path, help="Directory of the snapshot.")
+
+    restore_parser = commands.add_parser("restore", help="Restore the database from a snapshot, after checking it.")
+    restore_parser.add_argument("snapshot", type=Path, nargs="?", help="Directory of the snapshot (default: the latest one, see --at).")
+    restore_parser.add_argument("--output", type=Path, default=BACKUP_DIR, help="Directory of the snapshots.")
+    restore_parser.add_argument("--at", type=main.parse_datetime_argument, help="Restore the latest snapshot taken at or before this time.")
+    restore_parser.add_argument("--db", type=Path, default=main.DB_PATH, help="Path of the restored database file.")
+    restore_parser.add_argument("--force", action="store_true", help="Replace an existing database (kept as <name>.before-restore).")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            if not args.db.exists():
+                sys.exit(f"Error. Database {args.db} not found.")
+            if args.nice and hasattr(os, "nice"):
+                os.nice(args.nice)
+            snapshot_dir = create_snapshot(args.db, args.output, args.pages_per_step, args.pause_ms / 1000, args.level)
+            manifest = read_manifest(snapshot_dir)
+            print(f"Snapshot {snapshot_dir} taken in {manifest['seconds']:.2f} s (database copied in {manifest['copy_seconds']:.2f} s).")
+            main.print_table([format_snapshot(snapshot_dir, manifest)], SNAPSHOT_HEADERS)
+
+        elif args.command == "list":
+            main.print_rows([format_snapshot(path, manifest) for path, manifest in list_snapshots(args.output)], SNAPSHOT_HEADERS, args.format)
+
+        elif args.command == "verify":
+            manifest = verify_snapshot(args.snapshot)
+            print(f"Snapshot {args.snapshot} is valid: {len(manifest['files'])} file(s) match their checksums and pass integrity_check and foreign_key_check.")
+
+        elif args.command == "restore":
+            snapshot_dir = args.snapshot or find_snapshot(args.output, args.at)
+            manifest = restore_snapshot(snapshot_dir, args.db, args.force)
+            print(f"Database {args.db} restored from the snapshot {snapshot_dir} of {manifest['created_at']} (change cursor {manifest['change_cursor']}).")
+    except ValueError as e:
+        sys.exit(f"Error. {e}")
+
+if __name__ == "__main__":
+    main_backup()
@@ -0,0 +1,284 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import json
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from change_log import get_change_cursor
+from flight_times import FLIGHT_TIME_FORMAT, from_epoch_minutes, to_epoch_minutes
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# The statuses after which a flight no longer changes, and can be archived once its month is over.
+ARCHIVED_FLIGHT_STATUSES = ("ARRIVED", "CANCELLED")
+
+# The archives of flight_management.db are in the directory flight_management_archive, one file per month: YYYY-MM.db.
+# Moving the finished flights of past months there keeps the operational Flight table and its indices small; the queries
+# attach the archives of the months they cover on demand.
+ARCHIVE_DIR_SUFFIX = "_archive"
+
+# Schema name of an attached archive: archive_YYYY_MM. SQLite attaches at most 10 databases to a connection, so the least
+# recently attached archive is detached once MAX_ATTACHED_ARCHIVES are attached.
+ARCHIVE_SCHEMA_PREFIX = "archive_"
+MAX_ATTACHED_ARCHIVES = 8
+
+ARCHIVED_FLIGHT_COLUMNS = "FlightId, FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus"
+
+# Tables of an archive: the columns of Flight and Flight_Pilot, without the foreign keys (they cannot refer to another database
+# file) and with the indices used by the flight search and the pilot schedule.
+ARCHIVE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS {schema}.Flight (
+    FlightId                    INTEGER PRIMARY KEY,
+    FlightNumber                TEXT NOT NULL,
+    AircraftId                  INTEGER NOT NULL,
+    DepartureAirportId          INTEGER NOT NULL,
+    DestinationAirportId        INTEGER NOT NULL,
+    DepartureMinute             INTEGER NOT NULL,
+    DestinationArrivalMinute    INTEGER NOT NULL,
+    FlightStatus                TEXT NOT NULL,
+    DepartureTime               TEXT GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', DepartureMinute * 60, 'unixepoch')) VIRTUAL,
+    DestinationArrivalTime      TEXT GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', DestinationArrivalMinute * 60, 'unixepoch')) VIRTUAL
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.Flight_Pilot (
+    FlightId        INTEGER NOT NULL,
+    PilotId         INTEGER NOT NULL,
+
+    PRIMARY KEY (FlightId, PilotId)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS {schema}.idx_flight_destination_departure ON Flight(DestinationAirportId, DepartureMinute);
+CREATE INDEX IF NOT EXISTS {schema}.idx_flight_departure_airport_departure ON Flight(DepartureAirportId, DepartureMinute);
+CREATE INDEX IF NOT EXISTS {schema}.idx_flight_departure_time ON Flight(DepartureMinute);
+CREATE INDEX IF NOT EXISTS {schema}.idx_flight_pilot_pilot_flight ON Flight_Pilot(PilotId, FlightId);
+"""
+
+ARCHIVE_HEADERS = ["Period", "Archived Flights", "Archive File"]
+
+# Table references of a query to point at the tables of an archive (see qualify_archive_tables()).
+ARCHIVED_TABLE_PATTERN = re.compile(r"\b(FROM|JOIN)\s+(Flight_Pilot|Flight)\b")
+
+# ==============================================================
+# Archive files
+# ==============================================================
+def get_month(minute: int) -> tuple:
+    """Return (first minute, first minute of the next month, YYYY-MM) of the month of a flight time in epoch minutes."""
+    start = datetime.strptime(from_epoch_minutes(minute), FLIGHT_TIME_FORMAT).replace(day=1, hour=0, minute=0)
+    end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return to_epoch_minutes(start), to_epoch_minutes(end), start.strftime("%Y-%m")
+
+def get_archive_dir(conn: sqlite3.Connection) -> Path:
+    """Return the directory of the archives of the main database of the connection."""
+    db_file = next(file for _, name, file in conn.execute("PRAGMA database_list;") if name == "main")
+    if not db_file:
+        raise ValueError("An in-memory database has no archives.")
+    db_path = Path(db_file)
+    return db_path.with_name(db_path.stem + ARCHIVE_DIR_SUFFIX)
+
+def attach_archive(conn: sqlite3.Connection, period: str, create: bool = False) -> str:
+    """
+    Attach the archive of the month (YYYY-MM) to the connection, unless it is already attached, and return its schema name.
+    A read-only connection attaches it read-only. The archive file must exist unless create is set.
+    """
+    schema = ARCHIVE_SCHEMA_PREFIX + period.replace("-", "_")
+    attached = [name for _, name, _ in conn.execute("PRAGMA database_list;") if name.startswith(ARCHIVE_SCHEMA_PREFIX)]
+    if schema in attached:
+        return schema
+    for name in attached[:max(len(attached) - MAX_ATTACHED_ARCHIVES + 1, 0)]:
+        try:
+            conn.execute(f"DETACH DATABASE {name};")
+        except sqlite3.OperationalError:
+            pass # Still read by an open cursor.
+
+    archive_path = get_archive_dir(conn) / f"{period}.db"
+    if not (create or archive_path.exists()):
+        raise FileNotFoundError(f"Archive file {archive_path} not found.")
+    conn.execute(f"ATTACH DATABASE ? AS {schema};", (str(archive_path),))
+    return schema
+
+# ==============================================================
+# Route the queries to the archives
+# ==============================================================
+def find_archive_periods(conn: sqlite3.Connection, from_minute: int = None, to_minute: int = None) -> list:
+    """Return the archived months (YYYY-MM, in order) that overlap the departure times from_minute - to_minute (both included)."""
+    return [period for period, in conn.execute(
+        """
+        SELECT Period
+        FROM FlightArchivePartition
+        WHERE StartMinute <= ? AND EndMinute > ?
+        ORDER BY StartMinute;
+        """,
+        (to_minute if to_minute is not None else 2 ** 62, from_minute if from_minute is not None else -2 ** 62),
+    )]
+
+def find_pilot_archive_periods(conn: sqlite3.Connection, pilot_id: int) -> list:
+    """Return the archived months (YYYY-MM, in order) that hold flights of the pilot."""
+    return [period for period, in conn.execute(
+        """
+        SELECT p.Period
+        FROM ArchivedPilotFlightCount AS c
+        JOIN FlightArchivePartition AS p
+            ON p.StartMinute = c.StartMinute
+        WHERE c.PilotId = ?
+        ORDER BY c.StartMinute;
+        """,
+        (pilot_id,),
+    )]
+
+def qualify_archive_tables(sql: str, schema: str) -> str:
+    """Return a query on the Flight and Flight_Pilot tables that reads the tables of the archive attached as schema instead."""
+    return ARCHIVED_TABLE_PATTERN.sub(rf"\1 {schema}.\2", sql)
+
+def iter_archive_rows(conn: sqlite3.Connection, periods: list, build_query):
+    """
+    Lazily yield the rows of a query on the archive of each month in turn. build_query(schema) returns the SQL (reading the
+    tables of that schema) and its parameters. An archive is only attached once the rows of the previous months have been read,
+    so the rows are in order if the query orders them by departure time.
+    """
+    for period in periods:
+        sql, params = build_query(attach_archive(conn, period))
+        yield from conn.execute(sql, params)
+
+# ==============================================================
+# Archive the flights
+# ==============================================================
+def remove_unarchived_copies(conn: sqlite3.Connection, schema: str) -> None:
+    """Remove from the archive attached as schema the copies of the flights (and their pilots) still in the main database."""
+    conn.execute(f"DELETE FROM {schema}.Flight_Pilot WHERE EXISTS (SELECT 1 FROM main.Flight AS f WHERE f.FlightId = Flight_Pilot.FlightId);")
+    conn.execute(f"DELETE FROM {schema}.Flight WHERE EXISTS (SELECT 1 FROM main.Flight AS f WHERE f.FlightId = Flight.FlightId);")
+
+def archive_month(conn: sqlite3.Connection, start_minute: int, end_minute: int, period: str) -> int:
+    """
+    Move the ARRIVED and CANCELLED flights departing in the month, and their Flight_Pilot rows, to the archive of the month.
+    Returns the number of flights moved.
+
+    SQLite does not commit a transaction atomically across a WAL database and an attached database, so the flights are first
+    copied to the archive (INSERT OR REPLACE, one transaction), then deleted from the main database in a second transaction.
+    Other writers can change the flights between the two, so the second one only deletes the flights whose row and pilots
+    are the same as their copy; the copies of the other flights are then removed from the archive, and the next run archives
+    them. If the second transaction does not complete, running the archive again completes it.
+    The archived flights still count in the summary tables, so the changes made by the delete triggers to the summary tables are
+    reverted in the same transaction. The changes they logged are removed and ChangeLogState.PurgedThroughSeq is moved past
+    them, like the retention policy does: the consumers of the change log (e.g., a route graph already built) re-read the tables
+    instead of seeing the archived flights as deleted.
+    """
+    flight_filter = f"FlightStatus IN ({', '.join('?' for _ in ARCHIVED_FLIGHT_STATUSES)}) AND DepartureMinute >= ? AND DepartureMinute < ?"
+    params = (*ARCHIVED_FLIGHT_STATUSES, start_minute, end_minute)
+    if not conn.execute(f"SELECT EXISTS (SELECT 1 FROM main.Flight WHERE {flight_filter});", params).fetchone()[0]:
+        return 0
+
+    get_archive_dir(conn).mkdir(exist_ok=True)
+    schema = attach_archive(conn, period, create=True)
+    try:
+        conn.executescript(ARCHIVE_SCHEMA_SQL.format(schema=schema))
+
+        # 1. Copy the flights and their pilots to the archive.
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            remove_unarchived_copies(conn, schema)
+            conn.execute(f"INSERT OR REPLACE INTO {schema}.Flight({ARCHIVED_FLIGHT_COLUMNS}) SELECT {ARCHIVED_FLIGHT_COLUMNS} FROM main.Flight WHERE {flight_filter};", params)
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {schema}.Flight_Pilot(FlightId, PilotId)
+                SELECT FlightId, PilotId FROM main.Flight_Pilot WHERE FlightId IN (SELECT FlightId FROM main.Flight WHERE {flight_filter});
+                """,
+                params,
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        # 2. Delete them from the main database, unless they (or their pilots) have changed since they were copied.
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            archived_flight_ids = json.dumps([flight_id for flight_id, in conn.execute(
+                f"""
+                SELECT f.FlightId
+                FROM main.Flight AS f
+                WHERE {flight_filter}
+                  AND ({ARCHIVED_FLIGHT_COLUMNS}) IN (SELECT {ARCHIVED_FLIGHT_COLUMNS} FROM {schema}.Flight)
+                  AND NOT EXISTS (SELECT PilotId FROM main.Flight_Pilot WHERE FlightId = f.FlightId
+                                  EXCEPT SELECT PilotId FROM {schema}.Flight_Pilot WHERE FlightId = f.FlightId)
+                  AND NOT EXISTS (SELECT PilotId FROM {schema}.Flight_Pilot WHERE FlightId = f.FlightId
+                                  EXCEPT SELECT PilotId FROM main.Flight_Pilot WHERE FlightId = f.FlightId);
+                """,
+                params,
+            )])
+            destination_counts = conn.execute(
+                "SELECT DestinationAirportId, COUNT(*) FROM main.Flight WHERE FlightId IN (SELECT value FROM json_each(?)) GROUP BY DestinationAirportId;",
+                (archived_flight_ids,),
+            ).fetchall()
+            pilot_counts = conn.execute(
+                "SELECT PilotId, COUNT(*) FROM main.Flight_Pilot WHERE FlightId IN (SELECT value FROM json_each(?)) GROUP BY PilotId;",
+                (archived_flight_ids,),
+            ).fetchall()
+            change_cursor = get_change_cursor(conn)
+
+            conn.execute("DELETE FROM main.Flight_Pilot WHERE FlightId IN (SELECT value FROM json_each(?));", (archived_flight_ids,))
+            n_flights = conn.execute("DELETE FROM main.Flight WHERE FlightId IN (SELECT value FROM json_each(?));", (archived_flight_ids,)).rowcount
+
+            conn.executemany("UPDATE DestinationFlightSummary SET FlightCount = FlightCount + ? WHERE DestinationId = ?;",
+                             [(n, destination_id) for destination_id, n in destination_counts])
+            conn.executemany("UPDATE PilotFlightSummary SET FlightCount = FlightCount + ? WHERE PilotId = ?;",
+                             [(n, pilot_id) for pilot_id, n in pilot_counts])
+            if n_flights:
+                conn.execute("DELETE FROM ChangeLog WHERE ChangeSeq > ?;", (change_cursor,))
+                conn.execute("UPDATE ChangeLogState SET PurgedThroughSeq = ? WHERE StateId = 1;", (get_change_cursor(conn),))
+
+            conn.executemany(
+                """
+                INSERT INTO ArchivedDestinationFlightCount(DestinationId, StartMinute, FlightCount) VALUES (?, ?, ?)
+                ON CONFLICT(DestinationId, StartMinute) DO UPDATE SET FlightCount = FlightCount + excluded.FlightCount;
+                """,
+                [(destination_id, start_minute, n) for destination_id, n in destination_counts],
+            )
+            conn.executemany(
+                """
+                INSERT INTO ArchivedPilotFlightCount(PilotId, StartMinute, FlightCount) VALUES (?, ?, ?)
+                ON CONFLICT(PilotId, StartMinute) DO UPDATE SET FlightCount = FlightCount + excluded.FlightCount;
+                """,
+                [(pilot_id, start_minute, n) for pilot_id, n in pilot_counts],
+            )
+            conn.execute(
+                """
+                INSERT INTO FlightArchivePartition(StartMinute, EndMinute, Period, FlightCount) VALUES (?, ?, ?, ?)
+                ON CONFLICT(StartMinute) DO UPDATE SET FlightCount = FlightCount + excluded.FlightCount;
+                """,
+                (start_minute, end_minute, period, n_flights),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        with conn:
+            remove_unarchived_copies(conn, schema)
+    finally:
+        conn.execute(f"DETACH DATABASE {schema};")
+    return n_flights
+
+def archive_flights(conn: sqlite3.Connection, before: str) -> list:
+    """
+    Archive the ARRIVED and CANCELLED flights of every month that ends before the time before (YYYY-MM-DD HH:MM), one month
+    at a time (see archive_month()). Returns (YYYY-MM, number of flights moved, archive file) for every month archived.
+    """
+    before_minute = to_epoch_minutes(before)
+    first_minutes = [conn.execute("SELECT MIN(DepartureMinute) FROM Flight WHERE FlightStatus = ?;", (status,)).fetchone()[0]
+                     for status in ARCHIVED_FLIGHT_STATUSES]
+    first_minutes = [minute for minute in first_minutes if minute is not None]
+    if not first_minutes:
+        return []
+
+    archived = []
+    start_minute, end_minute, period = get_month(min(first_minutes))
+    while end_minute <= before_minute:
+        n_flights = archive_month(conn, start_minute, end_minute, period)
+        if n_flights:
+            archived.append((period, n_flights, str(get_archive_dir(conn) / f"{period}.db")))
+        start_minute, end_minute, period = get_month(end_minute)
+    return archived
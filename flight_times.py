@@ -0,0 +1,173 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from summary_tables import PILOT_ASSIGNMENT_INTERVAL_QUERY
+
+# ==============================================================
+# Parameters
+# ==============================================================
+SCHEMA_SQL_PATH = Path(__file__).with_name("schema.sql")
+
+# Flight.DepartureMinute / DestinationArrivalMinute are stored as INTEGER minutes since 1970-01-01 00:00 (the times are local
+# airport times, so no time zone is applied). The generated columns DepartureTime / DestinationArrivalTime show them as text.
+FLIGHT_TIME_FORMAT = "%Y-%m-%d %H:%M"
+EPOCH = datetime(1970, 1, 1)
+ONE_MINUTE = timedelta(minutes=1)
+
+# Number of flights copied per transaction by the migration, and the pause between two batches (lets the other writers in).
+MIGRATION_BATCH_SIZE = 20_000
+MIGRATION_PAUSE_SECONDS = 0.01
+
+# Columns of the Flight table that are copied unchanged by the migration.
+FLIGHT_COPIED_COLUMNS = "FlightId, FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId"
+
+# ==============================================================
+# Convert flight times
+# ==============================================================
+def to_epoch_minutes(value) -> int:
+    """Convert a datetime, or a string in the format YYYY-MM-DD HH:MM, to the INTEGER stored in the database. Raises ValueError."""
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, FLIGHT_TIME_FORMAT)
+        except ValueError:
+            raise ValueError("Invalid datetime format. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30.") from None
+    return (value - EPOCH) // ONE_MINUTE
+
+def from_epoch_minutes(minutes: int) -> str:
+    """Convert an INTEGER flight time stored in the database to the format YYYY-MM-DD HH:MM."""
+    return (EPOCH + minutes * ONE_MINUTE).strftime(FLIGHT_TIME_FORMAT)
+
+# ==============================================================
+# Migrate a database that stores the flight times as text
+# ==============================================================
+def flight_times_are_text(conn: sqlite3.Connection) -> bool:
+    """Check whether the Flight table still has the TEXT DepartureTime / DestinationArrivalTime columns of the first schema version."""
+    columns = {name: hidden for _, name, _, _, _, _, hidden in conn.execute("PRAGMA table_xinfo(Flight);")}
+    return bool(columns) and "DepartureMinute" not in columns
+
+def iter_schema_statements(schema_sql: str):
+    """Yield the statements of schema.sql one at a time (the PRAGMA statements are skipped)."""
+    statement = ""
+    for line in schema_sql.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if not re.search(r"^\s*PRAGMA", statement, re.MULTILINE):
+                yield statement
+            statement = ""
+
+def migrate_flight_times(conn: sqlite3.Connection, batch_size: int = MIGRATION_BATCH_SIZE, pause_seconds: float = MIGRATION_PAUSE_SECONDS) -> int:
+    """
+    Convert the flight times of a database created with the TEXT columns to INTEGER minutes, while the database stays in use.
+    1. A new table with the current layout of Flight (Flight_migration) is created, and triggers on Flight copy every change
+       made during the migration to it.
+    2. The flights are copied in batches of batch_size, each batch in its own short transaction.
+    3. One final transaction copies the last flights, replaces Flight with Flight_migration and re-creates the indices,
+       triggers and PilotAssignmentInterval from schema.sql. Only this step blocks the other writers (readers are not blocked in WAL mode).
+    Returns the number of flights migrated (0 if the database already uses the INTEGER columns).
+    Raises ValueError, before anything is changed, if a flight time is not in the format YYYY-MM-DD HH:MM.
+    """
+    if not flight_times_are_text(conn):
+        return 0
+
+    invalid_flights = [flight_number for (flight_number,) in conn.execute(
+        """
+        SELECT FlightNumber
+        FROM Flight
+        WHERE strftime('%Y-%m-%d %H:%M', DepartureTime) IS NOT DepartureTime
+           OR strftime('%Y-%m-%d %H:%M', DestinationArrivalTime) IS NOT DestinationArrivalTime
+        LIMIT 10;
+        """
+    )]
+    if invalid_flights:
+        raise ValueError(f"Flight times not in the format YYYY-MM-DD HH:MM (flights {', '.join(invalid_flights)}). Please, correct them first.")
+
+    schema_sql = SCHEMA_SQL_PATH.read_text(encoding="utf-8")
+    flight_table_sql = re.search(r"CREATE TABLE IF NOT EXISTS Flight \(.*?\n\);", schema_sql, re.DOTALL).group(0)
+    converted_columns = "unixepoch(DepartureTime) / 60, unixepoch(DestinationArrivalTime) / 60, FlightStatus"
+    migrated_columns = f"{FLIGHT_COPIED_COLUMNS}, DepartureMinute, DestinationArrivalMinute, FlightStatus"
+    copy_batch_sql = f"""
+        INSERT OR IGNORE INTO Flight_migration({migrated_columns})
+        SELECT {FLIGHT_COPIED_COLUMNS}, {converted_columns} FROM Flight WHERE FlightId > ? AND FlightId <= ?;
+    """
+    new_values = ", ".join(f"NEW.{column}" for column in FLIGHT_COPIED_COLUMNS.split(", "))
+
+    # 1. New table and the triggers that keep it up to date with the changes made during the migration.
+    with conn:
+        conn.execute(flight_table_sql.replace("Flight (", "Flight_migration (", 1))
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_flight_migration_insert AFTER INSERT ON Flight
+            BEGIN
+                INSERT OR REPLACE INTO Flight_migration({migrated_columns})
+                VALUES ({new_values}, unixepoch(NEW.DepartureTime) / 60, unixepoch(NEW.DestinationArrivalTime) / 60, NEW.FlightStatus);
+            END;
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_flight_migration_update AFTER UPDATE ON Flight
+            BEGIN
+                DELETE FROM Flight_migration WHERE FlightId = OLD.FlightId;
+                INSERT OR REPLACE INTO Flight_migration({migrated_columns})
+                VALUES ({new_values}, unixepoch(NEW.DepartureTime) / 60, unixepoch(NEW.DestinationArrivalTime) / 60, NEW.FlightStatus);
+            END;
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_flight_migration_delete AFTER DELETE ON Flight
+            BEGIN
+                DELETE FROM Flight_migration WHERE FlightId = OLD.FlightId;
+            END;
+        """)
+
+    # 2. Copy the flights in batches (rows already copied by the triggers are kept, as they are more recent).
+    last_flight_id = 0
+    while True:
+        batch_end = conn.execute(
+            "SELECT MAX(FlightId) FROM (SELECT FlightId FROM Flight WHERE FlightId > ? ORDER BY FlightId LIMIT ?);",
+            (last_flight_id, batch_size),
+        ).fetchone()[0]
+        if batch_end is None:
+            break
+        with conn:
+            conn.execute(copy_batch_sql, (last_flight_id, batch_end))
+        last_flight_id = batch_end
+        time.sleep(pause_seconds)
+
+    # 3. Swap the tables in one transaction. Foreign keys are disabled so that dropping Flight does not cascade to Flight_Pilot.
+    foreign_keys = conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("PRAGMA legacy_alter_table = ON;")
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.execute(copy_batch_sql, (last_flight_id, 2 ** 63 - 1))
+        n_flights = conn.execute("SELECT COUNT(*) FROM Flight;").fetchone()[0]
+        if conn.execute("SELECT COUNT(*) FROM Flight_migration;").fetchone()[0] != n_flights:
+            raise sqlite3.DatabaseError("The migrated Flight table does not have the same number of rows as the original table.")
+
+        # Triggers and tables that refer to the TEXT columns are dropped and re-created from schema.sql.
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Flight';").fetchone()
+        for (trigger_name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND sql LIKE '%DepartureTime%';").fetchall():
+            conn.execute(f"DROP TRIGGER {trigger_name};")
+        conn.execute("DROP TABLE IF EXISTS PilotAssignmentInterval;")
+        conn.execute("DROP TABLE Flight;")
+        conn.execute("ALTER TABLE Flight_migration RENAME TO Flight;")
+        if sequence:
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'Flight';", sequence)
+        for statement in iter_schema_statements(schema_sql):
+            conn.execute(statement)
+        conn.execute("DELETE FROM PilotAssignmentInterval;")
+        conn.execute(f"INSERT INTO PilotAssignmentInterval(FlightId, PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus) {PILOT_ASSIGNMENT_INTERVAL_QUERY};")
+
+        if conn.execute("PRAGMA foreign_key_check;").fetchone():
+            raise sqlite3.IntegrityError("The migrated database has foreign key violations.")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF;")
+        conn.execute(f"PRAGMA foreign_keys = {foreign_keys};")
+    return n_flights
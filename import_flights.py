@@ -0,0 +1,194 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from main import DB_PATH, NOCASE_TRANSLATION, open_database, validate_new_flight
+from seed_data import batched
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Number of rows validated and inserted per transaction.
+IMPORT_BATCH_SIZE = 5000
+
+# Columns expected in the CSV header / JSON Lines objects.
+IMPORT_COLUMNS = (
+    "FlightNumber",
+    "AircraftModel",
+    "DepartureAirportCode",
+    "DestinationAirportCode",
+    "DepartureTime",
+    "DestinationArrivalTime",
+    "FlightStatus",
+)
+
+# ==============================================================
+# Read the input file
+# ==============================================================
+class RejectedRowWriter:
+    """Writes the rejected rows, with the reason for the rejection, to a CSV or JSON Lines file (opened on the first rejected row)."""
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, row: dict, error: str) -> None:
+        if self.file is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            if self.path.suffix.lower() not in (".jsonl", ".ndjson"):
+                self.writer = csv.DictWriter(self.file, fieldnames=[*IMPORT_COLUMNS, "Error"], extrasaction="ignore")
+                self.writer.writeheader()
+
+        if self.writer is None:
+            self.file.write(json.dumps({**row, "Error": error}) + "\n")
+        else:
+            self.writer.writerow({**row, "Error": error})
+        self.count += 1
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+def read_rows(path: Path, rejected_rows: RejectedRowWriter):
+    """
+    Yield the rows of a CSV (with a header) or JSON Lines file as dictionaries, one at a time.
+    A JSON Lines line that is not a JSON object is written to rejected_rows with its line number, and the import goes on.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    rejected_rows.write({}, f"Line {line_number}: invalid JSON ({e}).")
+                    continue
+                if not isinstance(row, dict):
+                    rejected_rows.write({}, f"Line {line_number}: expected a JSON object, got {type(row).__name__}.")
+                    continue
+                yield row
+        else:
+            yield from csv.DictReader(f)
+
+# ==============================================================
+# Validate and insert flights
+# ==============================================================
+def validate_row(conn: sqlite3.Connection, row: dict):
+    """
+    Run the checks of add_new_flight() on one row (except the uniqueness of the flight number, which is checked per batch).
+    Returns (flight, None) for a valid row, where flight is the tuple of values to insert, or (None, error) otherwise.
+    """
+    values = {column: str(row.get(column) or "").strip() for column in IMPORT_COLUMNS}
+    missing_columns = [column for column, value in values.items() if not value]
+    if missing_columns:
+        return None, f"Missing value(s): {', '.join(missing_columns)}."
+
+    # Aircraft and airport codes are resolved in memory by the reference data caches (each table is loaded once).
+    try:
+        flight = (values["FlightNumber"], *validate_new_flight(
+            conn,
+            values["AircraftModel"],
+            values["DepartureAirportCode"],
+            values["DestinationAirportCode"],
+            values["DepartureTime"],
+            values["DestinationArrivalTime"],
+            values["FlightStatus"],
+        ))
+    except ValueError as e:
+        return None, str(e)
+    return flight, None
+
+def existing_flight_numbers(conn: sqlite3.Connection, flight_numbers: list) -> set:
+    """Return the flight numbers (folded like COLLATE NOCASE) of the given list that already exist in the database."""
+    placeholders = ", ".join("?" for _ in flight_numbers)
+    rows = conn.execute(f"SELECT FlightNumber FROM Flight WHERE FlightNumber COLLATE NOCASE IN ({placeholders});", flight_numbers)
+    return {flight_number.translate(NOCASE_TRANSLATION) for (flight_number,) in rows}
+
+def import_batch(conn: sqlite3.Connection, rows: list, rejected_rows: RejectedRowWriter) -> int:
+    """Validate a batch of rows and insert the valid flights in one transaction. Returns the number of inserted flights."""
+    validated_rows = []
+    for row in rows:
+        flight, error = validate_row(conn, row)
+        if error:
+            rejected_rows.write(row, error)
+        else:
+            validated_rows.append((row, flight))
+    if not validated_rows:
+        return 0
+
+    # FlightNumber - TEXT NOT NULL UNIQUE: checked against the database and the previous rows of the file with one query per batch.
+    taken_flight_numbers = existing_flight_numbers(conn, [flight[0] for _, flight in validated_rows])
+    flights = []
+    for row, flight in validated_rows:
+        key = flight[0].translate(NOCASE_TRANSLATION)
+        if key in taken_flight_numbers:
+            rejected_rows.write(row, "Flight number already exists.")
+            continue
+        taken_flight_numbers.add(key)
+        flights.append(flight)
+
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO Flight(FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+            """,
+            flights,
+        )
+    return len(flights)
+
+def import_flights(conn: sqlite3.Connection, path: Path, errors_path: Path, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """Stream the flights of a CSV or JSON Lines file into the database in batched transactions and report the import statistics."""
+    rejected_rows = RejectedRowWriter(errors_path)
+    n_inserted = 0
+    start = time.perf_counter()
+    try:
+        for batch in batched(read_rows(path, rejected_rows), batch_size):
+            n_inserted += import_batch(conn, batch, rejected_rows)
+    finally:
+        rejected_rows.close()
+    elapsed = time.perf_counter() - start
+    n_rows = n_inserted + rejected_rows.count
+
+    return {
+        "rows": n_rows,
+        "inserted": n_inserted,
+        "rejected": rejected_rows.count,
+        "seconds": elapsed,
+        "rows_per_second": n_rows / elapsed if elapsed else 0.0,
+    }
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main() -> None:
+    """Import flights from a CSV or JSON Lines file without user interaction."""
+    parser = argparse.ArgumentParser(description="Import flights from a CSV or JSON Lines file.")
+    parser.add_argument("path", type=Path, help=f"CSV (with a header) or JSON Lines file with the columns {', '.join(IMPORT_COLUMNS)}.")
+    parser.add_argument("--errors", type=Path, help="File for the rejected rows (default: <path>.rejected<suffix>).")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Path to the SQLite database file.")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Number of rows inserted per transaction.")
+    args = parser.parse_args()
+
+    errors_path = args.errors or args.path.with_name(f"{args.path.stem}.rejected{args.path.suffix}")
+    db = open_database(args.db)
+    try:
+        statistics = import_flights(db.writer, args.path, errors_path, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Read {statistics['rows']:,} rows in {statistics['seconds']:.2f} s ({statistics['rows_per_second']:,.0f} rows/s).")
+    print(f"Inserted {statistics['inserted']:,} flights.")
+    if statistics["rejected"]:
+        print(f"Rejected {statistics['rejected']:,} rows. See {errors_path} for the reasons.")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,106 @@
 # ==============================================================
 # Import libraries 
 # ==============================================================
+import argparse
+import heapq
+import json
 import sqlite3
+import string
+import sys
+import threading
+from contextlib import redirect_stdout
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
+from itertools import chain, islice
+
+from seed_data import batched, database_is_populated
+from flight_times import MIGRATION_BATCH_SIZE, flight_times_are_text, migrate_flight_times, to_epoch_minutes
+from change_log import CHANGE_LOG_MAX_CHANGES, CHANGE_LOG_RETENTION_DAYS, compact_change_log, get_change_cursor, iter_changes
+from flight_archive import ARCHIVE_HEADERS, ARCHIVED_FLIGHT_STATUSES, archive_flights, find_archive_periods, find_pilot_archive_periods, iter_archive_rows
+from crew_assignment import UNCOVERED_FLIGHT_HEADERS, auto_assign_pilots
+from pilot_conflicts import PILOT_CONFLICT_HEADERS, audit_pilot_assignments
+from search_index import SEARCH_KINDS, SEARCH_RESULT_HEADERS, SEARCH_RESULT_LIMIT, ensure_search_index, rebuild_search_index, search, suggest
+from query_log import SLOW_QUERY_LOG_PATH, SLOW_QUERY_THRESHOLD_MS, InstrumentedConnection, QueryLog, query_operation
+from result_cache import RESULT_CACHE_MAX_ROWS, RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS, CachingConnection, QueryResultCache
+from result_renderer import OUTPUT_FORMATS, BufferedOutput, render_rows
+from summary_tables import ensure_summary_tables, rebuild_summary_tables, verify_summary_tables
 
 # ==============================================================
 # Parameters
 # ==============================================================
 DB_PATH = Path("./flight_management.db")
-SCHEMA_SQL_PATH = Path("./schema.sql")
+SCHEMA_SQL_PATH = Path(__file__).with_name("schema.sql")
+
+# Maximum number of rows kept in the LRU caches of the Pilot and Flight tables.
+PILOT_CACHE_SIZE = 1024
+FLIGHT_CACHE_SIZE = 4096
+
+# Connection profiles: pragma settings applied to every connection opened by connect_db().
+# journal_mode and synchronous only apply to read-write connections.
+CONNECTION_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",       # Readers do not block the writer and the writer does not block readers.
+        "synchronous": "NORMAL",     # Safe in WAL mode; a power loss may only lose the last transactions.
+        "cache_size": -65536,        # 64 MiB page cache per connection.
+        "mmap_size": 268435456,      # Memory-map up to 256 MiB of the database file.
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # Wait up to 5 s for a lock instead of failing with "database is locked".
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -65536,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+    "low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -2048,
+        "mmap_size": 0,
+        "temp_store": "FILE",
+        "busy_timeout": 5000,
+    },
+}
+DEFAULT_CONNECTION_PROFILE = "default"
+
+# One flight of the flight information printed by the menu (see pretty_printing_flight_information()).
+FLIGHT_INFORMATION_TEMPLATE = (
+    "Flight {0} :\n"
+    "\tFlight Number: {1}\n"
+    "\tDeparture Time: {2}\n"
+    "\tDestination Arrival Time: {3}\n"
+    "\tFlight Status: {4}\n"
+    "\tDestination Airport Code: {5}\n"
+    "\tDestination Airport Name: {6}\n"
+    "\tDestination City: {7}\n"
+    "\tDestination Country: {8}\n"
+    "\tTerminal: {9}\n"
+    + "-" * 80 + "\n"
+)
+
+# Number of flights per page of the flight search (menu / command-line interface).
+FLIGHT_SEARCH_PAGE_SIZE = 20
+FLIGHT_EXPORT_PAGE_SIZE = 1000
+
+# Minimum rest, in minutes, between the arrival of a pilot's flight and the departure of their next flight.
+MIN_REST_MINUTES = 60
+
+# Number of pilots that the automatic crew assignment assigns to each flight.
+PILOTS_PER_FLIGHT = 2
+
+# Tables changed by the writes of the menu, directly or by the triggers of schema.sql. The cached query results that read
+# them are dropped when the write commits (see result_cache.py).
+FLIGHT_WRITE_TABLES = ("Flight", "DestinationFlightSummary", "PilotAssignmentInterval", "ChangeLog")
+ASSIGNMENT_WRITE_TABLES = ("Flight_Pilot", "PilotFlightSummary", "PilotAssignmentInterval", "ChangeLog")
+
+# Number of prepared statements kept by each connection (the sqlite3 default is 128).
+STATEMENT_CACHE_SIZE = 256
+
+# Number of statements listed by the query statistics (--query-log), the slowest in total first.
+QUERY_STATISTICS_LIMIT = 20
 
 # ==============================================================
 # Global variables
@@ -19,20 +110,157 @@ valid_flight_statuses = ('SCHEDULED', 'DELAYED', 'CANCELLED', 'DEPARTED', 'ARRIV
 # ==============================================================
 # Initialise database
 # ==============================================================
-def connect_db() -> sqlite3.Connection:
-    """Open a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
+def connect_db(db_path: Path = DB_PATH, read_only: bool = False, profile: str = DEFAULT_CONNECTION_PROFILE, query_log: QueryLog = None) -> sqlite3.Connection:
+    """
+    Open a connection to the SQLite database and apply the pragma settings of the connection profile.
+    A read-only connection cannot modify the database; the database file must already exist.
+    With a query_log, every statement sent by the connection is timed and counted (see query_log.py); without it, the plain
+    sqlite3 connection is returned, so the instrumentation costs nothing when it is disabled.
+    """
+    settings = CONNECTION_PROFILES[profile]
+    factory = InstrumentedConnection if query_log else sqlite3.Connection
+    if read_only:
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE, factory=factory)
+    else:
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE, factory=factory)
+    if query_log:
+        conn.query_log = query_log
+
+    # busy_timeout first, so that the remaining pragmas wait for locks held by other connections.
+    conn.execute(f"PRAGMA busy_timeout = {settings['busy_timeout']};")
+    if not read_only:
+        conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']};")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']};")
+    conn.execute(f"PRAGMA cache_size = {settings['cache_size']};")
+    conn.execute(f"PRAGMA mmap_size = {settings['mmap_size']};")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']};")
     # Enable foreign key suport in SQLite
     conn.execute("PRAGMA foreign_keys = ON;") 
     return conn
 
+class ConnectionManager:
+    """
+    Hands out the connections used by the menu functions: one read-write connection for the writes
+    and one read-only connection for the queries. Both are opened on first use with the same connection profile
+    (and the same query log, if the statements are instrumented).
+    """
+    def __init__(self, db_path: Path = DB_PATH, profile: str = DEFAULT_CONNECTION_PROFILE, query_log: QueryLog = None):
+        self.db_path = db_path
+        self.profile = profile
+        self.query_log = query_log
+        self._writer = None
+        self._reader = None
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        """The read-write connection."""
+        if self._writer is None:
+            self._writer = connect_db(self.db_path, profile=self.profile, query_log=self.query_log)
+        return self._writer
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """The read-only connection. The read-write connection is opened first, so that the database file exists and is in WAL mode."""
+        if self._reader is None:
+            self.writer
+            self._reader = connect_db(self.db_path, read_only=True, profile=self.profile, query_log=self.query_log)
+        return self._reader
+
+    @property
+    def cached_reader(self) -> CachingConnection:
+        """The read-only connection, answering the repeated queries of the menu from query_result_cache."""
+        return CachingConnection(self.reader, query_result_cache, self.writer)
+
+    def close(self) -> None:
+        """Close the opened connections."""
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+
+def apply_schema_sql(conn: sqlite3.Connection) -> None:
+    """Create the tables, indices and triggers of schema.sql that do not exist yet, then fill the summary tables and search indices."""
+    conn.executescript(SCHEMA_SQL_PATH.read_text(encoding="utf-8"))
+    ensure_summary_tables(conn)
+    ensure_search_index(conn)
+
+def create_flight_archive_tables(conn: sqlite3.Connection) -> None:
+    """Create the tables listing the archived months and their flight counts (see the flight archive partitions of schema.sql)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS FlightArchivePartition (
+            StartMinute         INTEGER PRIMARY KEY,
+            EndMinute           INTEGER NOT NULL,
+            Period              TEXT NOT NULL UNIQUE,
+            FlightCount         INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ArchivedDestinationFlightCount (
+            DestinationId       INTEGER NOT NULL,
+            StartMinute         INTEGER NOT NULL,
+            FlightCount         INTEGER NOT NULL,
+
+            PRIMARY KEY (DestinationId, StartMinute)
+        ) WITHOUT ROWID;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ArchivedPilotFlightCount (
+            PilotId             INTEGER NOT NULL,
+            StartMinute         INTEGER NOT NULL,
+            FlightCount         INTEGER NOT NULL,
+
+            PRIMARY KEY (PilotId, StartMinute)
+        ) WITHOUT ROWID;
+        """
+    )
+
+def create_flight_aircraft_index(conn: sqlite3.Connection) -> None:
+    """Create the index of the foreign key Flight.AircraftId (see schema.sql)."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_flight_aircraft ON Flight(AircraftId);")
+
+# Numbered schema migrations: version -> (description, function applying it to the connection). The version of a database is
+# stored in PRAGMA user_version and only the migrations above it are applied, in order, each in its own transaction.
+# Version 1 runs schema.sql, which always holds the complete current schema, so it also completes the databases created
+# before the schema was versioned. The later versions only create what they add (also in schema.sql), so a migration does the
+# same work whatever the program version applying it. Append new versions; never change one that has been released.
+SCHEMA_MIGRATIONS = {
+    1: ("Tables, indices and triggers of schema.sql", apply_schema_sql),
+    2: ("Flight archive partitions (FlightArchivePartition, ArchivedDestinationFlightCount, ArchivedPilotFlightCount)", create_flight_archive_tables),
+    3: ("Index of the foreign key Flight.AircraftId", create_flight_aircraft_index),
+}
+SCHEMA_VERSION = max(SCHEMA_MIGRATIONS)
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version of the database (0 for a new database or one created before the schema was versioned)."""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+def migrate_schema(conn: sqlite3.Connection) -> list:
+    """
+    Apply the pending schema migrations and return the versions applied (none if the database is up to date, which costs
+    one PRAGMA). Raises ValueError if the database was created by a newer version of the program.
+    """
+    current_version = get_schema_version(conn)
+    if current_version > SCHEMA_VERSION:
+        raise ValueError(f"The database has schema version {current_version}, newer than the version {SCHEMA_VERSION} of this program.")
+    applied_versions = []
+    for version in range(current_version + 1, SCHEMA_VERSION + 1):
+        _, migration = SCHEMA_MIGRATIONS[version]
+        with conn:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version};")
+        applied_versions.append(version)
+    return applied_versions
+
 def initialise_db(conn: sqlite3.Connection) -> None:
-    """Initilise the database by executing the database schema SQL scripts."""
+    """Initilise the database by applying the schema migrations it has not had yet."""
     try:
-        schema_sql = SCHEMA_SQL_PATH.read_text(encoding="utf-8")
-        conn.executescript(schema_sql)
-        conn.commit()
-        print("\nDatabase initialised successfully.\n")
+        if migrate_schema(conn):
+            print(f"\nDatabase initialised successfully (schema version {SCHEMA_VERSION}).\n")
     except FileNotFoundError:
         print(f"\nError. Database not initialised. File {SCHEMA_SQL_PATH} not found.\n")
 
@@ -40,7 +268,10 @@ def initialise_db(conn: sqlite3.Connection) -> None:
 # Populate database with mock data
 # ==============================================================
 def populate_db(conn: sqlite3.Connection) -> None:
-    """"Populate the database with mock data."""
+    """"Populate the database with mock data. Nothing is inserted if the database already contains data."""
+    if database_is_populated(conn):
+        print("Database already contains data. Mock data not inserted.")
+        return
 
     # Generated mock data.
     aircraft = [
@@ -156,14 +387,16 @@ def populate_db(conn: sqlite3.Connection) -> None:
         print("Inserted data into Pilot table successfully.")
 
         # Flight table
-        conn.executemany("INSERT INTO Flight(FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureTime, DestinationArrivalTime, FlightStatus) VALUES (?, ?, ?, ?, ?, ?, ?);", 
-                        flights)
+        conn.executemany("INSERT INTO Flight(FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus) VALUES (?, ?, ?, ?, ?, ?, ?);", 
+                        [(*flight[:4], to_epoch_minutes(flight[4]), to_epoch_minutes(flight[5]), flight[6]) for flight in flights])
         print("Inserted data into Flight table successfully.")
 
         # Flight_Pilot table
         conn.executemany("INSERT INTO Flight_Pilot(FlightId, PilotId) VALUES (?, ?);",
                         flight_pilots)
         print("Inserted data into Flight_Pilot table successfully.")
+    invalidate_reference_data_caches()
+    query_result_cache.clear()
 
 # ==============================================================
 # Define helper functions 
@@ -202,42 +435,685 @@ def get_valid_datetime_input(value: str) -> datetime:
         except ValueError:
             print("\t\tInvalid datetime format. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30. Please, try again.")
 
-def pretty_printing_flight_information(flight_info_list: list) -> None:
-    """Helper function that prints the obtained flight information in a more user-friendly format."""""
-    if not flight_info_list:
+def get_optional_datetime_input(value: str) -> str:
+    """Helper function that returns a valid datetime string in the database format, or an empty string if the input is skipped."""
+    while True:
+        s = input(value).strip()
+        if not s:
+            return ""
+        try:
+            return datetime.strptime(s, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            print("\t\tInvalid datetime format. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30. Please, try again.")
+
+def pretty_printing_flight_information(flight_info_list: list, first_flight_idx: int = 0) -> None:
+    """
+    Helper function that prints the obtained flight information in a more user-friendly format.
+    For the pages after the first one, first_flight_idx is the number of flights already printed.
+    """
+    if not flight_info_list and not first_flight_idx:
         print("\t\tNo flight information to display. Please, check your criteria and try again.")
         return
 
-    print("\nFlight Information:")
-    print("-" * 80)
-    for flight_idx, flight in enumerate(flight_info_list):
-        print("Flight", flight_idx + 1, ":")
-        print(f"\tFlight Number: {flight[0]}")
-        print(f"\tDeparture Time: {flight[1]}")
-        print(f"\tDestination Arrival Time: {flight[2]}")
-        print(f"\tFlight Status: {flight[3]}")
-        print(f"\tDestination Airport Code: {flight[4]}")
-        print(f"\tDestination Airport Name: {flight[5]}")
-        print(f"\tDestination City: {flight[6]}")
-        print(f"\tDestination Country: {flight[7]}")
-        print(f"\tTerminal: {flight[8]}")
-        print("-" * 80)
+    with BufferedOutput() as output:
+        if not first_flight_idx:
+            output.write("\nFlight Information:\n" + "-" * 80 + "\n")
+        for flight_idx, flight in enumerate(flight_info_list, start=first_flight_idx):
+            output.write(FLIGHT_INFORMATION_TEMPLATE.format(flight_idx + 1, *flight[:9]))
 
 def print_table(rows, headers):
-    """Helper function to display a pilot's schedule in a user-friendly, tabular format."""
-    # Combine table headers and underlying data to calculate column widths
-    data = [headers] + rows
-    widths = [max(len(str(row[i])) for row in data) for i in range(len(headers))]
+    """Helper function to display query results (any iterable of rows, e.g., a cursor) in a user-friendly, tabular format."""
+    render_rows(rows, headers, "table")
+
+def build_flight_filter(destination_airport_ids=(), departure_airport_ids=(), departure_from: str = "", departure_to: str = "", flight_statuses=()) -> tuple:
+    """
+    Helper function that builds the conditions (and their parameters) that select the flights matching the criteria, on the alias f.
+    A condition is added for each criterion that is provided (not empty); the date range includes both ends.
+    The times (YYYY-MM-DD HH:MM) are converted to the INTEGER minutes of DepartureMinute.
+    """
+    conditions = ""
+    params = []
+    if destination_airport_ids:
+        conditions += f" AND f.DestinationAirportId IN ({', '.join('?' for _ in destination_airport_ids)})"
+        params.extend(destination_airport_ids)
+    if departure_airport_ids:
+        conditions += f" AND f.DepartureAirportId IN ({', '.join('?' for _ in departure_airport_ids)})"
+        params.extend(departure_airport_ids)
+    if departure_from:
+        conditions += " AND f.DepartureMinute >= ?"
+        params.append(to_epoch_minutes(departure_from))
+    if departure_to:
+        conditions += " AND f.DepartureMinute <= ?"
+        params.append(to_epoch_minutes(departure_to))
+    if flight_statuses:
+        conditions += f" AND f.FlightStatus IN ({', '.join('?' for _ in flight_statuses)})"
+        params.extend(flight_statuses)
+    return conditions, params
+
+def build_flight_search_query(destination_airport_ids=(), departure_airport_ids=(), departure_from: str = "", departure_to: str = "",
+                              flight_statuses=(), after: tuple = None, schema: str = None) -> tuple:
+    """
+    Helper function that builds the SQL query (and its parameters) of one page of the flight search (see build_flight_filter()).
+    The flights are ordered by (DepartureTime, FlightId) and the page starts after the key given by after (keyset pagination),
+    so every page is an index range scan however deep into the results it is. The page size is the last parameter.
+    With a schema (an attached archive), the flights of that archive are searched instead of those of the Flight table.
+    """
+    # Specify template SQL query that will be amended depending on the chosen criteria.
+    template_sql_query_for_viewing_flights = """
+        SELECT 
+            f.FlightNumber AS "Flight Number",
+            f.DepartureTime AS "Departure Time",
+            f.DestinationArrivalTime AS "Destination Arrival Time",
+            f.FlightStatus AS "Flight Status",
+            d.AirportCode AS "Destination Airport Code",
+            d.AirportName AS "Destination Airport Name",
+            d.City AS "Destination City",
+            d.Country AS "Destination Country",
+            d.Terminal AS "Destination Terminal",
+            f.FlightId
+        FROM {flight_table} AS f
+        LEFT JOIN Destination AS d
+            ON f.DestinationAirportId = d.DestinationId
+        WHERE 1=1
+    """
+
+    template_sql_query_for_viewing_flights = template_sql_query_for_viewing_flights.format(flight_table=f"{schema}.Flight" if schema else "Flight")
+
+    # Augment the template SQL query based on the specified criteria.
+    conditions, params = build_flight_filter(destination_airport_ids, departure_airport_ids, departure_from, departure_to, flight_statuses)
+    template_sql_query_for_viewing_flights += conditions
+    if after:
+        template_sql_query_for_viewing_flights += " AND (f.DepartureMinute, f.FlightId) > (?, ?)"
+        params.extend((to_epoch_minutes(after[0]), after[1]))
+
+    template_sql_query_for_viewing_flights += " ORDER BY f.DepartureMinute, f.FlightId LIMIT ?"
+    return template_sql_query_for_viewing_flights, params
+
+# ==============================================================
+# Reference data cache
+# ==============================================================
+# COLLATE NOCASE only folds the 26 ASCII letters, so the cache keys are folded the same way.
+NOCASE_TRANSLATION = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+class ReferenceDataCache:
+    """
+    In-memory cache of look-ups by code (e.g., AirportCode -> DestinationId) that matches codes like COLLATE NOCASE.
+
+    If max_size is None, the whole table is loaded on first use (for the small, mostly-static tables) and the sql must
+    select every row with the code as the first column. Otherwise, the sql must select the row of one code (one ? parameter);
+    rows are fetched on demand and the least recently used rows are evicted once max_size rows are cached.
+    Codes that are not found are not cached, so rows added by other processes are found on the next look-up.
+    The cache can be shared by threads that each pass their own connection (e.g., the read pool of service.py).
+    """
+    def __init__(self, name: str, sql: str, max_size: int = None):
+        self.name = name
+        self.sql = sql
+        self.max_size = max_size
+        self.rows = None if max_size is None else OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, conn: sqlite3.Connection, code: str):
+        """Return the row of the code, or None if the code is not found."""
+        key = code.translate(NOCASE_TRANSLATION)
+
+        # Fully loaded table: every look-up after the first one is answered from memory.
+        if self.max_size is None:
+            rows = self.rows
+            if rows is None:
+                rows = {}
+                for row in conn.execute(self.sql):
+                    # Keep the first row of duplicated codes, like fetchone() on the equivalent look-up query.
+                    rows.setdefault(row[0].translate(NOCASE_TRANSLATION), row)
+                with self._lock:
+                    self.misses += 1
+                    self.rows = rows
+            else:
+                with self._lock:
+                    self.hits += 1
+            return rows.get(key)
+
+        # LRU-bounded table.
+        with self._lock:
+            row = self.rows.get(key)
+            if row is not None:
+                self.hits += 1
+                self.rows.move_to_end(key)
+                return row
+            self.misses += 1
+
+        row = conn.execute(self.sql, (code,)).fetchone()
+        if row:
+            with self._lock:
+                self.rows[key] = row
+                if len(self.rows) > self.max_size:
+                    self.rows.popitem(last=False)
+        return row
+
+    def invalidate(self, code: str = None) -> None:
+        """Drop the cached row of the code, or the whole cache if no code is given."""
+        with self._lock:
+            if code is None:
+                self.rows = None if self.max_size is None else OrderedDict()
+            elif self.max_size is None:
+                self.rows = None
+            else:
+                self.rows.pop(code.translate(NOCASE_TRANSLATION), None)
+
+    def hit_rate(self) -> float:
+        """Share of the look-ups answered from memory."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+aircraft_cache = ReferenceDataCache("Aircraft", "SELECT Model, AircraftId FROM Aircraft ORDER BY AircraftId;")
+destination_cache = ReferenceDataCache("Destination", "SELECT AirportCode, DestinationId FROM Destination ORDER BY DestinationId;")
+pilot_cache = ReferenceDataCache(
+    "Pilot",
+    "SELECT LicenseNumber, FirstName, LastName, IsActive, PilotId FROM Pilot WHERE LicenseNumber = ? COLLATE NOCASE;",
+    max_size=PILOT_CACHE_SIZE,
+)
+flight_cache = ReferenceDataCache(
+    "Flight",
+    "SELECT FlightNumber, FlightId FROM Flight WHERE FlightNumber = ? COLLATE NOCASE;",
+    max_size=FLIGHT_CACHE_SIZE,
+)
+reference_data_caches = (aircraft_cache, destination_cache, pilot_cache, flight_cache)
+
+# Results of the flight searches, pilot schedules and summaries of the menu (see ConnectionManager.cached_reader).
+query_result_cache = QueryResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_MAX_ROWS)
+
+def invalidate_reference_data_caches() -> None:
+    """Drop every cached row, e.g., after the database has been (re-)populated."""
+    for cache in reference_data_caches:
+        cache.invalidate()
+
+def print_cache_statistics() -> None:
+    """Print the hit/miss counters of the reference data caches and of the query result cache."""
+    rows = [(cache.name, cache.hits, cache.misses, f"{cache.hit_rate():.0%}") for cache in reference_data_caches]
+    rows.append(("Query results", query_result_cache.hits, query_result_cache.misses, f"{query_result_cache.hit_rate():.0%}"))
+    print_table(rows, ["Cache", "Hits", "Misses", "Hit Rate"])
+    print(f"Query result cache: {len(query_result_cache.entries)} of {query_result_cache.max_entries} results cached, "
+          f"{query_result_cache.evictions} evicted, {query_result_cache.expirations} expired, {query_result_cache.invalidations} invalidated by writes, "
+          f"{query_result_cache.uncached} too large to cache.")
+
+def print_query_statistics(query_log: QueryLog) -> None:
+    """Print the counters of the instrumented statements (the slowest in total first) and the number of slow queries logged."""
+    rows = [(operation, statement if len(statement) <= 80 else statement[:77] + "...", calls, n_rows, f"{total_ms:.1f}", f"{mean_ms:.2f}", f"{max_ms:.2f}")
+            for operation, statement, calls, n_rows, total_ms, mean_ms, max_ms in query_log.summary(QUERY_STATISTICS_LIMIT)]
+    print_table(rows, ["Operation", "Statement", "Calls", "Rows", "Total (ms)", "Mean (ms)", "Max (ms)"])
+    print(f"{query_log.n_slow_queries} statement(s) slower than {query_log.slow_query_threshold * 1000:g} ms written to {query_log.slow_query_log_path}.")
+
+def format_suggestions(conn: sqlite3.Connection, kind: str, code: str) -> str:
+    """Return a "Did you mean" hint with the closest airports, aircraft models or pilots to a code not found (see search_index.py)."""
+    suggestions = suggest(conn, kind, code)
+    if not suggestions:
+        return ""
+    return " Did you mean: " + ", ".join(code if code == description else f"{code} ({description})" for code, description in suggestions) + "?"
+
+def get_optional_airport_ids_input(conn: sqlite3.Connection, value: str) -> list:
+    """Helper function that asks for comma-separated airport codes until all of them are found, and returns their DestinationIds."""
+    while True:
+        airport_codes = [code.strip() for code in input(value).split(",") if code.strip()]
+        airports = [destination_cache.get(conn, code) for code in airport_codes]
+        unknown_codes = [code for code, airport in zip(airport_codes, airports) if not airport]
+        if not unknown_codes:
+            return [airport[1] for airport in airports]
+        print(f"\t\tError. Airport Code not found in the database: {', '.join(unknown_codes)}. Please, try again.")
+        for code in unknown_codes:
+            hint = format_suggestions(conn, "airport", code)
+            if hint:
+                print(f"\t\t{code}:{hint}")
+
+def get_valid_reference_input(conn: sqlite3.Connection, value: str, cache: ReferenceDataCache, error_message: str, search_kind: str = None):
+    """
+    Helper function that asks for a code until it is found by the given cache and returns the cached row.
+    With search_kind, the closest matches of a code not found are suggested.
+    """
+    while True:
+        code = get_non_empty_input(value)
+        row = cache.get(conn, code)
+        if row:
+            return row
+        print(error_message)
+        if search_kind:
+            hint = format_suggestions(conn, search_kind, code)
+            if hint:
+                print(f"\t\t{hint.strip()}")
+
+# ==============================================================
+# Flight operations - query logic shared by the menu options and the command-line interface
+# ==============================================================
+FLIGHT_INFORMATION_HEADERS = ["Flight Number", "Departure Time", "Destination Arrival Time", "Flight Status", "Destination Airport Code",
+                              "Destination Airport Name", "Destination City", "Destination Country", "Destination Terminal"]
+PILOT_SCHEDULE_HEADERS = ["License Number", "Pilot Name", "Flight Number", "Departure Airport", "Destination Airport", "Departure Time", "Destination Arrival Time", "Flight Status"]
+FLIGHTS_PER_DESTINATION_HEADERS = ["Airport Code", "City", "Country", "Flights To Destination"]
+FLIGHTS_PER_PILOT_HEADERS = ["License Number", "Pilot Name", "Assigned Flights"]
+FLIGHT_CHANGE_HEADERS = ["Flight Number", "Departure Time", "Destination Arrival Time", "Flight Status"]
+
+def validate_new_flight(conn: sqlite3.Connection, aircraft_model: str, departure_airport_code: str, destination_airport_code: str,
+                        departure_time: str, destination_arrival_time: str, flight_status: str) -> tuple:
+    """
+    Run the checks of add_new_flight() (except the uniqueness of the flight number) on the values of a new flight.
+    Returns (AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+    in the format stored in the database, or raises ValueError with the reason why the flight is not valid.
+    """
+    aircraft = aircraft_cache.get(conn, aircraft_model)
+    if not aircraft:
+        raise ValueError("Aircraft model not found in the database.")
+    departure_airport = destination_cache.get(conn, departure_airport_code)
+    if not departure_airport:
+        raise ValueError("Departure airport code not found in the database.")
+    destination_airport = destination_cache.get(conn, destination_airport_code)
+    if not destination_airport:
+        raise ValueError("Destination airport code not found in the database.")
 
-    # Print table headers
-    print()
-    print(" | ".join(str(headers[i]).ljust(widths[i]) for i in range(len(headers))))
-    print("-" * (sum(widths) + 3 * (len(headers) - 1)))
+    try:
+        departure_datetime = datetime.strptime(departure_time, "%Y-%m-%d %H:%M")
+        destination_arrival_datetime = datetime.strptime(destination_arrival_time, "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise ValueError("Invalid datetime format. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30.") from None
+    if destination_arrival_datetime <= departure_datetime:
+        raise ValueError("Destination arrival time must be after the departure time.")
+
+    flight_status = flight_status.upper()
+    if flight_status not in valid_flight_statuses:
+        raise ValueError(f"Invalid flight status. Please, select one of the following: {valid_flight_statuses}.")
+
+    return (
+        aircraft[1],
+        departure_airport[1],
+        destination_airport[1],
+        to_epoch_minutes(departure_datetime),
+        to_epoch_minutes(destination_arrival_datetime),
+        flight_status,
+    )
+
+def create_flight(db: ConnectionManager, flight_number: str, aircraft_id: int, departure_airport_id: int, destination_airport_id: int,
+                  departure_minute: int, destination_arrival_minute: int, flight_status: str) -> None:
+    """Insert a new flight into the database (the times in INTEGER minutes, see to_epoch_minutes())."""
+    with db.writer:
+            db.writer.execute(
+                """
+                INSERT INTO Flight(FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+                VALUES (?, ?, ?, ?, ?, ?, ?);
+                """,
+                (flight_number, aircraft_id, departure_airport_id, destination_airport_id, departure_minute, destination_arrival_minute, flight_status),
+            )
+    flight_cache.invalidate(flight_number)
+    query_result_cache.invalidate_tables(FLIGHT_WRITE_TABLES)
 
-    # Print table content
-    for row in rows:
-        print(" | ".join(str(row[i]).ljust(widths[i]) for i in range(len(row))))
-    print()
+def search_flights(conn: sqlite3.Connection, destination_airport_ids=(), departure_airport_ids=(), departure_from: str = "", departure_to: str = "",
+                   flight_statuses=(), after: tuple = None, page_size: int = FLIGHT_SEARCH_PAGE_SIZE) -> list:
+    """
+    Return one page of the flights matching the provided criteria, in the column order of FLIGHT_INFORMATION_HEADERS followed by the FlightId.
+    The next page starts after (DepartureTime, FlightId) of the last flight of this page.
+
+    SQLite has to sort all the matching flights when a criterion has several values (e.g., two statuses). Instead, one query
+    per value of the criterion that drives the index look-up is run, each already in (DepartureTime, FlightId) order, and the
+    results are merged lazily, so only about one page per value is read whatever the number of matching flights.
+
+    The ARRIVED and CANCELLED flights of the archived months (see flight_archive.py) are searched too, unless the statuses or
+    the date range exclude them: the archives of the months in the range are queried one after another, only as far as the
+    page needs, and merged in the same way.
+    """
+    criteria = {
+        "destination_airport_ids": tuple(destination_airport_ids),
+        "departure_airport_ids": tuple(departure_airport_ids),
+        "departure_from": departure_from,
+        "departure_to": departure_to,
+        "flight_statuses": tuple(flight_statuses),
+        "after": after,
+    }
+    # The criterion that drives the index look-up, in the order of preference of the query planner.
+    driving_criterion = next((name for name in ("destination_airport_ids", "departure_airport_ids", "flight_statuses") if len(criteria[name]) > 1), None)
+    archive_rows = search_archived_flights(conn, criteria, page_size)
+    if driving_criterion is None and archive_rows is None:
+        sql, params = build_flight_search_query(**criteria)
+        return conn.execute(sql, params + [page_size]).fetchall()
+
+    if driving_criterion is None:
+        queried_criteria = [criteria]
+    else:
+        queried_criteria = [{**criteria, driving_criterion: (value,)} for value in criteria[driving_criterion]]
+    cursors = []
+    for value_criteria in queried_criteria:
+        sql, params = build_flight_search_query(**value_criteria)
+        cursors.append(conn.execute(sql, params + [page_size]))
+    if archive_rows is not None:
+        cursors.append(archive_rows)
+    return list(islice(heapq.merge(*cursors, key=lambda flight: (flight[1], flight[-1])), page_size))
+
+def search_archived_flights(conn: sqlite3.Connection, criteria: dict, page_size: int):
+    """
+    Return an iterator over one page of the archived flights matching the criteria of search_flights(), in (DepartureTime,
+    FlightId) order, or None if no archived month can hold a match.
+    """
+    flight_statuses = [status for status in criteria["flight_statuses"] or ARCHIVED_FLIGHT_STATUSES if status in ARCHIVED_FLIGHT_STATUSES]
+    if not flight_statuses:
+        return None
+    from_minutes = [to_epoch_minutes(time) for time in (criteria["departure_from"], criteria["after"] and criteria["after"][0]) if time]
+    periods = find_archive_periods(
+        conn, max(from_minutes, default=None), to_epoch_minutes(criteria["departure_to"]) if criteria["departure_to"] else None
+    )
+    if not periods:
+        return None
+
+    # Every archived flight has one of ARCHIVED_FLIGHT_STATUSES, so the statuses are only filtered if some were requested.
+    archive_criteria = {**criteria, "flight_statuses": tuple(flight_statuses) if criteria["flight_statuses"] else ()}
+    def build_query(schema: str) -> tuple:
+        sql, params = build_flight_search_query(**archive_criteria, schema=schema)
+        return sql, params + [page_size]
+    return islice(iter_archive_rows(conn, periods, build_query), page_size)
+
+def iter_flight_pages(conn: sqlite3.Connection, page_size: int = FLIGHT_SEARCH_PAGE_SIZE, **criteria):
+    """Lazily yield the pages of the flight search (see search_flights()); a page is only queried when it is requested."""
+    after = None
+    while True:
+        page = search_flights(conn, **criteria, after=after, page_size=page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = (page[-1][1], page[-1][-1]) # (DepartureTime, FlightId) of the last flight
+
+def get_flight_information(conn: sqlite3.Connection, flight_number: str):
+    """Return (FlightNumber, DepartureTime, FlightStatus, FlightId) of the flight, or None if the flight is not found."""
+    return conn.execute(
+        "SELECT FlightNumber, DepartureTime, FlightStatus, FlightId FROM Flight WHERE FlightNumber = ? COLLATE NOCASE;",
+        (flight_number,)
+    ).fetchone()
+
+def validate_flight_status(flight_status: str) -> str:
+    """Return the flight status in upper case, or raise ValueError if it is not one of valid_flight_statuses."""
+    if flight_status.upper() not in valid_flight_statuses:
+        raise ValueError(f"Invalid flight status. Please, select one of the following: {valid_flight_statuses}.")
+    return flight_status.upper()
+
+def update_flight(db: ConnectionManager, flight_id: int, flight_number: str, new_departure_time: str = "", new_flight_status: str = ""):
+    """
+    Update the departure time and/or status of a flight (empty values are left unchanged).
+    Returns the updated (FlightNumber, DepartureTime, FlightStatus, FlightId), as returned by the UPDATE, or None if there is
+    nothing to update or the flight no longer exists (e.g., another process has archived it). Raises ValueError, and changes
+    nothing, if the departure time is not in the format YYYY-MM-DD HH:MM, the status is not valid or the new departure time is
+    not before the arrival time, and sqlite3.IntegrityError if the update violates a constraint.
+    """
+    updates = []
+    params_for_updates = []
+
+    if new_departure_time:
+        updates.append("DepartureMinute = ?")
+        params_for_updates.append(to_epoch_minutes(new_departure_time))
+    if new_flight_status:
+        updates.append("FlightStatus = ?")
+        params_for_updates.append(validate_flight_status(new_flight_status))
+
+    if not updates:
+        return None
+    params_for_updates.append(flight_id) # FlightId for the WHERE-clause
+
+    try:
+        with db.writer:
+            updated_flight = db.writer.execute(
+                f"""
+                UPDATE Flight SET {', '.join(updates)} WHERE FlightId = ?
+                RETURNING FlightNumber, DepartureTime, FlightStatus, FlightId, DestinationArrivalTime, DepartureMinute < DestinationArrivalMinute;
+                """,
+                params_for_updates,
+            ).fetchone()
+            if updated_flight is None:
+                return None
+            if not updated_flight[5]:
+                raise ValueError(f"Destination arrival time ({updated_flight[4]}) must be after the departure time.")
+    finally:
+        flight_cache.invalidate(flight_number)
+        query_result_cache.invalidate_tables(FLIGHT_WRITE_TABLES)
+    return updated_flight[:4]
+
+def build_bulk_flight_update(criteria: dict, new_flight_status: str = "", shift_departure_minutes: int = 0, shift_arrival_minutes: int = 0) -> tuple:
+    """
+    Helper function that builds the UPDATE statement (and its parameters) of a bulk update: the flights matching the criteria
+    (see build_flight_filter()) get the new status and/or have their departure and arrival times shifted by the given minutes.
+    Only the changed columns are set, so the triggers on the other columns do not run. The statement returns the updated flights
+    in the column order of FLIGHT_CHANGE_HEADERS, followed by whether the arrival is still after the departure.
+    """
+    updates = []
+    params = []
+    if new_flight_status:
+        updates.append("FlightStatus = ?")
+        params.append(new_flight_status)
+    if shift_departure_minutes:
+        updates.append("DepartureMinute = DepartureMinute + ?")
+        params.append(shift_departure_minutes)
+    if shift_arrival_minutes:
+        updates.append("DestinationArrivalMinute = DestinationArrivalMinute + ?")
+        params.append(shift_arrival_minutes)
+
+    conditions, filter_params = build_flight_filter(**criteria)
+    sql = f"""
+        UPDATE Flight AS f
+        SET {', '.join(updates)}
+        WHERE 1=1{conditions}
+        RETURNING FlightNumber, DepartureTime, DestinationArrivalTime, FlightStatus, DepartureMinute < DestinationArrivalMinute;
+    """
+    return sql, params + filter_params
+
+def bulk_update_flights(db: ConnectionManager, criteria: dict, new_flight_status: str = "", shift_departure_minutes: int = 0,
+                        shift_arrival_minutes: int = None, dry_run: bool = False) -> list:
+    """
+    Set the status and/or shift the times of every flight matching the criteria (see build_flight_filter()) with one UPDATE
+    statement in one transaction, e.g., every SCHEDULED departure from LHR between 14:00 and 18:00 -> DELAYED, +90 minutes.
+    shift_arrival_minutes defaults to shift_departure_minutes, so that a delay moves both times.
+    Returns the updated flights in the column order of FLIGHT_CHANGE_HEADERS, as returned by the UPDATE (RETURNING).
+    Raises ValueError, and changes nothing, if no criterion or no change is given, the status is not valid, or a flight would
+    no longer arrive after it departs. With dry_run, the transaction is rolled back.
+    """
+    if not any(criteria.values()):
+        raise ValueError("No criteria provided. Please, specify at least one criterion.")
+    if shift_arrival_minutes is None:
+        shift_arrival_minutes = shift_departure_minutes
+    if new_flight_status:
+        new_flight_status = validate_flight_status(new_flight_status)
+    if not (new_flight_status or shift_departure_minutes or shift_arrival_minutes):
+        raise ValueError("No change provided. Please, specify a new flight status and/or a time shift.")
+    sql, params = build_bulk_flight_update(criteria, new_flight_status, shift_departure_minutes, shift_arrival_minutes)
+
+    db.writer.execute("BEGIN IMMEDIATE;")
+    try:
+        updated_flights = db.writer.execute(sql, params).fetchall()
+        invalid_flights = [flight[0] for flight in updated_flights if not flight[4]]
+        if invalid_flights:
+            raise ValueError(f"Destination arrival time must be after the departure time (flights {', '.join(invalid_flights[:10])}"
+                             f"{', ...' if len(invalid_flights) > 10 else ''}). No flight was updated.")
+        if dry_run:
+            db.writer.rollback()
+        else:
+            db.writer.commit()
+            query_result_cache.invalidate_tables(FLIGHT_WRITE_TABLES)
+    except BaseException:
+        db.writer.rollback()
+        raise
+    return [flight[:4] for flight in updated_flights]
+
+def find_assignment_conflicts(conn: sqlite3.Connection, flight_id: int, pilot_id: int, min_rest_minutes: int = MIN_REST_MINUTES) -> list:
+    """
+    Return the reasons why the pilot cannot fly the flight (an empty list if there are none): the flight is outside the pilot's
+    employment dates, or it overlaps / leaves less than min_rest_minutes of rest around another non-cancelled flight of the pilot.
+    The pilot's flights are read from PilotAssignmentInterval with two range queries on idx_pilot_assignment_interval_pilot_departure:
+    the flights departing during the new flight (or its rest period) and the last flight departing before it.
+    The last flight is the only earlier one that can conflict, provided the existing assignments do not conflict with each other
+    (see the audit-conflicts command).
+    """
+    flight_number, departure_minute, arrival_minute, flight_status = conn.execute(
+        "SELECT FlightNumber, DepartureMinute, DestinationArrivalMinute, FlightStatus FROM Flight WHERE FlightId = ?;",
+        (flight_id,),
+    ).fetchone()
+    if flight_status == "CANCELLED":
+        return []
+
+    conflicts = []
+    employment = conn.execute(
+        """
+        SELECT EmploymentStartDate, EmploymentEndDate
+        FROM Pilot
+        WHERE PilotId = ?
+          AND (? < unixepoch(EmploymentStartDate) / 60 OR ? > unixepoch(EmploymentEndDate) / 60);
+        """,
+        (pilot_id, departure_minute, arrival_minute),
+    ).fetchone()
+    if employment:
+        conflicts.append(f"Flight {flight_number} is outside the pilot's employment ({employment[0]} - {employment[1] or 'present'}).")
+
+    other_flights = conn.execute(
+        """
+        SELECT f.FlightNumber, f.DepartureTime, f.DestinationArrivalTime, i.DepartureMinute, i.DestinationArrivalMinute
+        FROM (
+            SELECT FlightId, DepartureMinute, DestinationArrivalMinute
+            FROM PilotAssignmentInterval
+            WHERE PilotId = ? AND DepartureMinute >= ? AND DepartureMinute < ? + ?
+              AND FlightStatus <> 'CANCELLED' AND FlightId <> ?
+            UNION ALL
+            SELECT * FROM (
+                SELECT FlightId, DepartureMinute, DestinationArrivalMinute
+                FROM PilotAssignmentInterval
+                WHERE PilotId = ? AND DepartureMinute < ? AND FlightStatus <> 'CANCELLED' AND FlightId <> ?
+                ORDER BY DepartureMinute DESC
+                LIMIT 1
+            )
+        ) AS i
+        JOIN Flight AS f
+            ON f.FlightId = i.FlightId
+        WHERE i.DestinationArrivalMinute + ? > ?
+        ORDER BY i.DepartureMinute;
+        """,
+        (pilot_id, departure_minute, arrival_minute, min_rest_minutes, flight_id, pilot_id, departure_minute, flight_id, min_rest_minutes, departure_minute),
+    ).fetchall()
+    for other_flight_number, other_departure_time, other_arrival_time, other_departure_minute, other_arrival_minute in other_flights:
+        if other_departure_minute < arrival_minute and departure_minute < other_arrival_minute:
+            conflicts.append(f"Flight {flight_number} overlaps flight {other_flight_number} ({other_departure_time} - {other_arrival_time}).")
+        else:
+            conflicts.append(f"Less than {min_rest_minutes} minutes of rest between flight {flight_number} and flight {other_flight_number} ({other_departure_time} - {other_arrival_time}).")
+    return conflicts
+
+def assign_pilot(db: ConnectionManager, flight_id: int, pilot_id: int, min_rest_minutes: int = MIN_REST_MINUTES) -> None:
+    """
+    Assign a pilot to a flight. The scheduling conflicts are checked in the same transaction as the insert.
+    Raises ValueError if the assignment conflicts with the pilot's employment or other flights (see find_assignment_conflicts())
+    and sqlite3.IntegrityError if the pilot is already assigned to the flight.
+    """
+    with db.writer:
+        conflicts = find_assignment_conflicts(db.writer, flight_id, pilot_id, min_rest_minutes)
+        if conflicts:
+            raise ValueError(" ".join(conflicts))
+        db.writer.execute(
+            "INSERT INTO Flight_Pilot(FlightId, PilotId) VALUES (?, ?);",
+            (flight_id, pilot_id),
+        )
+    query_result_cache.invalidate_tables(ASSIGNMENT_WRITE_TABLES)
+
+def get_pilot_schedule(conn: sqlite3.Connection, pilot_id: int):
+    """
+    Return a cursor over the flights assigned to the pilot ordered by departure time, in the column order of PILOT_SCHEDULE_HEADERS.
+    If archives hold flights of the pilot, an iterator merging them in is returned instead.
+    """
+    schedule = conn.execute(
+        """
+        SELECT
+          p.LicenseNumber as "License Number",
+          p.FirstName || ' ' || COALESCE(p.MiddleName || ' ', '') || p.LastName AS "Pilot Name",
+          f.FlightNumber,
+          da.AirportCode AS DepartureAirport,
+          aa.AirportCode AS DestinationAirport,
+          f.DepartureTime,
+          f.DestinationArrivalTime,
+          f.FlightStatus
+        FROM Pilot AS p
+        LEFT JOIN Flight_Pilot AS fp 
+            ON fp.PilotId = p.PilotId
+        LEFT JOIN Flight AS f 
+            ON f.FlightId = fp.FlightId
+        LEFT JOIN Destination AS da 
+            ON da.DestinationId = f.DepartureAirportId
+        LEFT JOIN Destination AS aa 
+            ON aa.DestinationId = f.DestinationAirportId
+        WHERE p.PilotId = ?
+        ORDER BY f.DepartureMinute ASC;
+        """,
+        (pilot_id,),
+    )
+    archive_periods = find_pilot_archive_periods(conn, pilot_id)
+    if not archive_periods:
+        return schedule
+
+    def build_archive_query(schema: str) -> tuple:
+        return (
+            f"""
+            SELECT
+              p.LicenseNumber,
+              p.FirstName || ' ' || COALESCE(p.MiddleName || ' ', '') || p.LastName,
+              f.FlightNumber,
+              da.AirportCode,
+              aa.AirportCode,
+              f.DepartureTime,
+              f.DestinationArrivalTime,
+              f.FlightStatus
+            FROM {schema}.Flight_Pilot AS fp
+            JOIN {schema}.Flight AS f
+                ON f.FlightId = fp.FlightId
+            JOIN Pilot AS p
+                ON p.PilotId = fp.PilotId
+            LEFT JOIN Destination AS da
+                ON da.DestinationId = f.DepartureAirportId
+            LEFT JOIN Destination AS aa
+                ON aa.DestinationId = f.DestinationAirportId
+            WHERE fp.PilotId = ?
+            ORDER BY f.DepartureMinute ASC;
+            """,
+            (pilot_id,),
+        )
+
+    # A pilot without current flights has one row without a flight (LEFT JOIN), which is left out once archived flights are added.
+    current_flights = (flight for flight in schedule if flight[2] is not None)
+    archived_flights = iter_archive_rows(conn, archive_periods, build_archive_query)
+    return heapq.merge(archived_flights, current_flights, key=lambda flight: flight[5])
+
+def get_flights_per_destination(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """
+    Return a cursor over the number of flights to each destination, in the column order of FLIGHTS_PER_DESTINATION_HEADERS.
+    The counts are read from the DestinationFlightSummary table, which is kept up to date by triggers.
+    """
+    return conn.execute(
+        """
+        SELECT
+          d.AirportCode,
+          d.City,
+          d.Country,
+          s.FlightCount AS FlightsToDestination
+        FROM DestinationFlightSummary AS s
+        JOIN Destination AS d 
+            ON d.DestinationId = s.DestinationId
+        WHERE s.FlightCount > 0
+        ORDER BY FlightsToDestination DESC, d.AirportCode ASC;
+        """
+    )
+
+def get_flights_per_pilot(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """
+    Return a cursor over the number of flights assigned to each pilot, in the column order of FLIGHTS_PER_PILOT_HEADERS.
+    The counts are read from the PilotFlightSummary table, which is kept up to date by triggers.
+    """
+    return conn.execute(
+        """
+        SELECT
+          p.LicenseNumber,
+          p.FirstName || ' ' || COALESCE(p.MiddleName || ' ', '') || p.LastName AS PilotName,
+          COALESCE(s.FlightCount, 0) AS AssignedFlights
+        FROM Pilot AS p
+        LEFT JOIN PilotFlightSummary AS s 
+            ON s.PilotId = p.PilotId
+        ORDER BY AssignedFlights DESC, p.LicenseNumber ASC;
+        """
+    )
 
 # ==============================================================
 # Define functions for menu options
@@ -245,62 +1121,41 @@ def print_table(rows, headers):
 # ==============================================================
 # add_new_flight() - Function allows the user to add a new flight to the database by collecting necessary information from the user.
 # ==============================================================
-def add_new_flight(conn: sqlite3.Connection) -> None:
+def add_new_flight(db: ConnectionManager) -> None:
     """Function allows the user to add a new flight to the database by collecting necessary information from the user."""
     print("\nTo add a new flight, please provide the following information:")
 
     # FlightNumber - TEXT NOT NULL UNIQUE
-    # TODO: Write a test check the uniqueness of the Flight number provided by the user.
-    flight_number = get_non_empty_input("\tFlight Number (e.g., AA123): ")
-
-    # AircraftId - INTEGER NOT NULL
-    # TODO: Encapsulate the below lodgic into a more generic, reusable helper function.
     while True:
-        aircraft_model = get_non_empty_input("\tAircraft Model (e.g., Airbus A320-200): ")
-        search_for_aircraft_id = conn.execute("SELECT AircraftId FROM Aircraft WHERE Model = ? COLLATE NOCASE;", (aircraft_model,)).fetchone()
-        
-        if search_for_aircraft_id:
-            aircraft_id = search_for_aircraft_id[0]
+        flight_number = get_non_empty_input("\tFlight Number (e.g., AA123): ")
+        if not flight_cache.get(db.reader, flight_number):
             break
-        else:
-            print("\t\tError. Aircraft model not found in the database. Please, try again.")
-    
+        print("\t\tError. Flight number already exists in the database. Please, try again.")
+
+    # AircraftId - INTEGER NOT NULL
+    aircraft_id = get_valid_reference_input(db.reader, "\tAircraft Model (e.g., Airbus A320-200): ", aircraft_cache,
+                                            "\t\tError. Aircraft model not found in the database. Please, try again.", "aircraft")[1]
+
     # DepartureAirportId - INTEGER NOT NULL
-    # TODO: Encapsulate the below lodgic into a more generic, reusable helper function.
-    while True:
-        departure_airport_code = get_non_empty_input("\tDeparture Airport Code (e.g., LHR): ")
-        search_for_departure_aiport_id = conn.execute("SELECT DestinationId FROM Destination WHERE AirportCode = ? COLLATE NOCASE;", (departure_airport_code,)).fetchone()
-        
-        if search_for_departure_aiport_id:
-            departure_airport_id = search_for_departure_aiport_id[0]
-            break
-        else:
-            print("\t\tError. Departure airport code not found in the database. Please, try again.")
+    departure_airport_id = get_valid_reference_input(db.reader, "\tDeparture Airport Code (e.g., LHR): ", destination_cache,
+                                                     "\t\tError. Departure airport code not found in the database. Please, try again.", "airport")[1]
 
     # DestinationAirportId - INTEGER NOT NULL
-    # TODO: Encapsulate the below lodgic into a more generic, reusable helper function.
-    while True:
-        destination_airport_code = get_non_empty_input("\tDestination Airport Code (e.g., JFK): ")
-        search_for_destination_airport_id = conn.execute("SELECT DestinationId FROM Destination WHERE AirportCode = ? COLLATE NOCASE;", (destination_airport_code,)).fetchone()
-
-        if search_for_destination_airport_id:
-            destination_airport_id = search_for_destination_airport_id[0]
-            break
-        else:
-            print("\t\tError. Destination airport code not found in the database. Please, try again.")
+    destination_airport_id = get_valid_reference_input(db.reader, "\tDestination Airport Code (e.g., JFK): ", destination_cache,
+                                                       "\t\tError. Destination airport code not found in the database. Please, try again.", "airport")[1]
 
-    # DepartureTime - TEXT NOT NULL
+    # DepartureMinute - INTEGER NOT NULL
     departure_datetime = get_valid_datetime_input("\tDeparture Time (e.g., 2026-02-01 10:30): ")
-    # Covert time from datetime object to string in the correct format for SQLite
-    departure_time = departure_datetime.strftime("%Y-%m-%d %H:%M")
+    # Covert time from datetime object to the INTEGER minutes stored by SQLite
+    departure_minute = to_epoch_minutes(departure_datetime)
 
-    # DestinationArrivalTime - TEXT NOT NULL
+    # DestinationArrivalMinute - INTEGER NOT NULL
     while True:
         destination_arrival_datetime = get_valid_datetime_input("\tDestination Arrival Time (e.g., 2026-02-01 13:30): ")
         # Check that the destination arrival time is after the departure time.
         if destination_arrival_datetime > departure_datetime:
-            # Covert time from datetime object to string in the correct format for SQLite
-            destination_arrival_time = destination_arrival_datetime.strftime("%Y-%m-%d %H:%M")
+            # Covert time from datetime object to the INTEGER minutes stored by SQLite
+            destination_arrival_minute = to_epoch_minutes(destination_arrival_datetime)
             break
         else:
             print("\t\tError. Destination arrival time must be after the departure time. Please, try again.")
@@ -314,115 +1169,74 @@ def add_new_flight(conn: sqlite3.Connection) -> None:
             print(f"\t\tError. Invalid flight status. Please, select one of the following: {valid_flight_statuses}.")
 
     # Add the new flight to the database.
-    with conn:
-            conn.execute(
-                """
-                INSERT INTO Flight(FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureTime, DestinationArrivalTime, FlightStatus)
-                VALUES (?, ?, ?, ?, ?, ?, ?);
-                """,
-                (flight_number, aircraft_id, departure_airport_id, destination_airport_id, departure_time, destination_arrival_time, flight_status),
-            )
+    create_flight(db, flight_number, aircraft_id, departure_airport_id, destination_airport_id, departure_minute, destination_arrival_minute, flight_status)
     print("\nNew flight added successfully.\n")
 
 # ==============================================================
 # view_flights_by_criteria() - Function allows the user to filter the flights based on several criteria.
 # ==============================================================
-def view_flights_by_criteria(conn: sqlite3.Connection) -> None:
+def view_flights_by_criteria(db: ConnectionManager) -> None:
     """
     Function allows the user to filter the flights based on several criteria:
-    - Destination Airport Code
-    - Departure Date
-    - Flight Status.
+    - Destination Airport Code(s)
+    - Departure Airport Code(s)
+    - Departure Date range
+    - Flight Status(es).
 
     User can press Enter to skip any of the above criteria. If all criteria are skipped, no flights will be returned.
+    Several codes or statuses can be separated by commas. The flights are displayed one page at a time, ordered by departure time.
     """
-    print("\nProvide the below details to view the respective flights. Press Enter to skip any criteria.")
+    print("\nProvide the below details to view the respective flights. Press Enter to skip any criteria, separate several values by commas.")
 
-    criteria_list = []
-    
-    # Get Destination Aiport Code from the user
-    while True:
-        destination_airport_code = input("\tDestination Airport Code (e.g., JFK): ").strip().upper()
-        if destination_airport_code == "":
-            break
-        else:
-            search_for_destination_airport_code = conn.execute("SELECT AirportCode FROM Destination WHERE AirportCode = ? COLLATE NOCASE;", (destination_airport_code,)).fetchone()
-            if search_for_destination_airport_code:
-                criteria_list.append(destination_airport_code)
-                break
-            else:
-                print("\t\tError. Destination Airport Code not found in the database. Please, try again.")
+    # Get Destination and Departure Aiport Codes from the user
+    destination_airport_ids = get_optional_airport_ids_input(db.reader, "\tDestination Airport Code(s) (e.g., JFK or JFK,LAX): ")
+    departure_airport_ids = get_optional_airport_ids_input(db.reader, "\tDeparture Airport Code(s) (e.g., LHR): ")
 
-    # Get Departure Date from the user
-    while True:
-        departure_datetime = input("\tDeparture Time (e.g., 2026-02-01 10:30): ").strip()
-        if departure_datetime == "":
-            break
-        else:
-            try:
-                departure_datetime = datetime.strptime(departure_datetime, "%Y-%m-%d %H:%M")
-                # Convert time from datetime object to string in the correct format for SQLite
-                departure_time = departure_datetime.strftime("%Y-%m-%d %H:%M")
-                criteria_list.append(departure_time)
-                break
-            except ValueError:
-                print("\t\tInvalid datetime format. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30. Please, try again.")
-        
-    # Get Flight Status from the user
+    # Get Departure Date range from the user
+    departure_from = get_optional_datetime_input("\tDeparture Time from (e.g., 2026-02-01 10:30): ")
+    departure_to = get_optional_datetime_input("\tDeparture Time to (e.g., 2026-02-01 18:00): ")
+
+    # Get Flight Status(es) from the user
     while True:
-        flight_status = input(f"\tFlight Status {valid_flight_statuses}: ").strip()
-        if flight_status == "":
+        flight_statuses = [flight_status.strip().upper() for flight_status in input(f"\tFlight Status(es) {valid_flight_statuses}: ").split(",") if flight_status.strip()]
+        invalid_flight_statuses = [flight_status for flight_status in flight_statuses if flight_status not in valid_flight_statuses]
+        if not invalid_flight_statuses:
             break
-        else:
-            flight_status = flight_status.upper()
-            if flight_status in valid_flight_statuses:
-                criteria_list.append(flight_status)
-                break
-            else:
-                print(f"\t\tError. Invalid flight status. Please, select one of the following: {valid_flight_statuses}.")
+        print(f"\t\tError. Invalid flight status: {', '.join(invalid_flight_statuses)}. Please, select from the following: {valid_flight_statuses}.")
 
-    # Specify template SQL query that will be amended depending on the chosen criteria.
-    template_sql_query_for_viewing_flights = """
-        SELECT 
-            f.FlightNumber AS "Flight Number",
-            f.DepartureTime AS "Departure Time",
-            f.DestinationArrivalTime AS "Destination Arrival Time",
-            f.FlightStatus AS "Flight Status",
-            d.AirportCode AS "Destination Airport Code",
-            d.AirportName AS "Destination Airport Name",
-            d.City AS "Destination City",
-            d.Country AS "Destination Country",
-            d.Terminal AS "Destination Terminal"
-        FROM Flight AS f
-        LEFT JOIN Destination AS d
-            ON f.DestinationAirportId = d.DestinationId
-        WHERE 1=1
-    """
+    # If all criteria are skipped, no flights are returned (rather than the whole Flight table).
+    if not (destination_airport_ids or departure_airport_ids or departure_from or departure_to or flight_statuses):
+        print("\t\tNo criteria provided. Please, specify at least one criterion and try again.")
+        return
 
-    # Augment the template SQL query based on the specified criteria.
-    if destination_airport_code:
-        template_sql_query_for_viewing_flights += " AND d.AirportCode = ? COLLATE NOCASE"
-    if departure_datetime:
-        template_sql_query_for_viewing_flights += " AND f.DepartureTime = ?"
-    if flight_status:
-        template_sql_query_for_viewing_flights += " AND f.FlightStatus = ?"
-    
-    filtered_table_rows = conn.execute(template_sql_query_for_viewing_flights, criteria_list).fetchall()
-    pretty_printing_flight_information(filtered_table_rows)
+    # Display the flights one page at a time; the next page is only queried if the user asks for it.
+    n_displayed_flights = 0
+    pages = iter_flight_pages(
+        db.cached_reader,
+        destination_airport_ids=destination_airport_ids,
+        departure_airport_ids=departure_airport_ids,
+        departure_from=departure_from,
+        departure_to=departure_to,
+        flight_statuses=flight_statuses,
+    )
+    for page in pages:
+        pretty_printing_flight_information(page, n_displayed_flights)
+        n_displayed_flights += len(page)
+        if len(page) < FLIGHT_SEARCH_PAGE_SIZE or input("\tPress Enter to view the next page or type q to stop: ").strip().lower() == "q":
+            break
+    if not n_displayed_flights:
+        pretty_printing_flight_information([])
 
 # ==============================================================
 # update_flight_information() - Function allows the user to update flight information (e.g., departure date and/or status) in the database.
 # ==============================================================
-def update_flight_information(conn: sqlite3.Connection) -> None:
+def update_flight_information(db: ConnectionManager) -> None:
     """
     Function allows the user to update flight information (e.g., departure date and/or status) in the database.
     """
     flight_number = get_non_empty_input("\nEnter the flight number to update(e.g., AA123): ")
 
-    available_flight_information = conn.execute(
-        "SELECT FlightNumber, DepartureTime, FlightStatus, FlightId FROM Flight WHERE FlightNumber = ? COLLATE NOCASE;",
-        (flight_number,)
-    ).fetchone()
+    available_flight_information = get_flight_information(db.reader, flight_number)
 
     # Check if the Flight Number provided by the users exists in the database.
     if not available_flight_information:
@@ -435,44 +1249,19 @@ def update_flight_information(conn: sqlite3.Connection) -> None:
     print(f"\t\tDeparture Time: {available_flight_information[1]}")
     print(f"\t\tFlight Status: {available_flight_information[2]}")
 
-    # Get new Departure Time and/or Flight Status.
-    # TODO: Introduce validity check for the new Departure Time.
+    # Get new Departure Time and/or Flight Status (both are validated by update_flight()).
     new_departure_time = input("\n\tEnter new Departure Time (e.g., 2026-02-01 10:30) or press Enter to skip: ").strip()
-
-    # TODO: Introduce validity check for the new Flight Status.
     new_flight_status = input(f"\tEnter new Flight Status (e.g., (SCHEDULED, DELAYED, CANCELLED, DEPARTED, ARRIVED)) or press Enter to skip: ").strip().upper()
 
-    updates = []
-    params_for_updates = []
-
-    if new_departure_time:
-        updates.append("DepartureTime = ?")
-        params_for_updates.append(new_departure_time)
-    if new_flight_status:
-        updates.append("FlightStatus = ?")
-        params_for_updates.append(new_flight_status)
-    
-    if not updates:
-        print("\t\tNo new information provided. Flight information remains unchanged.")    
-        return
-    else:
-        params_for_updates.append(available_flight_information[3]) # FlightId for the WHERE-clause
-    
-    # Update the Flight Information.
+    # Update the Flight Information; the updated flight is returned by the UPDATE statement.
     try:
-        with conn:
-            conn.execute(
-                f"UPDATE Flight SET {', '.join(updates)} WHERE FlightId = ?;",
-                params_for_updates,
-            )
-    except sqlite3.IntegrityError as e:
+        updated_flight_information = update_flight(db, available_flight_information[3], flight_number, new_departure_time, new_flight_status)
+        if not updated_flight_information:
+            print("\t\tNo new information provided. Flight information remains unchanged.")    
+            return
+    except (sqlite3.IntegrityError, ValueError) as e:
         print(f"Error. Update failed: {e}")
-    
-    # Display the updated flight information.
-    updated_flight_information = conn.execute(
-        "SELECT FlightNumber, DepartureTime, FlightStatus, FlightId FROM Flight WHERE FlightNumber = ? COLLATE NOCASE;",
-        (flight_number,)
-    ).fetchone()
+        return
     
     # Display information about the flight.
     print("\n\tUpdated Flight information:")
@@ -483,17 +1272,15 @@ def update_flight_information(conn: sqlite3.Connection) -> None:
 # ==============================================================
 # assign_pilot_to_flight() - Function allows the user to assign a pilot to a flight.
 # ==============================================================
-def assign_pilot_to_flight(conn: sqlite3.Connection) -> None:
+def assign_pilot_to_flight(db: ConnectionManager) -> None:
     """Function allows the user to assign a pilot to a flight."""
     print("\nTo assign a pilot to a flight, please provide the below information.")
     
     # Take the pilot's license number and check that it exists in the database.
     license_number = get_non_empty_input("\tPilot License Number (e.g., LIC-UK-7Q2A91): ").upper()
-    pilot_information = conn.execute("SELECT LicenseNumber, FirstName, LastName, IsActive, PilotId FROM Pilot WHERE LicenseNumber = ? COLLATE NOCASE;", 
-                                     (license_number,)
-                                     ).fetchone()
+    pilot_information = pilot_cache.get(db.reader, license_number)
     if not pilot_information:
-        print("\t\tLicense Number not found. Please, try again.")
+        print("\t\tLicense Number not found. Please, try again." + format_suggestions(db.reader, "pilot", license_number))
         return  
 
     # Check if the pilot has an active employment status.
@@ -503,125 +1290,453 @@ def assign_pilot_to_flight(conn: sqlite3.Connection) -> None:
     
     # Take the flight number and check that it exists in the database.
     flight_number = get_non_empty_input("\nEnter the flight number to update(e.g., AA123): ")
-    available_flight_information = conn.execute(
-        "SELECT FlightNumber, DepartureTime, FlightStatus, FlightId FROM Flight WHERE FlightNumber = ? COLLATE NOCASE;",
-        (flight_number,)
-    ).fetchone()
+    available_flight_information = flight_cache.get(db.reader, flight_number)
     if not available_flight_information:
         print("\tFlight not found. Please, try again.")
         return
 
     # Assign the pilot to the flight.
     try:
-        with conn:
-            conn.execute(
-                "INSERT INTO Flight_Pilot(FlightId, PilotId) VALUES (?, ?);",
-                (available_flight_information[3], pilot_information[4]),
-            )
+        assign_pilot(db, available_flight_information[1], pilot_information[4])
         print(f"\t\tPilot {pilot_information[0]} assigned to flight {available_flight_information[0]} successfully.")
+    except ValueError as e:
+        print(f"Assignment failed (scheduling conflict): {e}")
     except sqlite3.IntegrityError as e:
         print(f"Assignment failed (maybe duplicate assignment): {e}")
 
 # ==============================================================
 # view_pilot_schedule() - Function allows the user to view a selected pilot's schedule.
 # ==============================================================
-def view_pilot_schedule(conn: sqlite3.Connection) -> None:
+def view_pilot_schedule(db: ConnectionManager) -> None:
     """Function allows the user to view a selected pilot's schedule."""
     print("\nTo view a pilot's schedule, please provide the below information.")
 
     license_number = get_non_empty_input("\tPilot License Number (e.g., LIC-UK-7Q2A91): ").upper()
 
     # Check if the License Number exists in the database.
-    pilot_information = conn.execute("SELECT LicenseNumber, FirstName, LastName FROM Pilot WHERE LicenseNumber = ? COLLATE NOCASE;", 
-                                     (license_number,)
-                                     ).fetchone()
+    pilot_information = pilot_cache.get(db.reader, license_number)
 
     # Check if the Flight Number provided by the users exists in the database.
     if not pilot_information:
-        print("\t\tLicense Number not found. Please, try again.")
+        print("\t\tLicense Number not found. Please, try again." + format_suggestions(db.reader, "pilot", license_number))
         return   
 
     # Get the pilot's schedule.
-    pilot_schedule = conn.execute(
-        """
-        SELECT
-          p.LicenseNumber as "License Number",
-          p.FirstName || ' ' || COALESCE(p.MiddleName || ' ', '') || p.LastName AS "Pilot Name",
-          f.FlightNumber,
-          da.AirportCode AS DepartureAirport,
-          aa.AirportCode AS DestinationAirport,
-          f.DepartureTime,
-          f.DestinationArrivalTime,
-          f.FlightStatus
-        FROM Pilot AS p
-        LEFT JOIN Flight_Pilot AS fp 
-            ON fp.PilotId = p.PilotId
-        LEFT JOIN Flight AS f 
-            ON f.FlightId = fp.FlightId
-        LEFT JOIN Destination AS da 
-            ON da.DestinationId = f.DepartureAirportId
-        LEFT JOIN Destination AS aa 
-            ON aa.DestinationId = f.DestinationAirportId
-        WHERE p.LicenseNumber = ?
-        ORDER BY f.DepartureTime ASC;
-        """,
-        (license_number,),
-    ).fetchall()                                 
+    pilot_schedule = get_pilot_schedule(db.cached_reader, pilot_information[4])
 
     # Display the pilot's schedule.
-    headers = ["License Number", "Pilot Name", "Flight Number", "Departure Airport", "Destination Airport", "Departure Time", "Destination Arrival Time", "Flight Status"]
-    print_table(pilot_schedule, headers)
+    print_table(pilot_schedule, PILOT_SCHEDULE_HEADERS)
 
 # ==============================================================
 # additional_summary_queries() - Function produces additional summary queries on the created data.
 # ==============================================================
-def additional_summary_queries(conn: sqlite3.Connection) -> None:
+def additional_summary_queries(db: ConnectionManager) -> None:
     """Function produces additional summary queries on the created data."""
     print("\nSummary Information.")
 
     # Number of flight to each destination
     print("\n1) Number of flights to each destination")
-    n_flights_to_each_destination = conn.execute(
-        """
-        SELECT
-          d.AirportCode,
-          d.City,
-          d.Country,
-          COUNT(*) AS FlightsToDestination
-        FROM Flight AS f
-        LEFT JOIN Destination AS d 
-            ON d.DestinationId = f.DestinationAirportId
-        GROUP BY d.DestinationId
-        ORDER BY FlightsToDestination DESC, d.AirportCode ASC;
-        """
-    ).fetchall()
-    print_table(n_flights_to_each_destination, ["Airport Code", "City", "Country", "Flights To Destination"])
+    n_flights_to_each_destination = get_flights_per_destination(db.cached_reader)
+    print_table(n_flights_to_each_destination, FLIGHTS_PER_DESTINATION_HEADERS)
 
     # Number of flights assigned to each pilot
     print("2) Number of flights assigned to each pilot")
-    n_flights_assigned_to_pilot = conn.execute(
-        """
-        SELECT
-          p.LicenseNumber,
-          p.FirstName || ' ' || COALESCE(p.MiddleName || ' ', '') || p.LastName AS PilotName,
-          COUNT(fp.FlightId) AS AssignedFlights
-        FROM Pilot AS p
-        LEFT JOIN Flight_Pilot AS fp 
-            ON fp.PilotId = p.PilotId
-        GROUP BY p.PilotId
-        ORDER BY AssignedFlights DESC, p.LicenseNumber ASC;
-        """
-    ).fetchall()
-    print_table(n_flights_assigned_to_pilot, ["License Number", "Pilot Name", "Assigned Flights"])
+    n_flights_assigned_to_pilot = get_flights_per_pilot(db.cached_reader)
+    print_table(n_flights_assigned_to_pilot, FLIGHTS_PER_PILOT_HEADERS)
+
+# ==============================================================
+# search_reference_data() - Function allows the user to search the airports, aircraft models and pilots.
+# ==============================================================
+def search_reference_data(db: ConnectionManager) -> None:
+    """Function allows the user to search the airports, aircraft models and pilots by any part of their names or codes."""
+    print("\nTo search, please provide the below information.")
+
+    text = get_non_empty_input("\tAirport, aircraft model or pilot (e.g., Heathrow, A320, Smith): ")
+    try:
+        results = search(db.reader, text)
+    except ValueError as e:
+        print(f"\t\tError. {e} Please, try again.")
+        return
+    if not results:
+        print("\t\tNo matches found. Please, try again.")
+        return
+    print_table([(kind, code, description, f"{score:.0%}") for kind, code, description, score in results], SEARCH_RESULT_HEADERS)
+
+# ==============================================================
+# Command-line interface - runs a single operation without the menu, e.g., python main.py view-flights --destination JFK
+# ==============================================================
+def parse_datetime_argument(value: str) -> str:
+    """Argument type for datetimes: validates the format and returns the string in the format stored in the database."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid datetime {value!r}. Correct format: YYYY-MM-DD HH:MM, e.g., 2026-03-01 10:30.") from None
+
+def parse_list_argument(value: str) -> list:
+    """Argument type for comma-separated values, e.g., JFK,LAX."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def parse_flight_statuses_argument(value: str) -> list:
+    """Argument type for comma-separated flight statuses: validates every status and returns them in upper case."""
+    return [parse_flight_status_argument(flight_status) for flight_status in parse_list_argument(value)]
+
+def parse_page_key_argument(value: str) -> tuple:
+    """Argument type for the key of a page of the flight search: '<DepartureTime>|<FlightId>'."""
+    try:
+        departure_time, flight_id = value.rsplit("|", 1)
+        return parse_datetime_argument(departure_time), int(flight_id)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid page key {value!r}. Correct format: 'YYYY-MM-DD HH:MM|FlightId'.") from None
+
+def parse_flight_status_argument(value: str) -> str:
+    """Argument type for flight statuses: validates the status case-insensitively and returns it in upper case."""
+    if value.upper() not in valid_flight_statuses:
+        raise argparse.ArgumentTypeError(f"invalid flight status {value!r}. Please, select one of the following: {valid_flight_statuses}.")
+    return value.upper()
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command-line arguments. Without a command, the interactive menu is launched."""
+    parser = argparse.ArgumentParser(description="Flight Management System. Run without a command to launch the interactive menu.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Path to the SQLite database file.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="table", help="Output format of the results.")
+    parser.add_argument("--mock-data", action="store_true", help="Insert the mock data if the database is empty.")
+    parser.add_argument("--query-log", action="store_true", help="Time every SQL statement, log the slow ones and print the statistics on exit.")
+    parser.add_argument("--slow-query-ms", type=float, default=SLOW_QUERY_THRESHOLD_MS, help="Statements slower than this are written to the slow-query log.")
+    parser.add_argument("--slow-query-log", type=Path, default=SLOW_QUERY_LOG_PATH, help="File the slow statements and their query plans are appended to.")
+
+    # The common options can also be given after the command; SUPPRESS keeps the defaults of the main parser otherwise.
+    common_options = argparse.ArgumentParser(add_help=False)
+    common_options.add_argument("--db", type=Path, default=argparse.SUPPRESS, help="Path to the SQLite database file.")
+    common_options.add_argument("--format", choices=OUTPUT_FORMATS, default=argparse.SUPPRESS, help="Output format of the results.")
+    common_options.add_argument("--mock-data", action="store_true", default=argparse.SUPPRESS, help="Insert the mock data if the database is empty.")
+    common_options.add_argument("--query-log", action="store_true", default=argparse.SUPPRESS, help="Time every SQL statement, log the slow ones and print the statistics on exit.")
+    common_options.add_argument("--slow-query-ms", type=float, default=argparse.SUPPRESS, help="Statements slower than this are written to the slow-query log.")
+    common_options.add_argument("--slow-query-log", type=Path, default=argparse.SUPPRESS, help="File the slow statements and their query plans are appended to.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    add_flight_parser = commands.add_parser("add-flight", parents=[common_options], help="Add a new flight.")
+    add_flight_parser.add_argument("--number", required=True, help="Flight number, e.g., AA123.")
+    add_flight_parser.add_argument("--aircraft", required=True, help="Aircraft model, e.g., 'Airbus A320-200'.")
+    add_flight_parser.add_argument("--from", dest="departure_airport", required=True, help="Departure airport code, e.g., LHR.")
+    add_flight_parser.add_argument("--to", dest="destination_airport", required=True, help="Destination airport code, e.g., JFK.")
+    add_flight_parser.add_argument("--departure", required=True, help="Departure time, e.g., '2026-02-01 10:30'.")
+    add_flight_parser.add_argument("--arrival", required=True, help="Destination arrival time, e.g., '2026-02-01 13:30'.")
+    add_flight_parser.add_argument("--status", default="SCHEDULED", help=f"Flight status {valid_flight_statuses}.")
+
+    view_flights_parser = commands.add_parser("view-flights", parents=[common_options], help="View flights by criteria (at least one criterion).")
+    view_flights_parser.add_argument("--destination", type=parse_list_argument, default=[], help="Destination airport code(s), e.g., JFK or JFK,LAX.")
+    view_flights_parser.add_argument("--from-airport", type=parse_list_argument, default=[], help="Departure airport code(s), e.g., LHR.")
+    view_flights_parser.add_argument("--departure", type=parse_datetime_argument, help="Exact departure time, e.g., '2026-02-01 10:30'.")
+    view_flights_parser.add_argument("--departure-from", type=parse_datetime_argument, help="Earliest departure time, e.g., '2026-02-01 00:00'.")
+    view_flights_parser.add_argument("--departure-to", type=parse_datetime_argument, help="Latest departure time, e.g., '2026-02-01 23:59'.")
+    view_flights_parser.add_argument("--status", type=parse_flight_statuses_argument, default=[], help="Flight status(es), e.g., SCHEDULED,DELAYED.")
+    view_flights_parser.add_argument("--page-size", type=int, help="Print only one page of this many flights and the --after value of the next page.")
+    view_flights_parser.add_argument("--after", type=parse_page_key_argument, help="Start the page after this key (printed with the previous page).")
+
+    update_flight_parser = commands.add_parser("update-flight", parents=[common_options], help="Update the departure time and/or status of a flight.")
+    update_flight_parser.add_argument("flight_number", help="Flight number, e.g., AA123.")
+    update_flight_parser.add_argument("--departure", type=parse_datetime_argument, help="New departure time, e.g., '2026-02-01 10:30'.")
+    update_flight_parser.add_argument("--status", type=parse_flight_status_argument, help=f"New flight status {valid_flight_statuses}.")
+
+    bulk_update_parser = commands.add_parser("bulk-update-flights", parents=[common_options], help="Set the status and/or shift the times of every flight matching the criteria.")
+    bulk_update_parser.add_argument("--destination", type=parse_list_argument, default=[], help="Destination airport code(s), e.g., JFK or JFK,LAX.")
+    bulk_update_parser.add_argument("--from-airport", type=parse_list_argument, default=[], help="Departure airport code(s), e.g., LHR.")
+    bulk_update_parser.add_argument("--departure-from", type=parse_datetime_argument, help="Earliest departure time, e.g., '2026-03-01 14:00'.")
+    bulk_update_parser.add_argument("--departure-to", type=parse_datetime_argument, help="Latest departure time, e.g., '2026-03-01 18:00'.")
+    bulk_update_parser.add_argument("--status", type=parse_flight_statuses_argument, default=[], help="Current flight status(es), e.g., SCHEDULED.")
+    bulk_update_parser.add_argument("--set-status", type=parse_flight_status_argument, help=f"New flight status {valid_flight_statuses}.")
+    bulk_update_parser.add_argument("--shift-minutes", type=int, default=0, help="Minutes added to the departure (and arrival) times, e.g., 90 or -30.")
+    bulk_update_parser.add_argument("--shift-arrival-minutes", type=int, help="Minutes added to the arrival times (default: --shift-minutes).")
+    bulk_update_parser.add_argument("--dry-run", action="store_true", help="Report the flights that would be updated without saving the changes.")
+
+    assign_pilot_parser = commands.add_parser("assign-pilot", parents=[common_options], help="Assign a pilot to a flight.")
+    assign_pilot_parser.add_argument("--license", required=True, help="Pilot license number, e.g., LIC-UK-7Q2A91.")
+    assign_pilot_parser.add_argument("--flight", required=True, help="Flight number, e.g., AA123.")
+    assign_pilot_parser.add_argument("--min-rest", type=int, default=MIN_REST_MINUTES, help="Minimum rest between two flights of the pilot, in minutes.")
+
+    pilot_schedule_parser = commands.add_parser("pilot-schedule", parents=[common_options], help="View a pilot's schedule.")
+    pilot_schedule_parser.add_argument("license_number", help="Pilot license number, e.g., LIC-UK-7Q2A91.")
+
+    commands.add_parser("summary", parents=[common_options], help="View the summary queries.")
+
+    search_parser = commands.add_parser("search", parents=[common_options], help="Search the airports, aircraft models and pilots, tolerating typos.")
+    search_parser.add_argument("text", help="Any part of a name or code (at least 3 characters), e.g., Heathrow.")
+    search_parser.add_argument("--kind", choices=SEARCH_KINDS, action="append", help="Only search this kind (repeatable). Default: all kinds.")
+    search_parser.add_argument("--limit", type=int, default=SEARCH_RESULT_LIMIT, help="Maximum number of results.")
+    commands.add_parser("rebuild-search-index", parents=[common_options], help="Rebuild the search indices from the Destination, Pilot and Aircraft tables.")
+    commands.add_parser("verify-summaries", parents=[common_options], help="Check the summary tables against the Flight and Flight_Pilot tables.")
+    commands.add_parser("rebuild-summaries", parents=[common_options], help="Rebuild the summary tables from the Flight and Flight_Pilot tables.")
+
+    migrate_parser = commands.add_parser("migrate-flight-times", parents=[common_options], help="Convert the TEXT flight times of an existing database to INTEGER minutes.")
+    migrate_parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="Number of flights copied per transaction.")
+
+    export_changes_parser = commands.add_parser("export-changes", parents=[common_options], help="Print the changes to Flight and Flight_Pilot after a cursor as JSON Lines.")
+    export_changes_parser.add_argument("--since", type=int, default=0, help="ChangeSeq of the last change already read (printed by the previous export).")
+    export_changes_parser.add_argument("--limit", type=int, help="Maximum number of changes to print.")
+
+    compact_changes_parser = commands.add_parser("compact-changes", parents=[common_options], help="Remove the superseded and expired changes from the change log.")
+    compact_changes_parser.add_argument("--retention-days", type=int, default=CHANGE_LOG_RETENTION_DAYS, help="Changes older than this are removed.")
+    compact_changes_parser.add_argument("--max-changes", type=int, default=CHANGE_LOG_MAX_CHANGES, help="Maximum number of changes kept.")
+
+    archive_parser = commands.add_parser("archive-flights", parents=[common_options], help="Move the ARRIVED and CANCELLED flights of past months to monthly archive databases.")
+    archive_parser.add_argument("--before", type=parse_datetime_argument, default=datetime.now().strftime("%Y-%m-01 00:00"),
+                                help="Archive the months that end before this time (default: the start of the current month).")
+    archive_parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards, so that its file shrinks.")
+
+    audit_conflicts_parser = commands.add_parser("audit-conflicts", parents=[common_options], help="Find the scheduling conflicts of all pilot assignments.")
+    audit_conflicts_parser.add_argument("--min-rest", type=int, default=MIN_REST_MINUTES, help="Minimum rest between two flights of a pilot, in minutes.")
+
+    auto_assign_parser = commands.add_parser("auto-assign", parents=[common_options], help="Assign active pilots to the understaffed flights of a time window.")
+    auto_assign_parser.add_argument("--departure-from", type=parse_datetime_argument, required=True, help="Earliest departure time, e.g., '2026-03-01 00:00'.")
+    auto_assign_parser.add_argument("--departure-to", type=parse_datetime_argument, required=True, help="Latest departure time, e.g., '2026-03-31 23:59'.")
+    auto_assign_parser.add_argument("--pilots-per-flight", type=int, default=PILOTS_PER_FLIGHT, help="Number of pilots each flight needs.")
+    auto_assign_parser.add_argument("--min-rest", type=int, default=MIN_REST_MINUTES, help="Minimum rest between two flights of a pilot, in minutes.")
+    auto_assign_parser.add_argument("--dry-run", action="store_true", help="Report the result without saving the assignments.")
+    return parser
+
+def print_rows(rows, headers: list, output_format: str = "table") -> None:
+    """Print query results (a list, a cursor or any iterable of rows) in one of OUTPUT_FORMATS, streamed by result_renderer.py."""
+    render_rows(rows, headers, output_format)
+
+def print_row_pages(pages, headers: list, output_format: str = "table") -> None:
+    """Print query results page by page (see print_rows()), so that only one page at a time is held in memory."""
+    render_rows(chain.from_iterable(pages), headers, output_format)
+
+def open_database(db_path: Path, query_log: QueryLog = None, mock_data: bool = False) -> ConnectionManager:
+    """
+    Open the database for a command or the menu. An up-to-date database is recognised by its schema version alone; otherwise
+    the pending schema migrations are applied. The mock data is only inserted if requested (and only into an empty database).
+    The set-up messages are printed to stderr so that they do not mix with the results.
+    """
+    db = ConnectionManager(db_path, query_log=query_log)
+    try:
+        if get_schema_version(db.writer) < SCHEMA_VERSION:
+            if flight_times_are_text(db.writer):
+                db.close()
+                sys.exit("Error. The database stores the flight times as text. Run: python main.py migrate-flight-times")
+            with redirect_stdout(sys.stderr):
+                initialise_db(db.writer)
+    except ValueError as e:
+        db.close()
+        sys.exit(f"Error. {e}")
+    if mock_data:
+        with redirect_stdout(sys.stderr):
+            populate_db(db.writer)
+    return db
+
+def resolve_airport_codes(conn: sqlite3.Connection, airport_codes: list) -> list:
+    """Return the DestinationIds of the airport codes; ends the program with an error if a code is not found."""
+    airport_ids = []
+    for code in airport_codes:
+        airport = destination_cache.get(conn, code)
+        if not airport:
+            sys.exit(f"Error. Airport Code not found in the database: {code}." + format_suggestions(conn, "airport", code))
+        airport_ids.append(airport[1])
+    return airport_ids
+
+def run_command(args: argparse.Namespace, query_log: QueryLog = None) -> None:
+    """Run the operation of a command. Errors are printed to stderr and end the program with exit code 1."""
+    if args.command == "migrate-flight-times":
+        db = ConnectionManager(args.db, query_log=query_log)
+        try:
+            n_flights = migrate_flight_times(db.writer, args.batch_size)
+            with redirect_stdout(sys.stderr):
+                initialise_db(db.writer)
+        except ValueError as e:
+            sys.exit(f"Error. {e}")
+        finally:
+            db.close()
+        print(f"Flight times of {n_flights:,} flights migrated successfully." if n_flights else "Flight times are already stored as INTEGER minutes.")
+        return
+
+    db = open_database(args.db, query_log, args.mock_data)
+    try:
+        if args.command == "add-flight":
+            if flight_cache.get(db.reader, args.number):
+                sys.exit("Error. Flight number already exists in the database.")
+            try:
+                flight = validate_new_flight(db.reader, args.aircraft, args.departure_airport, args.destination_airport,
+                                             args.departure, args.arrival, args.status)
+            except ValueError as e:
+                sys.exit(f"Error. {e}")
+            create_flight(db, args.number, *flight)
+            print_rows([get_flight_information(db.reader, args.number)[:3]], ["Flight Number", "Departure Time", "Flight Status"], args.format)
+
+        elif args.command == "view-flights":
+            criteria = {
+                "destination_airport_ids": resolve_airport_codes(db.reader, args.destination),
+                "departure_airport_ids": resolve_airport_codes(db.reader, args.from_airport),
+                "departure_from": args.departure or args.departure_from or "",
+                "departure_to": args.departure or args.departure_to or "",
+                "flight_statuses": args.status,
+            }
+            if not any(criteria.values()):
+                sys.exit("Error. No criteria provided. Please, specify at least one criterion.")
+
+            if args.page_size:
+                page = search_flights(db.reader, **criteria, after=args.after, page_size=args.page_size)
+                print_rows([flight[:-1] for flight in page], FLIGHT_INFORMATION_HEADERS, args.format)
+                if len(page) == args.page_size:
+                    print(f"Next page: --after '{page[-1][1]}|{page[-1][-1]}'", file=sys.stderr)
+            else:
+                pages = iter_flight_pages(db.reader, page_size=FLIGHT_EXPORT_PAGE_SIZE, **criteria)
+                print_row_pages(([flight[:-1] for flight in page] for page in pages), FLIGHT_INFORMATION_HEADERS, args.format)
+
+        elif args.command == "update-flight":
+            flight_information = get_flight_information(db.reader, args.flight_number)
+            if not flight_information:
+                sys.exit("Error. Flight not found.")
+            try:
+                updated_flight_information = update_flight(db, flight_information[3], args.flight_number, args.departure or "", args.status or "")
+                if not updated_flight_information:
+                    sys.exit("Error. No new information provided. Use --departure and/or --status.")
+            except (sqlite3.IntegrityError, ValueError) as e:
+                sys.exit(f"Error. Update failed: {e}")
+            print_rows([updated_flight_information[:3]], ["Flight Number", "Departure Time", "Flight Status"], args.format)
+
+        elif args.command == "bulk-update-flights":
+            criteria = {
+                "destination_airport_ids": resolve_airport_codes(db.reader, args.destination),
+                "departure_airport_ids": resolve_airport_codes(db.reader, args.from_airport),
+                "departure_from": args.departure_from or "",
+                "departure_to": args.departure_to or "",
+                "flight_statuses": args.status,
+            }
+            try:
+                updated_flights = bulk_update_flights(db, criteria, args.set_status or "", args.shift_minutes, args.shift_arrival_minutes, args.dry_run)
+            except (sqlite3.IntegrityError, ValueError) as e:
+                sys.exit(f"Error. Bulk update failed: {e}")
+            print_rows(updated_flights, FLIGHT_CHANGE_HEADERS, args.format)
+            print(f"{len(updated_flights):,} flight(s) {'would be ' if args.dry_run else ''}updated.", file=sys.stderr)
+
+        elif args.command == "assign-pilot":
+            pilot_information = pilot_cache.get(db.reader, args.license)
+            if not pilot_information:
+                sys.exit("Error. License Number not found." + format_suggestions(db.reader, "pilot", args.license))
+            if not pilot_information[3]: # IsActive column
+                sys.exit("Error. Pilot does not have an active employment status.")
+            flight_information = flight_cache.get(db.reader, args.flight)
+            if not flight_information:
+                sys.exit("Error. Flight not found.")
+            try:
+                assign_pilot(db, flight_information[1], pilot_information[4], args.min_rest)
+            except ValueError as e:
+                sys.exit(f"Error. Assignment failed (scheduling conflict): {e}")
+            except sqlite3.IntegrityError as e:
+                sys.exit(f"Error. Assignment failed (maybe duplicate assignment): {e}")
+            print_rows([(pilot_information[0], flight_information[0])], ["License Number", "Flight Number"], args.format)
+
+        elif args.command == "pilot-schedule":
+            pilot_information = pilot_cache.get(db.reader, args.license_number)
+            if not pilot_information:
+                sys.exit("Error. License Number not found." + format_suggestions(db.reader, "pilot", args.license_number))
+            print_rows(get_pilot_schedule(db.reader, pilot_information[4]), PILOT_SCHEDULE_HEADERS, args.format)
+
+        elif args.command == "summary":
+            flights_per_destination = get_flights_per_destination(db.reader)
+            flights_per_pilot = get_flights_per_pilot(db.reader)
+            if args.format == "json":
+                print(json.dumps({
+                    "flights_per_destination": [dict(zip(FLIGHTS_PER_DESTINATION_HEADERS, row)) for row in flights_per_destination],
+                    "flights_per_pilot": [dict(zip(FLIGHTS_PER_PILOT_HEADERS, row)) for row in flights_per_pilot],
+                }, indent=2))
+            else:
+                print_rows(flights_per_destination, FLIGHTS_PER_DESTINATION_HEADERS, args.format)
+                if args.format != "jsonl":
+                    print()
+                print_rows(flights_per_pilot, FLIGHTS_PER_PILOT_HEADERS, args.format)
+
+        elif args.command == "verify-summaries":
+            mismatches = verify_summary_tables(db.reader)
+            rows = [(table, key, stored_count, actual_count) for table, table_mismatches in mismatches.items()
+                    for key, stored_count, actual_count in table_mismatches]
+            print_rows(rows, ["Summary Table", "Id", "Stored Count", "Actual Count"], args.format)
+            if rows:
+                sys.exit("Error. The summary tables do not match the raw data. Run the rebuild-summaries command.")
+
+        elif args.command == "search":
+            try:
+                results = search(db.reader, args.text, args.kind or SEARCH_KINDS, args.limit)
+            except ValueError as e:
+                sys.exit(f"Error. {e}")
+            print_rows([(kind, code, description, round(score, 2)) for kind, code, description, score in results], SEARCH_RESULT_HEADERS, args.format)
+
+        elif args.command == "rebuild-search-index":
+            rebuild_search_index(db.writer)
+            print("Search indices rebuilt successfully.")
+
+        elif args.command == "rebuild-summaries":
+            rebuild_summary_tables(db.writer)
+            print("Summary tables rebuilt successfully.")
+
+        elif args.command == "export-changes":
+            cursor = args.since
+            try:
+                for cursor, change in iter_changes(db.reader, args.since, args.limit):
+                    print(change)
+            except ValueError as e:
+                sys.exit(f"Error. {e} Current cursor: {get_change_cursor(db.reader)}.")
+            print(f"Next cursor: --since {cursor}", file=sys.stderr)
+
+        elif args.command == "compact-changes":
+            statistics = compact_change_log(db.writer, args.retention_days, args.max_changes)
+            print(f"{statistics['compacted']:,} superseded change(s) and {statistics['purged']:,} expired change(s) removed.")
+            if statistics["purged"]:
+                print(f"Consumers with a cursor before {statistics['purged_through']} must re-read the tables.")
+
+        elif args.command == "archive-flights":
+            archived = archive_flights(db.writer, args.before)
+            query_result_cache.clear()
+            print_rows(archived, ARCHIVE_HEADERS, args.format)
+            if args.vacuum and archived:
+                db.writer.execute("VACUUM;")
+            print(f"{sum(n_flights for _, n_flights, _ in archived):,} flight(s) archived in {len(archived)} month(s).", file=sys.stderr)
+
+        elif args.command == "audit-conflicts":
+            conflicts = audit_pilot_assignments(db.reader, args.min_rest)
+            n_conflicts = 0
+            def count_conflicts(page):
+                nonlocal n_conflicts
+                n_conflicts += len(page)
+                return page
+            print_row_pages((count_conflicts(page) for page in batched(conflicts, FLIGHT_EXPORT_PAGE_SIZE)), PILOT_CONFLICT_HEADERS, args.format)
+            if n_conflicts:
+                sys.exit(f"Error. {n_conflicts:,} scheduling conflict(s) found.")
+
+        elif args.command == "auto-assign":
+            statistics = auto_assign_pilots(db.writer, args.departure_from, args.departure_to, args.pilots_per_flight, args.min_rest, args.dry_run)
+            print_rows(statistics["uncovered"], UNCOVERED_FLIGHT_HEADERS, args.format)
+            print(
+                f"{statistics['assignments']:,} assignment(s) {'planned' if args.dry_run else 'saved'} for {statistics['flights']:,} understaffed flight(s) "
+                f"and {statistics['pilots']:,} active pilot(s). {statistics['uncovered_flights']:,} flight(s) could not be fully covered.",
+                file=sys.stderr,
+            )
+    finally:
+        db.close()
 
 # ==============================================================
 # Main Logic of the program
 # ==============================================================
-def main() -> None:
-    """Main function that initialises the Flight Management database and launches the CLI for user interaction."""
-    with connect_db() as conn:
-        initialise_db(conn)
-        populate_db(conn)
+def main(argv: list = None) -> None:
+    """
+    Main function that initialises the Flight Management database and launches the CLI for user interaction.
+    If a command is given on the command line, only that operation is run (see build_argument_parser()).
+    With --query-log, every SQL statement is timed and attributed to the menu option or command that sent it; the statistics
+    are printed on exit (to stderr for a command) and the slow statements are written to the slow-query log.
+    """
+    args = build_argument_parser().parse_args(argv)
+    query_log = QueryLog(args.slow_query_ms, args.slow_query_log) if args.query_log else None
+    if args.command:
+        try:
+            with query_operation(args.command):
+                run_command(args, query_log)
+        finally:
+            if query_log:
+                with redirect_stdout(sys.stderr):
+                    print_query_statistics(query_log)
+        return
+
+    db = open_database(args.db, query_log, args.mock_data)
 
     # Menu interface options
     menu = {
@@ -632,6 +1747,7 @@ def main() -> None:
         "4": ("Assign Pilot to Flight", assign_pilot_to_flight),
         "5": ("View Pilot Schedule", view_pilot_schedule),
         "6": ("Additional Summary Queries", additional_summary_queries),
+        "7": ("Search Airports, Aircraft and Pilots", search_reference_data),
     }
 
     # Display menu options
@@ -648,10 +1764,15 @@ def main() -> None:
         print("="*50)
 
         # Get user input
-        choice = input("\nPlease, select one of the above options (0-6): ").strip()
+        choice = input("\nPlease, select one of the above options (0-7): ").strip()
 
         # Specify user interaction logic for each menu option
         if choice == "0":
+            print("\nCache statistics:")
+            print_cache_statistics()
+            if query_log:
+                print("\nQuery statistics:")
+                print_query_statistics(query_log)
             print("\nTerminating the session. Goodbye!\n")
             break
         
@@ -661,7 +1782,10 @@ def main() -> None:
             continue
 
         # Execute user-selected command
-        command[1](conn)
+        with query_operation(command[0]):
+            command[1](db)
+
+    db.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import heapq
+import sqlite3
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Assignments of a pilot ordered by departure time (read in the order of idx_pilot_assignment_interval_pilot_departure,
+# so that the sweep does not sort). The second column is the end of the rest period after the flight, in INTEGER minutes.
+PILOT_INTERVAL_SWEEP_QUERY = """
+    SELECT PilotId, DestinationArrivalMinute + ? AS RestedMinute, DepartureMinute, DestinationArrivalMinute, FlightId
+    FROM PilotAssignmentInterval
+    WHERE FlightStatus <> 'CANCELLED'
+    ORDER BY PilotId, DepartureMinute;
+"""
+
+# Assignments that start before the pilot's EmploymentStartDate or end after the EmploymentEndDate (converted to minutes).
+EMPLOYMENT_VIOLATION_QUERY = """
+    SELECT i.PilotId, i.FlightId
+    FROM PilotAssignmentInterval AS i
+    JOIN Pilot AS p
+        ON p.PilotId = i.PilotId
+    WHERE i.FlightStatus <> 'CANCELLED'
+      AND (i.DepartureMinute < unixepoch(p.EmploymentStartDate) / 60 OR i.DestinationArrivalMinute > unixepoch(p.EmploymentEndDate) / 60)
+    ORDER BY i.PilotId, i.DepartureMinute;
+"""
+
+PILOT_CONFLICT_HEADERS = [
+    "License Number",
+    "Flight Number",
+    "Departure Time",
+    "Arrival Time",
+    "Conflicting Flight Number",
+    "Conflict",
+]
+
+# ==============================================================
+# Audit the pilot assignments
+# ==============================================================
+def iter_interval_conflicts(conn: sqlite3.Connection, min_rest_minutes: int):
+    """
+    Find every pair of assignments of the same pilot that overlap or leave less than min_rest_minutes between them,
+    in one sweep over all assignments ordered by pilot and departure time.
+    Yields (PilotId, FlightId, earlier FlightId, conflict) where conflict is "OVERLAP" or "REST".
+    Only the assignments that are still in progress (a min-heap on the end of their rest period) are kept in memory.
+    """
+    current_pilot_id = None
+    in_progress = []
+    for pilot_id, rested_minute, departure_minute, arrival_minute, flight_id in conn.execute(PILOT_INTERVAL_SWEEP_QUERY, (min_rest_minutes,)):
+        if pilot_id != current_pilot_id:
+            current_pilot_id = pilot_id
+            in_progress.clear()
+        while in_progress and in_progress[0][0] <= departure_minute:
+            heapq.heappop(in_progress)
+        for _, earlier_arrival_minute, earlier_flight_id in in_progress:
+            yield pilot_id, flight_id, earlier_flight_id, "OVERLAP" if departure_minute < earlier_arrival_minute else "REST"
+        heapq.heappush(in_progress, (rested_minute, arrival_minute, flight_id))
+
+def iter_employment_violations(conn: sqlite3.Connection):
+    """Yield (PilotId, FlightId, None, "EMPLOYMENT") for every assignment outside the pilot's employment dates."""
+    for pilot_id, flight_id in conn.execute(EMPLOYMENT_VIOLATION_QUERY):
+        yield pilot_id, flight_id, None, "EMPLOYMENT"
+
+def audit_pilot_assignments(conn: sqlite3.Connection, min_rest_minutes: int):
+    """
+    Yield every scheduling conflict of the existing assignments, in the column order of PILOT_CONFLICT_HEADERS.
+    Cancelled flights are ignored. Flight numbers and license numbers are only looked up for the conflicts found.
+    """
+    license_numbers = {}
+    for conflicts in (iter_interval_conflicts(conn, min_rest_minutes), iter_employment_violations(conn)):
+        for pilot_id, flight_id, other_flight_id, conflict in conflicts:
+            if pilot_id not in license_numbers:
+                license_numbers[pilot_id] = conn.execute("SELECT LicenseNumber FROM Pilot WHERE PilotId = ?;", (pilot_id,)).fetchone()[0]
+            flight_number, departure_time, arrival_time = conn.execute(
+                "SELECT FlightNumber, DepartureTime, DestinationArrivalTime FROM Flight WHERE FlightId = ?;", (flight_id,)
+            ).fetchone()
+            other_flight_number = None
+            if other_flight_id is not None:
+                other_flight_number = conn.execute("SELECT FlightNumber FROM Flight WHERE FlightId = ?;", (other_flight_id,)).fetchone()[0]
+            yield license_numbers[pilot_id], flight_number, departure_time, arrival_time, other_flight_number, conflict
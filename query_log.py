@@ -0,0 +1,201 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Statements that take longer than this (from execute() until their last row is fetched) are written to the slow-query log.
+SLOW_QUERY_THRESHOLD_MS = 100.0
+SLOW_QUERY_LOG_PATH = Path("./slow_queries.log")
+
+# Operation recorded for the statements sent outside query_operation(), e.g., while the database is opened.
+NO_OPERATION = "-"
+
+# Name of the operation (menu option or command) that is running; set with query_operation().
+current_operation = ContextVar("current_operation", default=NO_OPERATION)
+
+# ==============================================================
+# Operation context
+# ==============================================================
+@contextmanager
+def query_operation(name: str):
+    """Record the statements sent inside the with-block as sent by the operation name (e.g., a menu option)."""
+    token = current_operation.set(name)
+    try:
+        yield
+    finally:
+        current_operation.reset(token)
+
+# ==============================================================
+# Query log - aggregated counters and slow-query log
+# ==============================================================
+class QueryLog:
+    """
+    Collects the timing and row count of every statement sent through an instrumented connection (see connect_db()).
+    The counters are aggregated per (operation, statement). Statements slower than slow_query_threshold_ms are also appended,
+    with their EXPLAIN QUERY PLAN, to the slow-query log file.
+    """
+    def __init__(self, slow_query_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, slow_query_log_path: Path = SLOW_QUERY_LOG_PATH):
+        self.slow_query_threshold = slow_query_threshold_ms / 1000
+        self.slow_query_log_path = Path(slow_query_log_path)
+        self.statistics = {} # (operation, statement) -> [calls, rows, total seconds, max seconds]
+        self.n_slow_queries = 0
+        self._lock = threading.Lock()
+
+    def record(self, conn: sqlite3.Connection, operation: str, sql: str, parameters, elapsed: float, n_rows: int) -> None:
+        """Add one run of a statement to the counters, and to the slow-query log if it is slow."""
+        statement = " ".join(sql.split())
+        with self._lock:
+            counters = self.statistics.get((operation, statement))
+            if counters is None:
+                counters = self.statistics[(operation, statement)] = [0, 0, 0.0, 0.0]
+            counters[0] += 1
+            counters[1] += n_rows
+            counters[2] += elapsed
+            counters[3] = max(counters[3], elapsed)
+        if elapsed >= self.slow_query_threshold:
+            self.write_slow_query(conn, operation, statement, parameters, elapsed, n_rows)
+
+    def write_slow_query(self, conn: sqlite3.Connection, operation: str, statement: str, parameters, elapsed: float, n_rows: int) -> None:
+        """Append a slow statement, its parameters and its query plan to the slow-query log."""
+        if parameters is None: # executemany(): the plan does not depend on the values.
+            parameters = [None] * statement.count("?")
+        try:
+            plan = [detail for _, _, _, detail in sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + statement, parameters)]
+        except sqlite3.Error as e:
+            plan = [f"(not available: {e})"]
+
+        with self._lock:
+            self.n_slow_queries += 1
+            with self.slow_query_log_path.open("a", encoding="utf-8") as log_file:
+                log_file.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} | {operation} | {elapsed * 1000:.1f} ms | {n_rows} rows\n")
+                log_file.write(f"\t{statement}\n")
+                log_file.write(f"\tParameters: {parameters!r}\n")
+                for detail in plan:
+                    log_file.write(f"\tQUERY PLAN: {detail}\n")
+                log_file.write("\n")
+
+    def summary(self, limit: int = None) -> list:
+        """Return (operation, statement, calls, rows, total ms, mean ms, max ms) ordered by total time, the slowest first."""
+        with self._lock:
+            rows = [(operation, statement, calls, n_rows, total * 1000, total * 1000 / calls, maximum * 1000)
+                    for (operation, statement), (calls, n_rows, total, maximum) in self.statistics.items()]
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows[:limit]
+
+# ==============================================================
+# Instrumented connection and cursor
+# ==============================================================
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that measures each statement from execute() until its last row is fetched (SQLite computes the rows while they are
+    fetched) and reports it to the QueryLog of its connection once it is finished: all rows fetched, the next statement executed,
+    or the cursor closed or released.
+    """
+    _sql = None
+
+    def _start(self, sql: str, parameters) -> None:
+        self._finish()
+        self._sql = sql
+        self._parameters = parameters
+        self._operation = current_operation.get()
+        self._elapsed = 0.0
+        self._n_rows = 0
+
+    def _finish(self) -> None:
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        # Rows returned by a query, or rows changed by an INSERT / UPDATE / DELETE.
+        n_rows = self._n_rows if self.description is not None else max(self.rowcount, 0)
+        try:
+            self.connection.query_log.record(self.connection, self._operation, sql, self._parameters, self._elapsed, n_rows)
+        except sqlite3.ProgrammingError: # The connection has been closed.
+            pass
+
+    def execute(self, sql: str, parameters=()):
+        self._start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self._start(sql, None)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - start
+        if row is None:
+            self._finish()
+        else:
+            self._n_rows += 1
+        return row
+
+    def fetchmany(self, size: int = None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._elapsed += time.perf_counter() - start
+        self._n_rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - start
+        self._n_rows += len(rows)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - start
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - start
+        self._n_rows += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors report every statement to query_log (see InstrumentedCursor). executescript() is not instrumented."""
+    query_log = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
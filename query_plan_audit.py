@@ -0,0 +1,141 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import ast
+import sqlite3
+import sys
+from itertools import product
+from pathlib import Path
+
+import main
+import search_index
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Modules whose literal SQL statements are audited.
+AUDITED_MODULE_PATHS = [Path(__file__).with_name(name) for name in ("main.py", "pilot_conflicts.py", "crew_assignment.py", "change_log.py", "search_index.py", "analytics.py", "snapshot_export.py", "route_graph.py", "flight_archive.py")]
+
+# Full table scans that are intended, i.e., reports on every row of a table (key: (function name, query plan line)).
+FULL_SCAN_ALLOWED = {
+    ("Aircraft cache", "SCAN Aircraft"): "the Aircraft reference table is loaded into memory once",
+    ("Destination cache", "SCAN Destination"): "the Destination reference table is loaded into memory once",
+    ("get_flights_per_destination", "SCAN s"): "the number of flights is reported for every destination (one summary row each)",
+    ("get_flights_per_pilot", "SCAN p"): "the number of flights assigned to each pilot is reported for every pilot",
+    ("ACTIVE_PILOTS_QUERY", "SCAN p"): "the automatic crew assignment considers every active pilot",
+    ("compact_change_log", "SCAN ChangeLog"): "the compaction checks every change for a later change of the same row",
+    ("AIRCRAFT_LABELS_QUERY", "SCAN Aircraft"): "the analytics reports label every aircraft of the merged results",
+}
+
+# ==============================================================
+# Collect SQL statements
+# ==============================================================
+def collect_literal_statements(source: str) -> list:
+    """
+    Collect the SQL statements passed as string literals to conn.execute() / conn.executemany(), and the SQL statements
+    assigned to module-level *_QUERY constants (labelled with the constant name).
+    """
+    statements = []
+    tree = ast.parse(source)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id.endswith("_QUERY"):
+                    statements.append((target.id, target.id, node.value.value))
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        for node in ast.walk(function):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                continue
+            if node.func.attr not in ("execute", "executemany") or not node.args:
+                continue
+            sql = node.args[0]
+            if isinstance(sql, ast.Constant) and isinstance(sql.value, str) and not sql.value.strip().upper().startswith("PRAGMA"):
+                statements.append((function.name, f"{function.name}() line {node.lineno}", sql.value))
+    return statements
+
+def collect_dynamic_statements() -> list:
+    """Collect every variant of the SQL statements that main.py builds at runtime."""
+    statements = []
+
+    # search_flights(): every non-empty combination of the criteria of view_flights_by_criteria(), with and without a page key.
+    for destination_airport_ids, departure_airport_ids, departure_from, departure_to, flight_statuses, after in product(
+        ((), (1,)), ((), (2,)), ("", "2026-03-01 00:00"), ("", "2026-03-31 23:59"), ((), ("SCHEDULED",)), (None, ("2026-03-01 10:30", 1))
+    ):
+        if not (destination_airport_ids or departure_airport_ids or departure_from or departure_to or flight_statuses):
+            continue
+        sql, _ = main.build_flight_search_query(destination_airport_ids, departure_airport_ids, departure_from, departure_to, flight_statuses, after)
+        name = f"search_flights({destination_airport_ids}, {departure_airport_ids}, {departure_from!r}, {departure_to!r}, {flight_statuses}, {after})"
+        statements.append(("search_flights", name, sql))
+
+    # Reference data caches: the look-up (or table load) queries.
+    for cache in main.reference_data_caches:
+        statements.append((f"{cache.name} cache", f"{cache.name} cache", cache.sql))
+
+    # search(): the substring / near-match query of each kind, and the trigram counts of build_near_match_query().
+    for kind, sql in search_index.SEARCH_QUERIES.items():
+        statements.append(("search", f"search() {kind}", sql))
+        statements.append(("build_near_match_query", f"build_near_match_query() {kind}",
+                           f"SELECT term, doc FROM {search_index.SEARCH_VOCABULARIES[kind]} WHERE term IN (?, ?) ORDER BY doc;"))
+
+    # update_flight(): the UPDATE statement built from the provided fields.
+    for updates in (["DepartureMinute = ?"], ["FlightStatus = ?"], ["DepartureMinute = ?", "FlightStatus = ?"]):
+        statements.append(("update_flight", f"update_flight() SET {', '.join(updates)}", f"UPDATE Flight SET {', '.join(updates)} WHERE FlightId = ?;"))
+
+    # bulk_update_flights(): every non-empty combination of the criteria, with a status change and a time shift.
+    for destination_airport_ids, departure_airport_ids, departure_from, departure_to, flight_statuses in product(
+        ((), (1,)), ((), (2,)), ("", "2026-03-01 14:00"), ("", "2026-03-01 18:00"), ((), ("SCHEDULED",))
+    ):
+        criteria = {
+            "destination_airport_ids": destination_airport_ids,
+            "departure_airport_ids": departure_airport_ids,
+            "departure_from": departure_from,
+            "departure_to": departure_to,
+            "flight_statuses": flight_statuses,
+        }
+        if not any(criteria.values()):
+            continue
+        sql, _ = main.build_bulk_flight_update(criteria, "DELAYED", 90, 90)
+        statements.append(("bulk_update_flights", f"bulk_update_flights({destination_airport_ids}, {departure_airport_ids}, {departure_from!r}, {departure_to!r}, {flight_statuses})", sql))
+    return statements
+
+# ==============================================================
+# Audit query plans
+# ==============================================================
+def full_table_scans(conn: sqlite3.Connection, sql: str) -> list:
+    """Return the query plan lines of the statement that scan a table without using an index."""
+    parameters = [None] * sql.count("?")
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    # Scans of a subquery / CTE read a result computed by the statement itself, not a table.
+    return [detail for _, _, _, detail in plan if detail.startswith("SCAN ") and "INDEX" not in detail and not detail.startswith("SCAN (")]
+
+def audit_query_plans(conn: sqlite3.Connection, statements: list) -> int:
+    """Print the full table scans of every statement and return the number of statements that fail the audit."""
+    failures = 0
+    for function_name, name, sql in statements:
+        scans = full_table_scans(conn, sql)
+        disallowed_scans = [scan for scan in scans if (function_name, scan) not in FULL_SCAN_ALLOWED]
+        if disallowed_scans:
+            print(f"FAIL  {name}: {', '.join(disallowed_scans)}")
+            failures += 1
+        elif scans:
+            reasons = "; ".join(FULL_SCAN_ALLOWED[(function_name, scan)] for scan in scans)
+            print(f"ALLOW {name}: {', '.join(scans)} ({reasons})")
+        else:
+            print(f"OK    {name}")
+    return failures
+
+def main_audit() -> int:
+    """Run the audit against an empty in-memory database created from schema.sql."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(main.SCHEMA_SQL_PATH.read_text(encoding="utf-8"))
+
+    statements = [statement for path in AUDITED_MODULE_PATHS for statement in collect_literal_statements(path.read_text(encoding="utf-8"))]
+    statements += collect_dynamic_statements()
+    failures = audit_query_plans(conn, statements)
+    print(f"\n{len(statements)} statements audited, {failures} full table scan(s).")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main_audit())
@@ -0,0 +1,165 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Maximum number of cached results; the least recently used result is evicted beyond it.
+RESULT_CACHE_SIZE = 256
+
+# Seconds a cached result is used for. It is dropped earlier if one of its tables is written (see QueryResultCache).
+RESULT_CACHE_TTL_SECONDS = 60.0
+
+# Results with more rows are not cached; they are streamed from the cursor as usual.
+RESULT_CACHE_MAX_ROWS = 10_000
+
+# Tables read by a statement: the names following FROM and JOIN (subqueries start with a parenthesis and are skipped).
+TABLE_NAME_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+
+# ==============================================================
+# Cached results
+# ==============================================================
+def normalise_sql(sql: str) -> str:
+    """Collapse the whitespace of a statement, so that the same statement written with other indentation has the same key."""
+    return " ".join(sql.split())
+
+def read_tables(sql: str) -> frozenset:
+    """Return the names of the tables (and views) that a SELECT statement reads."""
+    return frozenset(name.casefold() for name in TABLE_NAME_PATTERN.findall(sql))
+
+class CachedCursor:
+    """
+    Read-only cursor over a result: the cached rows, optionally followed by the rows still to be read from a real cursor
+    (a result too large to be cached). Supports the iteration and fetch methods used by main.py.
+    """
+    def __init__(self, rows: list, description, remaining_rows=()):
+        self.description = description
+        self._rows = iter(chain(rows, remaining_rows))
+
+    def __iter__(self):
+        return self._rows
+
+    def __next__(self):
+        return next(self._rows)
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size: int = 1) -> list:
+        return [row for _, row in zip(range(size), self._rows)]
+
+    def fetchall(self) -> list:
+        return list(self._rows)
+
+class QueryResultCache:
+    """
+    Read-through cache of SELECT results, keyed by the normalised SQL and the parameters. Each result is kept for ttl_seconds
+    at most, and the least recently used result is evicted once max_entries results are cached.
+
+    A result is dropped as soon as one of the tables it reads may have changed: invalidate_tables() is called by the writes of
+    this process when they commit, and check_data_version() drops every result when another connection (e.g., another
+    process) has committed. The cache can be shared by threads that each pass their own connection.
+    """
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl_seconds: float = RESULT_CACHE_TTL_SECONDS, max_rows: int = RESULT_CACHE_MAX_ROWS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.entries = OrderedDict() # (sql, parameters) -> (expiry time, tables, description, rows)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.uncached = 0
+        self._data_version = None # (connection, PRAGMA data_version) of the last check
+        self._lock = threading.Lock()
+
+    def execute(self, conn: sqlite3.Connection, sql: str, parameters=()):
+        """Run a SELECT statement on conn, or answer it from the cache. Other statements are run on conn uncached."""
+        normalised_sql = normalise_sql(sql)
+        if not normalised_sql.upper().startswith(("SELECT", "WITH")):
+            return conn.execute(sql, parameters)
+        key = (normalised_sql, tuple(sorted(parameters.items())) if isinstance(parameters, dict) else tuple(parameters))
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return CachedCursor(entry[3], entry[2])
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        cursor = conn.execute(sql, parameters)
+        rows = cursor.fetchmany(self.max_rows + 1)
+        if len(rows) > self.max_rows:
+            with self._lock:
+                self.uncached += 1
+            return CachedCursor(rows, cursor.description, cursor)
+
+        with self._lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, read_tables(normalised_sql), cursor.description, rows)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return CachedCursor(rows, cursor.description)
+
+    def invalidate_tables(self, tables) -> None:
+        """Drop the cached results that read any of the tables, e.g., after a write to them has committed."""
+        tables = {table.casefold() for table in tables}
+        with self._lock:
+            stale_keys = [key for key, entry in self.entries.items() if not tables.isdisjoint(entry[1])]
+            for key in stale_keys:
+                del self.entries[key]
+            self.invalidations += len(stale_keys)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def check_data_version(self, conn: sqlite3.Connection) -> None:
+        """
+        Drop every cached result if another connection has committed to the database since the last check. conn must be the
+        connection that the writes of this process go through: its PRAGMA data_version changes with the commits of every other
+        connection, but not with its own, which invalidate their tables precisely instead.
+        """
+        data_version = (conn, conn.execute("PRAGMA data_version;").fetchone()[0])
+        if data_version != self._data_version:
+            if self._data_version is not None:
+                self.clear()
+            self._data_version = data_version
+
+    def hit_rate(self) -> float:
+        """Share of the SELECT statements answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class CachingConnection:
+    """
+    Connection wrapper whose execute() answers the SELECT statements from a QueryResultCache. Before every statement, the
+    data version of version_conn (the read-write connection of the process) is checked for commits by other connections.
+    The other attributes are those of the wrapped connection.
+    """
+    def __init__(self, conn: sqlite3.Connection, cache: QueryResultCache, version_conn: sqlite3.Connection):
+        self.conn = conn
+        self.cache = cache
+        self.version_conn = version_conn
+
+    def execute(self, sql: str, parameters=()):
+        self.cache.check_data_version(self.version_conn)
+        return self.cache.execute(self.conn, sql, parameters)
+
+    def __getattr__(self, name: str):
+        return getattr(self.conn, name)
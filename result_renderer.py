@@ -0,0 +1,116 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import csv
+import json
+import sys
+from itertools import chain, islice
+
+# ==============================================================
+# Parameters
+# ==============================================================
+OUTPUT_FORMATS = ("table", "json", "jsonl", "csv")
+
+# Number of characters collected before they are written to the output stream. The rows are rendered one at a time, so the
+# memory used does not grow with the number of rows, and the stream is called once per chunk instead of once per line.
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# The column widths of a table are taken from the headers and its first rows (unless they are given, e.g., known from the
+# schema). A longer value in a later row only widens its own line.
+TABLE_WIDTH_SAMPLE_ROWS = 1000
+TABLE_COLUMN_SEPARATOR = " | "
+
+# ==============================================================
+# Buffered output
+# ==============================================================
+class BufferedOutput:
+    """
+    File-like wrapper of a text stream that collects the written strings and writes them to the stream in chunks of about
+    buffer_size characters. The stream defaults to the sys.stdout of the time the object is created (so redirect_stdout()
+    applies). Use it as a context manager, or call flush(), to write the last chunk.
+    """
+    def __init__(self, stream=None, buffer_size: int = OUTPUT_BUFFER_SIZE):
+        self.stream = sys.stdout if stream is None else stream
+        self.buffer_size = buffer_size
+        self._chunks = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        """Collect the text; the collected chunks are written to the stream once they reach buffer_size characters."""
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the collected chunks to the stream."""
+        if self._chunks:
+            self.stream.write("".join(self._chunks))
+            self._chunks.clear()
+            self._size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # After a failed write (e.g., a closed pipe), writing the rest would only fail again.
+        if not isinstance(exc_value, OSError):
+            self.flush()
+
+# ==============================================================
+# Renderers - each writes the rows to a BufferedOutput
+# ==============================================================
+def render_table(rows, headers: list, output: BufferedOutput, widths: list = None) -> None:
+    """Write the rows as a table of left-aligned columns separated by " | ", with a header line and a blank line around it."""
+    rows = iter(rows)
+    if widths is None:
+        sample = list(islice(rows, TABLE_WIDTH_SAMPLE_ROWS))
+        widths = [max([len(str(header))] + [len(str(row[i])) for row in sample]) for i, header in enumerate(headers)]
+        rows = chain(sample, rows)
+    else:
+        widths = [max(width, len(str(header))) for width, header in zip(widths, headers)]
+
+    output.write("\n")
+    output.write(TABLE_COLUMN_SEPARATOR.join(str(header).ljust(width) for header, width in zip(headers, widths)) + "\n")
+    output.write("-" * (sum(widths) + len(TABLE_COLUMN_SEPARATOR) * (len(headers) - 1)) + "\n")
+    for row in rows:
+        output.write(TABLE_COLUMN_SEPARATOR.join(str(value).ljust(width) for value, width in zip(row, widths)) + "\n")
+    output.write("\n")
+
+def render_csv(rows, headers: list, output: BufferedOutput, widths: list = None) -> None:
+    """Write the rows as CSV with a header row."""
+    writer = csv.writer(output)
+    writer.writerow(headers)
+    writer.writerows(rows)
+
+def render_jsonl(rows, headers: list, output: BufferedOutput, widths: list = None) -> None:
+    """Write one JSON object per row and line (JSON Lines), with the headers as keys."""
+    for row in rows:
+        output.write(json.dumps(dict(zip(headers, row))) + "\n")
+
+def render_json(rows, headers: list, output: BufferedOutput, widths: list = None) -> None:
+    """Write the rows as a JSON array of objects, one object per line, with the headers as keys."""
+    separator = "\n  "
+    output.write("[")
+    for row in rows:
+        output.write(separator + json.dumps(dict(zip(headers, row))))
+        separator = ",\n  "
+    output.write("\n]\n")
+
+RENDERERS = {
+    "table": render_table,
+    "json": render_json,
+    "jsonl": render_jsonl,
+    "csv": render_csv,
+}
+
+def render_rows(rows, headers: list = None, output_format: str = "table", stream=None, widths: list = None) -> None:
+    """
+    Write the rows (any iterable, e.g., a cursor, consumed once) to the stream (default: sys.stdout) in one of OUTPUT_FORMATS.
+    Without headers, the column names of the cursor are used. widths sets the minimum column widths of a table and skips the
+    sampling of its first rows.
+    """
+    if headers is None:
+        headers = [column[0] for column in rows.description]
+    with BufferedOutput(stream) as output:
+        RENDERERS[output_format](rows, headers, output, widths)
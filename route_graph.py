@@ -0,0 +1,298 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+
+import main
+from change_log import get_change_cursor
+from flight_times import from_epoch_minutes, to_epoch_minutes
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# Minimum time, in minutes, between the arrival of a flight and the departure of the next flight of an itinerary.
+MIN_CONNECTION_MINUTES = 60
+
+# Maximum number of hops of the reachability query.
+MAX_HOPS = 10
+
+# Every flight that is not cancelled is a connection of the graph, read in (DepartureMinute, FlightId) order.
+ROUTE_GRAPH_CONNECTIONS_QUERY = """
+    SELECT DepartureMinute, FlightId, DestinationArrivalMinute, DepartureAirportId, DestinationAirportId
+    FROM Flight
+    WHERE FlightStatus <> 'CANCELLED'
+    ORDER BY DepartureMinute, FlightId;
+"""
+
+ROUTE_GRAPH_AIRPORTS_QUERY = "SELECT DestinationId, AirportCode FROM Destination;"
+
+# Changes to the Flight table after a ChangeSeq, with the values of the changed flights (NULL for a delete).
+ROUTE_GRAPH_CHANGES_QUERY = """
+    SELECT
+      json_extract(RowKey, '$.FlightId'),
+      json_extract(RowData, '$.FlightId'),
+      json_extract(RowData, '$.DepartureTime'),
+      json_extract(RowData, '$.DestinationArrivalTime'),
+      json_extract(RowData, '$.DepartureAirportId'),
+      json_extract(RowData, '$.DestinationAirportId'),
+      json_extract(RowData, '$.FlightStatus')
+    FROM ChangeLog
+    WHERE ChangeSeq > ? AND ChangeSeq <= ? AND TableName = 'Flight'
+    ORDER BY ChangeSeq;
+"""
+
+ITINERARY_HEADERS = ["Flight Number", "Departure Airport", "Destination Airport", "Departure Time", "Destination Arrival Time"]
+REACHABLE_AIRPORT_HEADERS = ["Airport Code", "Hops"]
+
+# ==============================================================
+# Route graph
+# ==============================================================
+class RouteGraph:
+    """
+    Time-dependent graph of the flights for the connection scan algorithm: every non-cancelled flight is a connection, held in
+    parallel arrays sorted by (departure minute, FlightId). The routes (pairs of airports with at least one connection) are
+    counted, and turned into adjacency arrays for the reachability query when they have changed.
+
+    The graph is built on the first refresh() and then follows the change log: each refresh() applies the changes to the Flight
+    table recorded since the previous one (a sorted insert / delete per changed flight), or rebuilds the graph if they have been
+    removed by the retention policy or the flight archiving. refresh() and the queries take a lock, so that the graph can be shared by threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.departure_minutes = array("q")
+        self.flight_ids = array("q")
+        self.arrival_minutes = array("q")
+        self.departure_airport_ids = array("i")
+        self.destination_airport_ids = array("i")
+        self.flight_departures = {} # FlightId -> departure minute of its connection, to find it in the arrays.
+        self.route_counts = {}      # (DepartureAirportId, DestinationAirportId) -> number of connections.
+        self.airport_codes = {}
+        self.change_cursor = None
+        self._adjacency = None      # (offsets, destination airports) by DepartureAirportId, rebuilt when the routes change.
+
+    def build(self, conn: sqlite3.Connection) -> None:
+        """Load every non-cancelled flight and the change log cursor of the same state of the database (one read transaction)."""
+        self._clear()
+        in_transaction = conn.in_transaction
+        if not in_transaction:
+            conn.execute("BEGIN;")
+        try:
+            self.change_cursor = get_change_cursor(conn)
+            self.airport_codes = dict(conn.execute(ROUTE_GRAPH_AIRPORTS_QUERY))
+            for departure_minute, flight_id, arrival_minute, departure_airport_id, destination_airport_id in conn.execute(ROUTE_GRAPH_CONNECTIONS_QUERY):
+                self.departure_minutes.append(departure_minute)
+                self.flight_ids.append(flight_id)
+                self.arrival_minutes.append(arrival_minute)
+                self.departure_airport_ids.append(departure_airport_id)
+                self.destination_airport_ids.append(destination_airport_id)
+                self.flight_departures[flight_id] = departure_minute
+                route = (departure_airport_id, destination_airport_id)
+                self.route_counts[route] = self.route_counts.get(route, 0) + 1
+        finally:
+            if not in_transaction:
+                conn.rollback()
+
+    def _index_of(self, flight_id: int) -> int:
+        """Position of the connection of a flight in the arrays (None if the flight is not a connection)."""
+        departure_minute = self.flight_departures.get(flight_id)
+        if departure_minute is None:
+            return None
+        index = bisect_left(self.departure_minutes, departure_minute)
+        while self.flight_ids[index] != flight_id:
+            index += 1
+        return index
+
+    def _remove_connection(self, flight_id: int) -> None:
+        index = self._index_of(flight_id)
+        if index is None:
+            return
+        route = (self.departure_airport_ids[index], self.destination_airport_ids[index])
+        self.route_counts[route] -= 1
+        if not self.route_counts[route]:
+            del self.route_counts[route]
+            self._adjacency = None
+        for column in (self.departure_minutes, self.flight_ids, self.arrival_minutes, self.departure_airport_ids, self.destination_airport_ids):
+            del column[index]
+        del self.flight_departures[flight_id]
+
+    def _add_connection(self, departure_minute: int, flight_id: int, arrival_minute: int, departure_airport_id: int, destination_airport_id: int) -> None:
+        # Position of (departure_minute, flight_id) in the sort order.
+        index = bisect_left(self.departure_minutes, departure_minute)
+        while index < len(self.flight_ids) and self.departure_minutes[index] == departure_minute and self.flight_ids[index] < flight_id:
+            index += 1
+        self.departure_minutes.insert(index, departure_minute)
+        self.flight_ids.insert(index, flight_id)
+        self.arrival_minutes.insert(index, arrival_minute)
+        self.departure_airport_ids.insert(index, departure_airport_id)
+        self.destination_airport_ids.insert(index, destination_airport_id)
+        self.flight_departures[flight_id] = departure_minute
+        route = (departure_airport_id, destination_airport_id)
+        if route not in self.route_counts:
+            self.route_counts[route] = 0
+            self._adjacency = None
+        self.route_counts[route] += 1
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        """Build the graph, or apply the changes to the Flight table recorded since the last refresh. Returns the number of changes applied."""
+        with self._lock:
+            return self._refresh(conn)
+
+    def _refresh(self, conn: sqlite3.Connection) -> int:
+        if self.change_cursor is None:
+            self.build(conn)
+            return 0
+        cursor = get_change_cursor(conn)
+        if cursor == self.change_cursor:
+            return 0
+        purged_through = conn.execute("SELECT PurgedThroughSeq FROM ChangeLogState WHERE StateId = 1;").fetchone()[0]
+        if self.change_cursor < purged_through:
+            self.build(conn)
+            return 0
+
+        n_changes = 0
+        for old_flight_id, flight_id, departure_time, arrival_time, departure_airport_id, destination_airport_id, flight_status in \
+                conn.execute(ROUTE_GRAPH_CHANGES_QUERY, (self.change_cursor, cursor)):
+            self._remove_connection(old_flight_id)
+            if flight_id is not None and flight_status != "CANCELLED":
+                self._add_connection(to_epoch_minutes(departure_time), flight_id, to_epoch_minutes(arrival_time), departure_airport_id, destination_airport_id)
+                if departure_airport_id not in self.airport_codes or destination_airport_id not in self.airport_codes:
+                    self.airport_codes = dict(conn.execute(ROUTE_GRAPH_AIRPORTS_QUERY))
+            n_changes += 1
+        self.change_cursor = cursor
+        return n_changes
+
+    def earliest_arrival(self, origin_id: int, destination_id: int, departure_after_minute: int, min_connection_minutes: int = MIN_CONNECTION_MINUTES) -> list:
+        """
+        Return the itinerary that arrives first at the destination, leaving the origin at or after departure_after_minute with at
+        least min_connection_minutes between two flights, as a list of (FlightId, DepartureAirportId, DestinationAirportId,
+        departure minute, arrival minute). Returns an empty list if the destination cannot be reached.
+        Connection scan: the connections are scanned in departure order from departure_after_minute, and the scan stops at the
+        first connection departing after the best arrival found at the destination.
+        """
+        with self._lock:
+            ready_minutes = {origin_id: departure_after_minute} # Earliest departure possible from each airport reached.
+            arrival_minutes = {origin_id: departure_after_minute}
+            incoming = {}                                       # Airport -> index of the connection it is reached with.
+            best_arrival_minute = float("inf")
+            for index in range(bisect_left(self.departure_minutes, departure_after_minute), len(self.departure_minutes)):
+                departure_minute = self.departure_minutes[index]
+                if departure_minute >= best_arrival_minute:
+                    break
+                if ready_minutes.get(self.departure_airport_ids[index], departure_minute + 1) > departure_minute:
+                    continue
+                airport_id = self.destination_airport_ids[index]
+                arrival_minute = self.arrival_minutes[index]
+                if arrival_minute < arrival_minutes.get(airport_id, float("inf")):
+                    arrival_minutes[airport_id] = arrival_minute
+                    ready_minutes[airport_id] = arrival_minute + min_connection_minutes
+                    incoming[airport_id] = index
+                    if airport_id == destination_id:
+                        best_arrival_minute = arrival_minute
+
+            legs = []
+            airport_id = destination_id
+            while airport_id in incoming and airport_id != origin_id:
+                index = incoming[airport_id]
+                legs.append((self.flight_ids[index], self.departure_airport_ids[index], airport_id, self.departure_minutes[index], self.arrival_minutes[index]))
+                airport_id = self.departure_airport_ids[index]
+            return legs[::-1]
+
+    def reachable_airports(self, origin_id: int, max_hops: int) -> dict:
+        """Return {DestinationId: number of flights} of the airports reachable from the origin with at most max_hops flights (any dates)."""
+        with self._lock:
+            if self._adjacency is None:
+                routes = sorted(self.route_counts)
+                n_airports = max([airport_id for route in routes for airport_id in route], default=0) + 1
+                offsets = array("i", [0] * (n_airports + 1))
+                for departure_airport_id, _ in routes:
+                    offsets[departure_airport_id + 1] += 1
+                for airport_id in range(n_airports):
+                    offsets[airport_id + 1] += offsets[airport_id]
+                self._adjacency = (offsets, array("i", (destination_airport_id for _, destination_airport_id in routes)))
+            offsets, destinations = self._adjacency
+
+            hops = {origin_id: 0}
+            queue = deque([origin_id])
+            while queue:
+                airport_id = queue.popleft()
+                if hops[airport_id] == max_hops or airport_id + 1 >= len(offsets):
+                    continue
+                for next_airport_id in destinations[offsets[airport_id]:offsets[airport_id + 1]]:
+                    if next_airport_id not in hops:
+                        hops[next_airport_id] = hops[airport_id] + 1
+                        queue.append(next_airport_id)
+            del hops[origin_id]
+            return hops
+
+    def describe_itinerary(self, conn: sqlite3.Connection, legs: list) -> list:
+        """
+        Return the legs of an itinerary in the column order of ITINERARY_HEADERS. The flight number of a flight removed from the
+        Flight table since the graph was refreshed is None.
+        """
+        described_legs = []
+        for flight_id, departure_airport_id, destination_airport_id, departure_minute, arrival_minute in legs:
+            flight = conn.execute("SELECT FlightNumber FROM Flight WHERE FlightId = ?;", (flight_id,)).fetchone()
+            described_legs.append((flight[0] if flight else None, self.airport_codes.get(departure_airport_id),
+                                   self.airport_codes.get(destination_airport_id), from_epoch_minutes(departure_minute), from_epoch_minutes(arrival_minute)))
+        return described_legs
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main_route_graph() -> None:
+    """Build the route graph and answer an itinerary or reachability query."""
+    parser = argparse.ArgumentParser(description="Itineraries and reachable airports of the flight network.")
+    parser.add_argument("--db", type=Path, default=main.DB_PATH, help="Path to the SQLite database file.")
+    parser.add_argument("--format", choices=main.OUTPUT_FORMATS, default="table", help="Output format of the results.")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    itinerary_parser = commands.add_parser("itinerary", help="Fastest itinerary between two airports.")
+    itinerary_parser.add_argument("origin", help="Departure airport code, e.g., SYD.")
+    itinerary_parser.add_argument("destination", help="Destination airport code, e.g., LHR.")
+    itinerary_parser.add_argument("--after", type=main.parse_datetime_argument, required=True, help="Earliest departure time, e.g., '2026-03-01 00:00'.")
+    itinerary_parser.add_argument("--min-connection", type=int, default=MIN_CONNECTION_MINUTES, help="Minimum time between two flights, in minutes.")
+
+    reachable_parser = commands.add_parser("reachable", help="Airports reachable from an airport within a number of flights.")
+    reachable_parser.add_argument("origin", help="Departure airport code, e.g., SYD.")
+    reachable_parser.add_argument("--hops", type=int, default=2, help=f"Maximum number of flights (at most {MAX_HOPS}).")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"Error. Database {args.db} not found.")
+    conn = main.connect_db(args.db, read_only=True)
+    try:
+        origin_id, *other_ids = main.resolve_airport_codes(conn, [args.origin] + ([args.destination] if args.command == "itinerary" else []))
+        graph = RouteGraph()
+        start = time.perf_counter()
+        graph.refresh(conn)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if args.command == "itinerary":
+            legs = graph.earliest_arrival(origin_id, other_ids[0], to_epoch_minutes(args.after), args.min_connection)
+            query_seconds = time.perf_counter() - start
+            if not legs:
+                sys.exit(f"Error. No itinerary from {args.origin.upper()} to {args.destination.upper()} departing after {args.after}.")
+            main.print_rows(graph.describe_itinerary(conn, legs), ITINERARY_HEADERS, args.format)
+        else:
+            hops = graph.reachable_airports(origin_id, min(args.hops, MAX_HOPS))
+            query_seconds = time.perf_counter() - start
+            rows = sorted(((graph.airport_codes.get(airport_id), n_hops) for airport_id, n_hops in hops.items()), key=lambda row: (row[1], row[0]))
+            main.print_rows(rows, REACHABLE_AIRPORT_HEADERS, args.format)
+    finally:
+        conn.close()
+    print(f"Graph of {len(graph.flight_ids):,} flights built in {build_seconds:.2f} s; query answered in {query_seconds * 1000:.2f} ms.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main_route_graph()
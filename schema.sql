@@ -3,16 +3,24 @@ PRAGMA foreign_keys = ON;
 -- ========================================================================
 -- Flight table
 -- ========================================================================
+/*
+The flight times are stored as INTEGER minutes since 1970-01-01 00:00 (DepartureMinute, DestinationArrivalMinute), which keeps
+the rows and indices small and makes range filters and duration / overlap arithmetic integer comparisons. The VIRTUAL generated
+columns DepartureTime and DestinationArrivalTime show them in the format YYYY-MM-DD HH:MM (computed when read, not stored).
+Databases created with the TEXT columns are converted by "python main.py migrate-flight-times".
+*/
 CREATE TABLE IF NOT EXISTS Flight (
     FlightId                    INTEGER PRIMARY KEY AUTOINCREMENT,
     FlightNumber                TEXT NOT NULL UNIQUE,
     AircraftId                  INTEGER NOT NULL, 
     DepartureAirportId          INTEGER NOT NULL, 
     DestinationAirportId        INTEGER NOT NULL, 
-    DepartureTime               TEXT NOT NULL, 
-    DestinationArrivalTime      TEXT NOT NULL, 
+    DepartureMinute             INTEGER NOT NULL,
+    DestinationArrivalMinute    INTEGER NOT NULL,
     FlightStatus                TEXT NOT NULL CHECK (FlightStatus IN ('SCHEDULED', 'DELAYED', 'CANCELLED', 'DEPARTED', 'ARRIVED')
     ),
+    DepartureTime               TEXT GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', DepartureMinute * 60, 'unixepoch')) VIRTUAL,
+    DestinationArrivalTime      TEXT GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', DestinationArrivalMinute * 60, 'unixepoch')) VIRTUAL,
 
     FOREIGN KEY (AircraftId) REFERENCES Aircraft(AircraftId) ON UPDATE CASCADE ON DELETE RESTRICT,
     FOREIGN KEY (DepartureAirportId) REFERENCES Destination(DestinationId) ON UPDATE CASCADE ON DELETE RESTRICT,
@@ -72,8 +80,338 @@ CREATE TABLE IF NOT EXISTS Destination (
 );
 
 -- ========================================================================
--- Possible further improvements
+-- Indices
+-- ========================================================================
+/*
+The UNIQUE constraints above create BINARY-collated indices, which cannot be used by
+the case-insensitive lookups (... = ? COLLATE NOCASE) issued by main.py. The indices
+below cover those lookups, the joins on Flight_Pilot and the flight search filters.
+*/
+CREATE INDEX IF NOT EXISTS idx_destination_airport_code_nocase ON Destination(AirportCode COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_aircraft_model_nocase ON Aircraft(Model COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_flight_flight_number_nocase ON Flight(FlightNumber COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_pilot_license_number_nocase ON Pilot(LicenseNumber COLLATE NOCASE);
+
+-- Flight search: by destination or departure airport (optionally narrowed by departure time and status), by departure time and by status.
+-- Each index is ordered by DepartureMinute after the equality columns, which the keyset pagination of the flight search relies on.
+CREATE INDEX IF NOT EXISTS idx_flight_destination_departure_status ON Flight(DestinationAirportId, DepartureMinute, FlightStatus);
+CREATE INDEX IF NOT EXISTS idx_flight_departure_airport_departure ON Flight(DepartureAirportId, DepartureMinute);
+CREATE INDEX IF NOT EXISTS idx_flight_departure_time ON Flight(DepartureMinute);
+CREATE INDEX IF NOT EXISTS idx_flight_status_departure ON Flight(FlightStatus, DepartureMinute);
+
+-- Foreign key Flight.AircraftId: the child look-up of a change to an Aircraft row (otherwise a full scan of Flight).
+CREATE INDEX IF NOT EXISTS idx_flight_aircraft ON Flight(AircraftId);
+
+-- Pilot schedule and flights-per-pilot summary: Flight_Pilot is keyed on (FlightId, PilotId), so look-ups by pilot need their own index.
+CREATE INDEX IF NOT EXISTS idx_flight_pilot_pilot_flight ON Flight_Pilot(PilotId, FlightId);
+
+-- ========================================================================
+-- Summary tables
+-- ========================================================================
+/*
+Number of flights to each destination and number of flights assigned to each pilot, kept up to date by the triggers below,
+so that the summary queries read one row per destination / pilot instead of aggregating the Flight and Flight_Pilot tables.
+Use "python main.py verify-summaries" / "python main.py rebuild-summaries" to check / rebuild them from the raw data.
+*/
+CREATE TABLE IF NOT EXISTS DestinationFlightSummary (
+    DestinationId       INTEGER PRIMARY KEY,
+    FlightCount         INTEGER NOT NULL DEFAULT 0,
+
+    FOREIGN KEY (DestinationId) REFERENCES Destination(DestinationId) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS PilotFlightSummary (
+    PilotId             INTEGER PRIMARY KEY,
+    FlightCount         INTEGER NOT NULL DEFAULT 0,
+
+    FOREIGN KEY (PilotId) REFERENCES Pilot(PilotId) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_insert_summary AFTER INSERT ON Flight
+BEGIN
+    INSERT INTO DestinationFlightSummary(DestinationId, FlightCount) VALUES (NEW.DestinationAirportId, 1)
+        ON CONFLICT(DestinationId) DO UPDATE SET FlightCount = FlightCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_delete_summary AFTER DELETE ON Flight
+BEGIN
+    UPDATE DestinationFlightSummary SET FlightCount = FlightCount - 1 WHERE DestinationId = OLD.DestinationAirportId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_update_summary AFTER UPDATE OF DestinationAirportId ON Flight
+    WHEN NEW.DestinationAirportId IS NOT OLD.DestinationAirportId
+BEGIN
+    UPDATE DestinationFlightSummary SET FlightCount = FlightCount - 1 WHERE DestinationId = OLD.DestinationAirportId;
+    INSERT INTO DestinationFlightSummary(DestinationId, FlightCount) VALUES (NEW.DestinationAirportId, 1)
+        ON CONFLICT(DestinationId) DO UPDATE SET FlightCount = FlightCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_insert_summary AFTER INSERT ON Flight_Pilot
+BEGIN
+    INSERT INTO PilotFlightSummary(PilotId, FlightCount) VALUES (NEW.PilotId, 1)
+        ON CONFLICT(PilotId) DO UPDATE SET FlightCount = FlightCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_delete_summary AFTER DELETE ON Flight_Pilot
+BEGIN
+    UPDATE PilotFlightSummary SET FlightCount = FlightCount - 1 WHERE PilotId = OLD.PilotId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_update_summary AFTER UPDATE OF PilotId ON Flight_Pilot
+    WHEN NEW.PilotId IS NOT OLD.PilotId
+BEGIN
+    UPDATE PilotFlightSummary SET FlightCount = FlightCount - 1 WHERE PilotId = OLD.PilotId;
+    INSERT INTO PilotFlightSummary(PilotId, FlightCount) VALUES (NEW.PilotId, 1)
+        ON CONFLICT(PilotId) DO UPDATE SET FlightCount = FlightCount + 1;
+END;
+
+-- ========================================================================
+-- Pilot assignment intervals
+-- ========================================================================
+/*
+Copy of the DepartureMinute - DestinationArrivalMinute interval (and status) of every Flight_Pilot row, kept up to date by the
+triggers below. The index orders each pilot's assignments by departure time, so that the scheduling conflicts of a new
+assignment are found with a range query and the conflict audit sweeps all pilots in index order without sorting.
+*/
+CREATE TABLE IF NOT EXISTS PilotAssignmentInterval (
+    FlightId                    INTEGER NOT NULL,
+    PilotId                     INTEGER NOT NULL,
+    DepartureMinute             INTEGER NOT NULL,
+    DestinationArrivalMinute    INTEGER NOT NULL,
+    FlightStatus                TEXT NOT NULL,
+
+    PRIMARY KEY (FlightId, PilotId)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_pilot_assignment_interval_pilot_departure
+    ON PilotAssignmentInterval(PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus);
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_insert_interval AFTER INSERT ON Flight_Pilot
+BEGIN
+    INSERT INTO PilotAssignmentInterval(FlightId, PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+        SELECT FlightId, NEW.PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus FROM Flight WHERE FlightId = NEW.FlightId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_delete_interval AFTER DELETE ON Flight_Pilot
+BEGIN
+    DELETE FROM PilotAssignmentInterval WHERE FlightId = OLD.FlightId AND PilotId = OLD.PilotId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_update_interval AFTER UPDATE OF FlightId, PilotId ON Flight_Pilot
+BEGIN
+    DELETE FROM PilotAssignmentInterval WHERE FlightId = OLD.FlightId AND PilotId = OLD.PilotId;
+    INSERT INTO PilotAssignmentInterval(FlightId, PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+        SELECT FlightId, NEW.PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus FROM Flight WHERE FlightId = NEW.FlightId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_update_interval AFTER UPDATE OF DepartureMinute, DestinationArrivalMinute, FlightStatus ON Flight
+BEGIN
+    UPDATE PilotAssignmentInterval
+    SET DepartureMinute = NEW.DepartureMinute, DestinationArrivalMinute = NEW.DestinationArrivalMinute, FlightStatus = NEW.FlightStatus
+    WHERE FlightId = NEW.FlightId;
+END;
+
+-- ========================================================================
+-- Change log
 -- ========================================================================
 /*
-1. Add indices on the frequently queried columns for more efficient queries
-*/
\ No newline at end of file
+Every insert, update and delete on Flight and Flight_Pilot is recorded by the triggers below with an increasing ChangeSeq
+(AUTOINCREMENT, so sequence numbers are never reused after old changes are removed). RowKey is the primary key of the changed
+row and RowData its new values (NULL for a delete), both as JSON. Consumers read the changes after the last ChangeSeq they
+have seen with "python main.py export-changes --since <ChangeSeq>"; "python main.py compact-changes" keeps the log bounded.
+ChangeLogState.PurgedThroughSeq is the last ChangeSeq removed by the retention policy (or by archive-flights, which removes the
+deletes of the flights it moves to the archives): older cursors must re-read the tables.
+*/
+CREATE TABLE IF NOT EXISTS ChangeLog (
+    ChangeSeq           INTEGER PRIMARY KEY AUTOINCREMENT,
+    TableName           TEXT NOT NULL,
+    Operation           TEXT NOT NULL CHECK (Operation IN ('INSERT', 'UPDATE', 'DELETE')),
+    RowKey              TEXT NOT NULL,
+    RowData             TEXT,
+    ChangedAt           INTEGER NOT NULL DEFAULT (unixepoch())
+);
+
+-- Compaction finds the later changes of the same row; retention finds the changes older than the retention period.
+CREATE INDEX IF NOT EXISTS idx_change_log_table_row_key_seq ON ChangeLog(TableName, RowKey, ChangeSeq);
+CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON ChangeLog(ChangedAt);
+
+CREATE TABLE IF NOT EXISTS ChangeLogState (
+    StateId             INTEGER PRIMARY KEY CHECK (StateId = 1),
+    PurgedThroughSeq    INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO ChangeLogState(StateId, PurgedThroughSeq) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_insert_change_log AFTER INSERT ON Flight
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight', 'INSERT', json_object('FlightId', NEW.FlightId), json_object(
+        'FlightId', NEW.FlightId, 'FlightNumber', NEW.FlightNumber, 'AircraftId', NEW.AircraftId,
+        'DepartureAirportId', NEW.DepartureAirportId, 'DestinationAirportId', NEW.DestinationAirportId,
+        'DepartureTime', NEW.DepartureTime, 'DestinationArrivalTime', NEW.DestinationArrivalTime, 'FlightStatus', NEW.FlightStatus
+    ));
+END;
+
+-- Updates that do not change any value (e.g., setting the same status again) are not recorded.
+CREATE TRIGGER IF NOT EXISTS trg_flight_update_change_log AFTER UPDATE ON Flight
+    WHEN (NEW.FlightId, NEW.FlightNumber, NEW.AircraftId, NEW.DepartureAirportId, NEW.DestinationAirportId, NEW.DepartureMinute, NEW.DestinationArrivalMinute, NEW.FlightStatus)
+        IS NOT (OLD.FlightId, OLD.FlightNumber, OLD.AircraftId, OLD.DepartureAirportId, OLD.DestinationAirportId, OLD.DepartureMinute, OLD.DestinationArrivalMinute, OLD.FlightStatus)
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight', 'UPDATE', json_object('FlightId', OLD.FlightId), json_object(
+        'FlightId', NEW.FlightId, 'FlightNumber', NEW.FlightNumber, 'AircraftId', NEW.AircraftId,
+        'DepartureAirportId', NEW.DepartureAirportId, 'DestinationAirportId', NEW.DestinationAirportId,
+        'DepartureTime', NEW.DepartureTime, 'DestinationArrivalTime', NEW.DestinationArrivalTime, 'FlightStatus', NEW.FlightStatus
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_delete_change_log AFTER DELETE ON Flight
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight', 'DELETE', json_object('FlightId', OLD.FlightId), NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_insert_change_log AFTER INSERT ON Flight_Pilot
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight_Pilot', 'INSERT', json_object('FlightId', NEW.FlightId, 'PilotId', NEW.PilotId), json_object('FlightId', NEW.FlightId, 'PilotId', NEW.PilotId));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_delete_change_log AFTER DELETE ON Flight_Pilot
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight_Pilot', 'DELETE', json_object('FlightId', OLD.FlightId, 'PilotId', OLD.PilotId), NULL);
+END;
+
+-- Flight_Pilot has no other columns than its key, so a changed key is recorded as the delete of the old row and the insert of the new one.
+CREATE TRIGGER IF NOT EXISTS trg_flight_pilot_update_change_log AFTER UPDATE OF FlightId, PilotId ON Flight_Pilot
+    WHEN (NEW.FlightId, NEW.PilotId) IS NOT (OLD.FlightId, OLD.PilotId)
+BEGIN
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight_Pilot', 'DELETE', json_object('FlightId', OLD.FlightId, 'PilotId', OLD.PilotId), NULL);
+    INSERT INTO ChangeLog(TableName, Operation, RowKey, RowData)
+    VALUES ('Flight_Pilot', 'INSERT', json_object('FlightId', NEW.FlightId, 'PilotId', NEW.PilotId), json_object('FlightId', NEW.FlightId, 'PilotId', NEW.PilotId));
+END;
+
+-- ========================================================================
+-- Search indices
+-- ========================================================================
+/*
+FTS5 indices over the airports, aircraft models and pilots, used by the search (python main.py search) and by the suggestions
+shown when a code is not found. The trigram tokenizer matches any substring of at least 3 characters case-insensitively, and
+the rarest trigrams shared with a misspelt word find the near matches (see search_index.py).
+DestinationSearch and PilotSearch are external-content tables (the text is read from Destination / Pilot, not stored twice).
+AircraftModelSearch has one row per distinct model, as many aircraft share the same model.
+The triggers below keep them in sync; the bulk load of seed_data.py rebuilds them instead.
+*/
+CREATE VIRTUAL TABLE IF NOT EXISTS DestinationSearch USING fts5(
+    AirportCode, AirportName, City, Country,
+    content='Destination', content_rowid='DestinationId', tokenize='trigram'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS PilotSearch USING fts5(
+    FirstName, MiddleName, LastName, LicenseNumber,
+    content='Pilot', content_rowid='PilotId', tokenize='trigram'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS AircraftModelSearch USING fts5(Model, tokenize='trigram');
+
+-- Number of rows containing each trigram, used to choose the rarest trigrams of a misspelt search.
+CREATE VIRTUAL TABLE IF NOT EXISTS DestinationSearchVocab USING fts5vocab(DestinationSearch, row);
+CREATE VIRTUAL TABLE IF NOT EXISTS PilotSearchVocab USING fts5vocab(PilotSearch, row);
+CREATE VIRTUAL TABLE IF NOT EXISTS AircraftModelSearchVocab USING fts5vocab(AircraftModelSearch, row);
+
+CREATE TRIGGER IF NOT EXISTS trg_destination_insert_search AFTER INSERT ON Destination
+BEGIN
+    INSERT INTO DestinationSearch(rowid, AirportCode, AirportName, City, Country)
+    VALUES (NEW.DestinationId, NEW.AirportCode, NEW.AirportName, NEW.City, NEW.Country);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_destination_delete_search AFTER DELETE ON Destination
+BEGIN
+    INSERT INTO DestinationSearch(DestinationSearch, rowid, AirportCode, AirportName, City, Country)
+    VALUES ('delete', OLD.DestinationId, OLD.AirportCode, OLD.AirportName, OLD.City, OLD.Country);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_destination_update_search AFTER UPDATE OF DestinationId, AirportCode, AirportName, City, Country ON Destination
+BEGIN
+    INSERT INTO DestinationSearch(DestinationSearch, rowid, AirportCode, AirportName, City, Country)
+    VALUES ('delete', OLD.DestinationId, OLD.AirportCode, OLD.AirportName, OLD.City, OLD.Country);
+    INSERT INTO DestinationSearch(rowid, AirportCode, AirportName, City, Country)
+    VALUES (NEW.DestinationId, NEW.AirportCode, NEW.AirportName, NEW.City, NEW.Country);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pilot_insert_search AFTER INSERT ON Pilot
+BEGIN
+    INSERT INTO PilotSearch(rowid, FirstName, MiddleName, LastName, LicenseNumber)
+    VALUES (NEW.PilotId, NEW.FirstName, NEW.MiddleName, NEW.LastName, NEW.LicenseNumber);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pilot_delete_search AFTER DELETE ON Pilot
+BEGIN
+    INSERT INTO PilotSearch(PilotSearch, rowid, FirstName, MiddleName, LastName, LicenseNumber)
+    VALUES ('delete', OLD.PilotId, OLD.FirstName, OLD.MiddleName, OLD.LastName, OLD.LicenseNumber);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pilot_update_search AFTER UPDATE OF PilotId, FirstName, MiddleName, LastName, LicenseNumber ON Pilot
+BEGIN
+    INSERT INTO PilotSearch(PilotSearch, rowid, FirstName, MiddleName, LastName, LicenseNumber)
+    VALUES ('delete', OLD.PilotId, OLD.FirstName, OLD.MiddleName, OLD.LastName, OLD.LicenseNumber);
+    INSERT INTO PilotSearch(rowid, FirstName, MiddleName, LastName, LicenseNumber)
+    VALUES (NEW.PilotId, NEW.FirstName, NEW.MiddleName, NEW.LastName, NEW.LicenseNumber);
+END;
+
+-- A model is added with its first aircraft and removed with its last one (found with idx_aircraft_model_nocase).
+CREATE TRIGGER IF NOT EXISTS trg_aircraft_insert_search AFTER INSERT ON Aircraft
+    WHEN NOT EXISTS (SELECT 1 FROM Aircraft WHERE Model = NEW.Model COLLATE NOCASE AND AircraftId <> NEW.AircraftId)
+BEGIN
+    INSERT INTO AircraftModelSearch(Model) VALUES (NEW.Model);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aircraft_delete_search AFTER DELETE ON Aircraft
+    WHEN NOT EXISTS (SELECT 1 FROM Aircraft WHERE Model = OLD.Model COLLATE NOCASE)
+BEGIN
+    DELETE FROM AircraftModelSearch WHERE Model = OLD.Model COLLATE NOCASE;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aircraft_update_search AFTER UPDATE OF Model ON Aircraft
+    WHEN NEW.Model IS NOT OLD.Model COLLATE NOCASE
+BEGIN
+    DELETE FROM AircraftModelSearch
+    WHERE Model = OLD.Model COLLATE NOCASE AND NOT EXISTS (SELECT 1 FROM Aircraft WHERE Model = OLD.Model COLLATE NOCASE);
+    INSERT INTO AircraftModelSearch(Model)
+    SELECT NEW.Model WHERE NOT EXISTS (SELECT 1 FROM Aircraft WHERE Model = NEW.Model COLLATE NOCASE AND AircraftId <> NEW.AircraftId);
+END;
+
+-- ========================================================================
+-- Flight archive partitions
+-- ========================================================================
+/*
+The ARRIVED and CANCELLED flights of past months are moved, with their Flight_Pilot rows, to one archive database per month
+(e.g., flight_management_archive/2026-01.db) by "python main.py archive-flights" (see flight_archive.py). FlightArchivePartition
+lists the archived months, so that a query only attaches the archives of the months it covers. The archived flights still count
+in the summary tables; their counts per month are kept in ArchivedDestinationFlightCount / ArchivedPilotFlightCount, which also
+tell the pilot schedule which archives hold a pilot's flights.
+*/
+CREATE TABLE IF NOT EXISTS FlightArchivePartition (
+    StartMinute         INTEGER PRIMARY KEY,    -- First minute of the month (same unit as Flight.DepartureMinute)
+    EndMinute           INTEGER NOT NULL,       -- First minute of the next month
+    Period              TEXT NOT NULL UNIQUE,   -- YYYY-MM, also the name of the archive file
+    FlightCount         INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ArchivedDestinationFlightCount (
+    DestinationId       INTEGER NOT NULL,
+    StartMinute         INTEGER NOT NULL,
+    FlightCount         INTEGER NOT NULL,
+
+    PRIMARY KEY (DestinationId, StartMinute)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ArchivedPilotFlightCount (
+    PilotId             INTEGER NOT NULL,
+    StartMinute         INTEGER NOT NULL,
+    FlightCount         INTEGER NOT NULL,
+
+    PRIMARY KEY (PilotId, StartMinute)
+) WITHOUT ROWID;
@@ -0,0 +1,168 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import sqlite3
+from difflib import SequenceMatcher
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# The trigram tokenizer indexes every 3 characters: shorter searches cannot use the indices.
+SEARCH_MIN_LENGTH = 3
+
+# Number of results returned by search(), and of near matches read from an index before they are re-ranked.
+SEARCH_RESULT_LIMIT = 10
+SEARCH_CANDIDATE_LIMIT = 200
+
+# Near matches less similar than this to the search (0 to 1, see similarity()) are not returned.
+SEARCH_MIN_SIMILARITY = 0.6
+
+# The near matches are found with the rarest trigrams of the search, up to this total number of rows containing them.
+# Trigrams found in most rows (e.g., "LIC" in every license number) would make the search read and rank the whole index.
+SEARCH_MAX_TRIGRAM_ROWS = 20000
+
+# For each kind of search: the FTS5 index and the query that returns (code, description, *texts compared with the search).
+SEARCH_QUERIES = {
+    "airport": """
+        SELECT AirportCode, AirportName || ', ' || City || ', ' || Country, AirportCode, AirportName, City, Country
+        FROM DestinationSearch
+        WHERE DestinationSearch MATCH ?
+        ORDER BY rank
+        LIMIT ?;
+    """,
+    "aircraft": """
+        SELECT Model, Model, Model
+        FROM AircraftModelSearch
+        WHERE AircraftModelSearch MATCH ?
+        ORDER BY rank
+        LIMIT ?;
+    """,
+    "pilot": """
+        SELECT
+          LicenseNumber,
+          FirstName || COALESCE(' ' || MiddleName, '') || ' ' || LastName,
+          LicenseNumber,
+          FirstName || ' ' || LastName,
+          FirstName,
+          LastName
+        FROM PilotSearch
+        WHERE PilotSearch MATCH ?
+        ORDER BY rank
+        LIMIT ?;
+    """,
+}
+SEARCH_KINDS = list(SEARCH_QUERIES)
+
+# For each kind of search: the fts5vocab table that counts the rows containing each trigram of its index.
+SEARCH_VOCABULARIES = {
+    "airport": "DestinationSearchVocab",
+    "aircraft": "AircraftModelSearchVocab",
+    "pilot": "PilotSearchVocab",
+}
+
+SEARCH_RESULT_HEADERS = ["Kind", "Code", "Description", "Similarity"]
+
+# ==============================================================
+# Maintain the search indices
+# ==============================================================
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    """Recompute the search indices from the Destination, Pilot and Aircraft tables in one transaction."""
+    with conn:
+        conn.execute("INSERT INTO DestinationSearch(DestinationSearch) VALUES ('rebuild');")
+        conn.execute("INSERT INTO PilotSearch(PilotSearch) VALUES ('rebuild');")
+        conn.execute("DELETE FROM AircraftModelSearch;")
+        conn.execute("INSERT INTO AircraftModelSearch(Model) SELECT MIN(Model) FROM Aircraft GROUP BY Model COLLATE NOCASE;")
+
+def ensure_search_index(conn: sqlite3.Connection) -> None:
+    """Fill the search indices of a database that already held rows before the indices were added."""
+    # The _docsize shadow tables hold one row per indexed row (the external-content tables would read Destination / Pilot instead).
+    indices_are_empty = not any(conn.execute(f"SELECT 1 FROM {index} LIMIT 1;").fetchone()
+                                for index in ("DestinationSearch_docsize", "PilotSearch_docsize", "AircraftModelSearch_docsize"))
+    if indices_are_empty and any(conn.execute(f"SELECT 1 FROM {table} LIMIT 1;").fetchone() for table in ("Destination", "Pilot", "Aircraft")):
+        rebuild_search_index(conn)
+
+# ==============================================================
+# Search
+# ==============================================================
+def quote_fts_string(text: str) -> str:
+    """Quote text as an FTS5 string, so that it is matched literally (operators and punctuation included)."""
+    return '"' + text.replace('"', '""') + '"'
+
+def similarity(search_text: str, texts) -> float:
+    """
+    Return the similarity (0 to 1) of the search with the closest of the texts, ignoring case. Each text is compared whole and
+    by its runs of as many words as the search, so that a typo in one word of a longer name is not diluted by the other words.
+
+    >>> similarity("heathorw", ["London Heathrow Airport"]) >= SEARCH_MIN_SIMILARITY
+    True
+    """
+    search_text = search_text.casefold()
+    n_search_words = len(search_text.split())
+    best = 0.0
+    for text in texts:
+        if text:
+            words = text.casefold().split()
+            candidates = [text.casefold(), *(" ".join(words[i:i + n_search_words]) for i in range(len(words) - n_search_words + 1))]
+            for candidate in candidates:
+                matcher = SequenceMatcher(None, search_text, candidate)
+                if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+                    best = max(best, matcher.ratio())
+    return best
+
+def build_near_match_query(conn: sqlite3.Connection, kind: str, text: str) -> str:
+    """
+    Return the FTS5 query of the rows sharing the rarest trigrams with text, or "" if text only has trigrams absent from the
+    index or found in too many rows. The trigrams are taken from the rarest up to SEARCH_MAX_TRIGRAM_ROWS rows in total.
+    """
+    text = text.casefold()
+    trigrams = sorted({text[i:i + 3] for i in range(len(text) - 2)} - {"   "})
+    placeholders = ", ".join("?" for _ in trigrams)
+    trigram_rows = conn.execute(
+        f"SELECT term, doc FROM {SEARCH_VOCABULARIES[kind]} WHERE term IN ({placeholders}) ORDER BY doc;", trigrams
+    ).fetchall()
+
+    chosen_trigrams = []
+    n_rows = 0
+    for trigram, n_trigram_rows in trigram_rows:
+        n_rows += n_trigram_rows
+        if n_rows > SEARCH_MAX_TRIGRAM_ROWS:
+            break
+        chosen_trigrams.append(trigram)
+    return " OR ".join(quote_fts_string(trigram) for trigram in chosen_trigrams)
+
+def search(conn: sqlite3.Connection, text: str, kinds=SEARCH_KINDS, limit: int = SEARCH_RESULT_LIMIT) -> list:
+    """
+    Search the airports, aircraft models and / or pilots for text, ignoring case. Two stages, per kind:
+    1. Substring: the rows containing text (e.g., "heath" finds Heathrow), all returned with similarity 1.
+    2. Near matches, if the first stage returned fewer than limit rows: the rows sharing the rarest trigrams with text (e.g.,
+       "Heathorw" shares hea, eat, ath with Heathrow, see build_near_match_query()), re-ranked by their similarity with text.
+    Returns at most limit (kind, code, description, similarity) ordered by similarity, the most similar first.
+    Raises ValueError if text is shorter than SEARCH_MIN_LENGTH characters.
+    """
+    text = " ".join(text.split())
+    if len(text) < SEARCH_MIN_LENGTH:
+        raise ValueError(f"Search text must be at least {SEARCH_MIN_LENGTH} characters long.")
+
+    results = []
+    for kind in kinds:
+        found = {}
+        for code, description, *_ in conn.execute(SEARCH_QUERIES[kind], (quote_fts_string(text), limit)):
+            found[code] = (kind, code, description, 1.0)
+        near_match_query = build_near_match_query(conn, kind, text) if len(found) < limit else ""
+        if near_match_query:
+            for code, description, *texts in conn.execute(SEARCH_QUERIES[kind], (near_match_query, SEARCH_CANDIDATE_LIMIT)):
+                if code not in found:
+                    score = similarity(text, texts)
+                    if score >= SEARCH_MIN_SIMILARITY:
+                        found[code] = (kind, code, description, score)
+        results.extend(found.values())
+
+    results.sort(key=lambda result: result[3], reverse=True)
+    return results[:limit]
+
+def suggest(conn: sqlite3.Connection, kind: str, text: str, limit: int = 3) -> list:
+    """Return the codes of the (at most limit) closest matches of text among one kind, or [] if text is too short to search."""
+    try:
+        return [(code, description) for _, code, description, _ in search(conn, text, [kind], limit)]
+    except ValueError:
+        return []
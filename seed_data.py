@@ -0,0 +1,337 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from flight_times import to_epoch_minutes
+from search_index import rebuild_search_index
+from summary_tables import rebuild_summary_tables
+
+# ==============================================================
+# Parameters
+# ==============================================================
+BATCH_SIZE = 50_000
+
+# Pragma settings used while bulk loading. The load runs in a single transaction, so a crash leaves the database as it was
+# before the load (rollback journal kept in memory), but durability of the load itself is only guaranteed once it commits.
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "cache_size": -262144,  # 256 MiB
+    "temp_store": "MEMORY",
+    "foreign_keys": "OFF",  # The generated data is consistent by construction.
+}
+
+# Tables in the order in which they are loaded (referenced tables first).
+SEED_TABLES = ("Aircraft", "Destination", "Pilot", "Flight", "Flight_Pilot")
+
+INSERT_SQL = {
+    "Aircraft": "INSERT INTO Aircraft(AircraftId, Model, PassengerCapacity, BuiltDate, LastCheckDate) VALUES (?, ?, ?, ?, ?);",
+    "Destination": "INSERT INTO Destination(DestinationId, AirportCode, AirportName, City, Country, Terminal) VALUES (?, ?, ?, ?, ?, ?);",
+    "Pilot": """
+        INSERT INTO Pilot(PilotId, LicenseNumber, FirstName, MiddleName, LastName, MobilePhone, Email, EmploymentStartDate, EmploymentEndDate, IsActive)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    """,
+    "Flight": """
+        INSERT INTO Flight(FlightId, FlightNumber, AircraftId, DepartureAirportId, DestinationAirportId, DepartureMinute, DestinationArrivalMinute, FlightStatus)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+    """,
+    "Flight_Pilot": "INSERT INTO Flight_Pilot(FlightId, PilotId) VALUES (?, ?);",
+}
+
+# Reference data used by the synthetic data generator.
+AIRCRAFT_MODELS = (
+    ("Airbus A220-300", 145), ("Airbus A319-100", 144), ("Airbus A320-200", 180), ("Airbus A320neo", 186),
+    ("Airbus A321neo", 220), ("Airbus A330-300", 300), ("Airbus A350-900", 325), ("Boeing 737-800", 189),
+    ("Boeing 737 MAX 8", 178), ("Boeing 757-200", 200), ("Boeing 767-300ER", 261), ("Boeing 777-300ER", 396),
+    ("Boeing 787-9", 290), ("Embraer E190", 100), ("ATR 72-600", 72),
+)
+
+CITIES = (
+    ("London", "United Kingdom"), ("Manchester", "United Kingdom"), ("Edinburgh", "United Kingdom"), ("New York", "United States"),
+    ("Los Angeles", "United States"), ("Chicago", "United States"), ("San Francisco", "United States"), ("Paris", "France"),
+    ("Nice", "France"), ("Amsterdam", "Netherlands"), ("Frankfurt", "Germany"), ("Munich", "Germany"), ("Madrid", "Spain"),
+    ("Barcelona", "Spain"), ("Rome", "Italy"), ("Milan", "Italy"), ("Dublin", "Ireland"), ("Dubai", "United Arab Emirates"),
+    ("Tokyo", "Japan"), ("Osaka", "Japan"), ("Singapore", "Singapore"), ("Toronto", "Canada"), ("Vancouver", "Canada"),
+    ("Sydney", "Australia"), ("Melbourne", "Australia"), ("Hong Kong", "China"), ("Zurich", "Switzerland"),
+    ("Copenhagen", "Denmark"), ("Lisbon", "Portugal"), ("Istanbul", "Turkey"), ("Doha", "Qatar"), ("Johannesburg", "South Africa"),
+)
+
+AIRPORT_NAME_SUFFIXES = ("International Airport", "Airport", "City Airport", "Regional Airport")
+TERMINALS = ("T1", "T2", "T3", "T4", "T5", "1", "2", "A", "B", "I")
+
+FIRST_NAMES = (
+    "Amelia", "Noah", "Maya", "Oliver", "Sophia", "Ethan", "Lily", "James", "Ava", "Lucas", "Isabella", "Daniel", "Harper",
+    "Logan", "Zoe", "Grace", "Henry", "Chloe", "Jack", "Mia", "Leo", "Emily", "Samuel", "Ella", "Adam", "Ruby", "Omar", "Priya",
+)
+LAST_NAMES = (
+    "Carter", "Hughes", "Patel", "Reed", "Brown", "Ward", "Evans", "Murphy", "Khan", "Shaw", "Diaz", "Green", "Foster",
+    "Brooks", "Bennett", "Taylor", "Wilson", "Clarke", "Walker", "Wright", "Singh", "Lewis", "Young", "King", "Scott", "Hall",
+)
+MIDDLE_INITIALS = ("A", "J", "M", "R", "S")
+
+CARRIER_CODES = ("BA", "AA", "AF", "KL", "LH", "IB", "EI", "EK", "JL", "SQ", "AC", "QF", "CX", "LX", "TP", "TK", "QR", "UA")
+
+# ==============================================================
+# Helper functions
+# ==============================================================
+def format_datetime(value: datetime) -> str:
+    """Helper function that converts a datetime object to the string format used by the database."""
+    return value.strftime("%Y-%m-%d %H:%M")
+
+def batched(rows, batch_size: int):
+    """Helper function that splits an iterable of rows into lists of at most batch_size rows."""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def airport_codes():
+    """Helper function that yields unique three-letter airport codes (AAA, AAB, ..., ZZZ)."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for first in letters:
+        for second in letters:
+            for third in letters:
+                yield first + second + third
+
+def database_is_populated(conn: sqlite3.Connection) -> bool:
+    """Check whether any of the seeded tables already contains data."""
+    return any(conn.execute(f"SELECT 1 FROM {table} LIMIT 1;").fetchone() for table in SEED_TABLES)
+
+# ==============================================================
+# Synthetic data generators
+# ==============================================================
+def generate_aircraft(rng: random.Random, n_aircraft: int):
+    """Yield n_aircraft Aircraft rows."""
+    for aircraft_id in range(1, n_aircraft + 1):
+        model, capacity = rng.choice(AIRCRAFT_MODELS)
+        built_date = datetime(2005, 1, 1) + timedelta(days=rng.randrange(20 * 365))
+        last_check_date = datetime(2026, 1, 1, 5) + timedelta(minutes=rng.randrange(60 * 24 * 60))
+        yield (aircraft_id, model, capacity, format_datetime(built_date), format_datetime(last_check_date))
+
+def generate_destinations(rng: random.Random, n_destinations: int):
+    """Yield n_destinations Destination rows with unique airport codes."""
+    if n_destinations > 26 ** 3:
+        raise ValueError(f"At most {26 ** 3} destinations can be generated (unique three-letter airport codes).")
+    for destination_id, airport_code in zip(range(1, n_destinations + 1), airport_codes()):
+        city, country = rng.choice(CITIES)
+        airport_name = f"{city} {airport_code} {rng.choice(AIRPORT_NAME_SUFFIXES)}"
+        yield (destination_id, airport_code, airport_name, city, country, rng.choice(TERMINALS))
+
+def generate_pilots(rng: random.Random, n_pilots: int):
+    """Yield n_pilots Pilot rows with unique license numbers. Roughly 5% of the pilots are no longer employed."""
+    for pilot_id in range(1, n_pilots + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        middle_name = rng.choice(MIDDLE_INITIALS) if rng.random() < 0.2 else None
+        last_name = rng.choice(LAST_NAMES)
+        employment_start = datetime(2000, 1, 3, 9) + timedelta(days=rng.randrange(25 * 365))
+        is_active = 0 if rng.random() < 0.05 else 1
+        employment_end = format_datetime(employment_start + timedelta(days=rng.randrange(365, 10 * 365), hours=8)) if not is_active else None
+        yield (
+            pilot_id,
+            f"LIC-UK-{pilot_id:08d}",
+            first_name,
+            middle_name,
+            last_name,
+            f"+44 7700 {pilot_id % 1_000_000:06d}",
+            f"{first_name.lower()}.{last_name.lower()}{pilot_id}@example.com",
+            format_datetime(employment_start),
+            employment_end,
+            is_active,
+        )
+
+def generate_flights(rng: random.Random, n_flights: int, n_aircraft: int, n_destinations: int, start_date: datetime, n_days: int, reference_date: datetime):
+    """
+    Yield n_flights Flight rows spread over n_days from start_date.
+    Flights departing before reference_date have mostly ARRIVED, later flights are mostly SCHEDULED.
+    """
+    n_carriers = len(CARRIER_CODES)
+    minutes_in_window = n_days * 24 * 60
+    reference_minute = int((reference_date - start_date).total_seconds() // 60)
+    # The flight times are stored as INTEGER minutes, so they are generated as offsets from start_date without any formatting.
+    start_minute = to_epoch_minutes(start_date)
+
+    for flight_id in range(1, n_flights + 1):
+        # Unique flight number: the carrier code cycles, the number increases once per cycle.
+        flight_number = f"{CARRIER_CODES[(flight_id - 1) % n_carriers]}{1000 + (flight_id - 1) // n_carriers}"
+
+        departure_airport_id = rng.randrange(1, n_destinations + 1)
+        destination_airport_id = rng.randrange(1, n_destinations)
+        if destination_airport_id >= departure_airport_id:
+            destination_airport_id += 1  # Never fly to the departure airport.
+
+        # Times are counted in minutes from start_date.
+        departure_minute = rng.randrange(0, minutes_in_window, 5)
+        arrival_minute = departure_minute + rng.randrange(45, 16 * 60, 5)
+
+        p = rng.random()
+        if departure_minute < reference_minute:
+            flight_status = "ARRIVED" if p < 0.97 else "CANCELLED"
+        else:
+            flight_status = "SCHEDULED" if p < 0.9 else "DELAYED" if p < 0.98 else "CANCELLED"
+
+        yield (
+            flight_id,
+            flight_number,
+            rng.randrange(1, n_aircraft + 1),
+            departure_airport_id,
+            destination_airport_id,
+            start_minute + departure_minute,
+            start_minute + arrival_minute,
+            flight_status,
+        )
+
+def generate_flight_pilots(rng: random.Random, n_flights: int, n_pilots: int, pilots_per_flight: int, unassigned_share: float):
+    """Yield Flight_Pilot rows: pilots_per_flight distinct pilots per flight, except for a share of flights left unassigned."""
+    pilots_per_flight = min(pilots_per_flight, n_pilots)
+    for flight_id in range(1, n_flights + 1):
+        if rng.random() < unassigned_share:
+            continue
+        for pilot_id in rng.sample(range(1, n_pilots + 1), pilots_per_flight):
+            yield (flight_id, pilot_id)
+
+# ==============================================================
+# Bulk loading
+# ==============================================================
+def bulk_load(conn: sqlite3.Connection, rows_by_table: dict, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Stream the rows of each table into the database with batched executemany() calls inside a single transaction.
+    Secondary indices and triggers on the loaded tables are dropped before the load and re-created afterwards
+    (the summary tables and search indices maintained by the triggers are rebuilt once at the end instead of being updated row by row),
+    and the pragma settings are tuned for bulk ingest for the duration of the load.
+    Returns the number of rows inserted into each table.
+    """
+    tables = list(rows_by_table)
+    placeholders = ", ".join("?" for _ in tables)
+    deferred_indices = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders});",
+        tables,
+    ).fetchall()
+    deferred_triggers = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({placeholders});",
+        tables,
+    ).fetchall()
+
+    previous_pragmas = {name: conn.execute(f"PRAGMA {name};").fetchone()[0] for name in BULK_LOAD_PRAGMAS}
+    for name, value in BULK_LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+
+    inserted_rows = dict.fromkeys(tables, 0)
+    try:
+        conn.execute("BEGIN;")
+        for index_name, _ in deferred_indices:
+            conn.execute(f"DROP INDEX {index_name};")
+        for trigger_name, _ in deferred_triggers:
+            conn.execute(f"DROP TRIGGER {trigger_name};")
+
+        for table, rows in rows_by_table.items():
+            for batch in batched(rows, batch_size):
+                conn.executemany(INSERT_SQL[table], batch)
+                inserted_rows[table] += len(batch)
+
+        for _, index_sql in deferred_indices:
+            conn.execute(index_sql)
+        for _, trigger_sql in deferred_triggers:
+            conn.execute(trigger_sql)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in previous_pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+
+    rebuild_summary_tables(conn)
+    rebuild_search_index(conn)
+
+    # Refresh the statistics used by the query planner (sampled, so it stays fast on large tables).
+    conn.execute("PRAGMA analysis_limit = 1000;")
+    conn.execute("ANALYZE;")
+    return inserted_rows
+
+def seed_database(
+    conn: sqlite3.Connection,
+    n_flights: int,
+    n_pilots: int,
+    n_aircraft: int,
+    n_destinations: int,
+    pilots_per_flight: int = 2,
+    unassigned_share: float = 0.05,
+    n_days: int = 365,
+    start_date: datetime = datetime(2026, 1, 1),
+    reference_date: datetime = datetime(2026, 3, 1),
+    seed: int = 42,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """
+    Populate an empty database with synthetic data at the requested scale.
+    The function does nothing (and returns an empty dictionary) if the database already contains data.
+    """
+    if database_is_populated(conn):
+        return {}
+
+    rng = random.Random(seed)
+    rows_by_table = {
+        "Aircraft": generate_aircraft(rng, n_aircraft),
+        "Destination": generate_destinations(rng, n_destinations),
+        "Pilot": generate_pilots(rng, n_pilots),
+        "Flight": generate_flights(rng, n_flights, n_aircraft, n_destinations, start_date, n_days, reference_date),
+        "Flight_Pilot": generate_flight_pilots(rng, n_flights, n_pilots, pilots_per_flight, unassigned_share),
+    }
+    return bulk_load(conn, rows_by_table, batch_size)
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main() -> None:
+    """Create the Flight Management database (if needed) and populate it with synthetic data at the requested scale."""
+    from main import DB_PATH, connect_db, initialise_db
+
+    parser = argparse.ArgumentParser(description="Populate the Flight Management database with synthetic data.")
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to the SQLite database file.")
+    parser.add_argument("--flights", type=int, default=100_000, help="Number of flights to generate.")
+    parser.add_argument("--pilots", type=int, default=2_000, help="Number of pilots to generate.")
+    parser.add_argument("--aircraft", type=int, default=500, help="Number of aircraft to generate.")
+    parser.add_argument("--destinations", type=int, default=300, help="Number of destinations to generate.")
+    parser.add_argument("--pilots-per-flight", type=int, default=2, help="Number of pilots assigned to each flight.")
+    parser.add_argument("--days", type=int, default=365, help="Number of days the flights are spread over, starting 2026-01-01.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the random number generator.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Number of rows per executemany() call.")
+    args = parser.parse_args()
+
+    conn = connect_db(args.db)
+    initialise_db(conn)
+
+    start = time.perf_counter()
+    inserted_rows = seed_database(
+        conn,
+        n_flights=args.flights,
+        n_pilots=args.pilots,
+        n_aircraft=args.aircraft,
+        n_destinations=args.destinations,
+        pilots_per_flight=args.pilots_per_flight,
+        n_days=args.days,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    elapsed = time.perf_counter() - start
+    conn.close()
+
+    if not inserted_rows:
+        print("The database already contains data. Nothing was inserted.")
+        return
+
+    total_rows = sum(inserted_rows.values())
+    for table, n_rows in inserted_rows.items():
+        print(f"Inserted {n_rows:,} rows into {table} table.")
+    print(f"\nInserted {total_rows:,} rows in {elapsed:.1f} s ({total_rows / elapsed:,.0f} rows/s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import asyncio
+import json
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import main
+from main import (DB_PATH, FLIGHT_INFORMATION_HEADERS, FLIGHT_SEARCH_PAGE_SIZE, FLIGHTS_PER_DESTINATION_HEADERS, FLIGHTS_PER_PILOT_HEADERS,
+                  MIN_REST_MINUTES, PILOT_SCHEDULE_HEADERS, ConnectionManager, connect_db)
+from flight_times import to_epoch_minutes
+from route_graph import ITINERARY_HEADERS, MAX_HOPS, MIN_CONNECTION_MINUTES, RouteGraph
+
+# ==============================================================
+# Parameters
+# ==============================================================
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+
+# Read connections (one per thread of the read pool). The writes are sent one at a time through a single connection.
+READ_POOL_SIZE = 8
+
+# Requests waiting for (or running on) a connection; beyond these, requests are rejected at once with 503 (backpressure).
+MAX_PENDING_READS = 512
+MAX_PENDING_WRITES = 64
+
+# A request that has not been answered after REQUEST_TIMEOUT seconds gets 504 and its running query is interrupted.
+# A client connection that sends no complete request for IDLE_TIMEOUT seconds is closed.
+REQUEST_TIMEOUT = 5.0
+IDLE_TIMEOUT = 30.0
+
+MAX_REQUEST_BODY_BYTES = 64 * 1024
+MAX_FLIGHT_PAGE_SIZE = 1000
+
+# ==============================================================
+# Errors
+# ==============================================================
+class ServiceError(Exception):
+    """An error answered to the client with an HTTP status and a JSON message."""
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# ==============================================================
+# Connection pools
+# ==============================================================
+class ReadJob:
+    """
+    A read running on a thread of the read pool. The timeout of the request interrupts the job's connection only while the job
+    is running on it, so that the interrupt cannot hit the next job of the same thread.
+    """
+    def __init__(self):
+        self.conn = None
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def interrupt(self) -> None:
+        with self.lock:
+            if self.conn is not None and not self.finished:
+                self.conn.interrupt()
+
+class DatabasePools:
+    """
+    A bounded pool of threads that each own a read-only connection, and a single writer thread that owns the read-write
+    connection, so that the writes never wait for each other's locks (SQLite allows one writer at a time anyway).
+    The number of pending reads and writes is bounded: beyond it, ServiceError 503 is raised instead of queueing.
+    """
+    def __init__(self, db_path: Path, read_pool_size: int = READ_POOL_SIZE, max_pending_reads: int = MAX_PENDING_READS,
+                 max_pending_writes: int = MAX_PENDING_WRITES, request_timeout: float = REQUEST_TIMEOUT, profile: str = main.DEFAULT_CONNECTION_PROFILE):
+        self.db_path = db_path
+        self.profile = profile
+        self.max_pending_reads = max_pending_reads
+        self.max_pending_writes = max_pending_writes
+        self.request_timeout = request_timeout
+        self.pending_reads = 0
+        self.pending_writes = 0
+        self.rejected_requests = 0
+        self.timed_out_requests = 0
+
+        self.read_pool_size = read_pool_size
+        self._local = threading.local()
+        self._writer_db = None
+        self._read_executor = ThreadPoolExecutor(read_pool_size, thread_name_prefix="read", initializer=self._open_read_connection)
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="write", initializer=self._open_writer)
+        # Start every thread (and open every connection) now rather than on the first requests.
+        self._run_on_every_read_thread(lambda: None)
+        self._write_executor.submit(lambda: None).result()
+
+    def _open_read_connection(self) -> None:
+        self._local.conn = connect_db(self.db_path, read_only=True, profile=self.profile)
+
+    def _run_on_every_read_thread(self, function) -> None:
+        """Run function once on each thread of the read pool: each call waits for the others, so no thread can take two."""
+        barrier = threading.Barrier(self.read_pool_size)
+        def run():
+            function()
+            barrier.wait()
+        for future in [self._read_executor.submit(run) for _ in range(self.read_pool_size)]:
+            future.result()
+
+    def _open_writer(self) -> None:
+        self._writer_db = ConnectionManager(self.db_path, self.profile)
+        self._writer_db.writer
+
+    def _run_read_job(self, job: ReadJob, function, args):
+        with job.lock:
+            job.conn = self._local.conn
+        try:
+            return function(job.conn, *args)
+        finally:
+            with job.lock:
+                job.finished = True
+
+    async def read(self, function, *args):
+        """Run function(read connection, *args) on the read pool and return its result."""
+        if self.pending_reads >= self.max_pending_reads:
+            self.rejected_requests += 1
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending requests. Please, try again later.")
+        job = ReadJob()
+        self.pending_reads += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._read_executor, self._run_read_job, job, function, args)
+            return await asyncio.wait_for(future, self.request_timeout)
+        except asyncio.TimeoutError:
+            job.interrupt()
+            self.timed_out_requests += 1
+            raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT, f"The request took longer than {self.request_timeout:g} s and was interrupted.") from None
+        finally:
+            self.pending_reads -= 1
+
+    async def write(self, function, *args):
+        """
+        Run function(ConnectionManager of the writer, *args) on the writer thread and return its result.
+        A write that times out is not interrupted: it is still applied (or not) as a whole, and the client gets 504.
+        """
+        if self.pending_writes >= self.max_pending_writes:
+            self.rejected_requests += 1
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending writes. Please, try again later.")
+        self.pending_writes += 1
+        future = asyncio.get_running_loop().run_in_executor(self._write_executor, lambda: function(self._writer_db, *args))
+        # A write counts as pending until it has run, even if its request has timed out.
+        future.add_done_callback(self._finish_write)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out_requests += 1
+            raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT, f"The write took longer than {self.request_timeout:g} s; it may still be applied.") from None
+
+    def _finish_write(self, future: asyncio.Future) -> None:
+        self.pending_writes -= 1
+        if not future.cancelled():
+            future.exception() # Retrieved, so that a write whose request has timed out does not log "exception never retrieved".
+
+    def close(self) -> None:
+        """Wait for the running jobs and close every connection, each in the thread that opened it (as sqlite3 requires)."""
+        self._run_on_every_read_thread(lambda: self._local.conn.close())
+        self._read_executor.shutdown(wait=True, cancel_futures=True)
+        if self._writer_db is not None:
+            self._write_executor.submit(self._writer_db.close).result()
+        self._write_executor.shutdown(wait=True, cancel_futures=True)
+
+# ==============================================================
+# Flight operations - run on the connection pools
+# ==============================================================
+def parse_query_value(parse, value: str, name: str):
+    """Parse a query string or JSON value with one of the argument types of main.py; invalid values give 400."""
+    try:
+        return parse(value)
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid {name}: {e}") from None
+
+def resolve_airport_codes(conn: sqlite3.Connection, airport_codes: list) -> list:
+    """Return the DestinationIds of the airport codes; ServiceError 404 if a code is not found."""
+    airport_ids = []
+    for code in airport_codes:
+        airport = main.destination_cache.get(conn, code)
+        if not airport:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Airport Code not found in the database: {code}." + main.format_suggestions(conn, "airport", code))
+        airport_ids.append(airport[1])
+    return airport_ids
+
+def view_flights(conn: sqlite3.Connection, query: dict) -> dict:
+    """GET /flights: one page of the flight search of view_flights_by_criteria(), with the key of the next page."""
+    # departure=<time> selects the flights departing at that exact time, like --departure of the view-flights command.
+    departure_from = query.get("departure") or query.get("departure_from", "")
+    departure_to = query.get("departure") or query.get("departure_to", "")
+    criteria = {
+        "destination_airport_ids": resolve_airport_codes(conn, main.parse_list_argument(query.get("destination", ""))),
+        "departure_airport_ids": resolve_airport_codes(conn, main.parse_list_argument(query.get("from", ""))),
+        "departure_from": parse_query_value(main.parse_datetime_argument, departure_from, "departure_from") if departure_from else "",
+        "departure_to": parse_query_value(main.parse_datetime_argument, departure_to, "departure_to") if departure_to else "",
+        "flight_statuses": parse_query_value(main.parse_flight_statuses_argument, query.get("status", ""), "status"),
+    }
+    if not any(criteria.values()):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "No criteria provided. Please, specify at least one of destination, from, departure, departure_from, departure_to, status.")
+    after = parse_query_value(main.parse_page_key_argument, query["after"], "after") if query.get("after") else None
+    page_size = parse_query_value(int, query.get("page_size", FLIGHT_SEARCH_PAGE_SIZE), "page_size")
+    if not 1 <= page_size <= MAX_FLIGHT_PAGE_SIZE:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid page_size: must be between 1 and {MAX_FLIGHT_PAGE_SIZE}.")
+
+    page = main.search_flights(conn, **criteria, after=after, page_size=page_size)
+    return {
+        "flights": [dict(zip(FLIGHT_INFORMATION_HEADERS, flight[:-1])) for flight in page],
+        "next_after": f"{page[-1][1]}|{page[-1][-1]}" if len(page) == page_size else None,
+    }
+
+def view_pilot_schedule(conn: sqlite3.Connection, license_number: str) -> dict:
+    """GET /pilots/<license number>/schedule: the flights assigned to the pilot."""
+    pilot_information = main.pilot_cache.get(conn, license_number)
+    if not pilot_information:
+        raise ServiceError(HTTPStatus.NOT_FOUND, "License Number not found." + main.format_suggestions(conn, "pilot", license_number))
+    return {"schedule": [dict(zip(PILOT_SCHEDULE_HEADERS, row)) for row in main.get_pilot_schedule(conn, pilot_information[4])]}
+
+def view_summary(conn: sqlite3.Connection) -> dict:
+    """GET /summary: the queries of additional_summary_queries()."""
+    return {
+        "flights_per_destination": [dict(zip(FLIGHTS_PER_DESTINATION_HEADERS, row)) for row in main.get_flights_per_destination(conn)],
+        "flights_per_pilot": [dict(zip(FLIGHTS_PER_PILOT_HEADERS, row)) for row in main.get_flights_per_pilot(conn)],
+    }
+
+def view_itinerary(conn: sqlite3.Connection, graph: RouteGraph, query: dict) -> dict:
+    """GET /itinerary: the fastest itinerary between two airports (from, to, after, optional min_connection in minutes)."""
+    if not (query.get("from") and query.get("to") and query.get("after")):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Missing parameter: from, to and after are required.")
+    origin_id, destination_id = resolve_airport_codes(conn, [query["from"], query["to"]])
+    departure_after = parse_query_value(main.parse_datetime_argument, query["after"], "after")
+    min_connection_minutes = parse_query_value(int, query.get("min_connection", MIN_CONNECTION_MINUTES), "min_connection")
+    graph.refresh(conn)
+    legs = graph.earliest_arrival(origin_id, destination_id, to_epoch_minutes(departure_after), min_connection_minutes)
+    return {"itinerary": [dict(zip(ITINERARY_HEADERS, leg)) for leg in graph.describe_itinerary(conn, legs)]}
+
+def view_reachable_airports(conn: sqlite3.Connection, graph: RouteGraph, query: dict) -> dict:
+    """GET /reachable: the airports reachable from an airport (from) with at most hops flights."""
+    if not query.get("from"):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Missing parameter: from.")
+    origin_id, = resolve_airport_codes(conn, [query["from"]])
+    max_hops = parse_query_value(int, query.get("hops", 2), "hops")
+    if not 1 <= max_hops <= MAX_HOPS:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid hops: must be between 1 and {MAX_HOPS}.")
+    graph.refresh(conn)
+    hops = graph.reachable_airports(origin_id, max_hops)
+    return {"airports": [{"Airport Code": graph.airport_codes.get(airport_id), "Hops": n_hops}
+                         for airport_id, n_hops in sorted(hops.items(), key=lambda item: item[1])]}
+
+def get_required_fields(body: dict, names: list) -> list:
+    """Return the values of the required fields of a JSON body; ServiceError 400 if one is missing or not a string."""
+    values = []
+    for name in names:
+        value = body.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Missing field: {name} (a non-empty string).")
+        values.append(value.strip())
+    return values
+
+def add_flight(db: ConnectionManager, body: dict) -> dict:
+    """POST /flights: add a new flight, checked like add_new_flight(). The look-ups run on the writer, in write order."""
+    flight_number, aircraft, departure_airport, destination_airport, departure, arrival = get_required_fields(
+        body, ["number", "aircraft", "from", "to", "departure", "arrival"])
+    if main.flight_cache.get(db.writer, flight_number):
+        raise ServiceError(HTTPStatus.CONFLICT, "Flight number already exists in the database.")
+    try:
+        flight = main.validate_new_flight(db.writer, aircraft, departure_airport, destination_airport, departure, arrival, str(body.get("status", "SCHEDULED")))
+        main.create_flight(db, flight_number, *flight)
+    except ValueError as e:
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e)) from None
+    except sqlite3.IntegrityError as e:
+        raise ServiceError(HTTPStatus.CONFLICT, f"Flight not added: {e}") from None
+    flight_number, departure_time, flight_status, _ = main.get_flight_information(db.writer, flight_number)
+    return {"Flight Number": flight_number, "Departure Time": departure_time, "Flight Status": flight_status}
+
+def assign_pilot(db: ConnectionManager, body: dict) -> dict:
+    """POST /assignments: assign a pilot to a flight, checked like assign_pilot_to_flight()."""
+    license_number, flight_number = get_required_fields(body, ["license", "flight"])
+    min_rest_minutes = body.get("min_rest", MIN_REST_MINUTES)
+    if not isinstance(min_rest_minutes, int) or min_rest_minutes < 0:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid min_rest: must be a non-negative integer (minutes).")
+
+    pilot_information = main.pilot_cache.get(db.writer, license_number)
+    if not pilot_information:
+        raise ServiceError(HTTPStatus.NOT_FOUND, "License Number not found." + main.format_suggestions(db.writer, "pilot", license_number))
+    if not pilot_information[3]: # IsActive column
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, "Pilot does not have an active employment status.")
+    flight_information = main.flight_cache.get(db.writer, flight_number)
+    if not flight_information:
+        raise ServiceError(HTTPStatus.NOT_FOUND, "Flight not found.")
+    try:
+        main.assign_pilot(db, flight_information[1], pilot_information[4], min_rest_minutes)
+    except ValueError as e:
+        raise ServiceError(HTTPStatus.CONFLICT, f"Assignment failed (scheduling conflict): {e}") from None
+    except sqlite3.IntegrityError as e:
+        raise ServiceError(HTTPStatus.CONFLICT, f"Assignment failed (maybe duplicate assignment): {e}") from None
+    return {"License Number": pilot_information[0], "Flight Number": flight_information[0]}
+
+# ==============================================================
+# HTTP/JSON server
+# ==============================================================
+class FlightService:
+    """
+    Minimal HTTP/1.1 server (keep-alive, Content-Length bodies, JSON in and out) that routes the requests to the flight
+    operations above. The event loop only parses and answers requests; every SQLite call runs on the connection pools.
+    The route graph is built by the first itinerary or reachability request and then kept up to date from the change log.
+    """
+    def __init__(self, pools: DatabasePools, idle_timeout: float = IDLE_TIMEOUT):
+        self.pools = pools
+        self.idle_timeout = idle_timeout
+        self.n_requests = 0
+        self.route_graph = RouteGraph()
+
+    async def route(self, method: str, path: str, query: dict, body: dict):
+        """Return (HTTP status, JSON-serialisable result) of a request, or raise ServiceError."""
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if method == "GET" and parts == ["health"]:
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "pending_reads": self.pools.pending_reads,
+                "pending_writes": self.pools.pending_writes,
+                "rejected_requests": self.pools.rejected_requests,
+                "timed_out_requests": self.pools.timed_out_requests,
+                "requests": self.n_requests,
+            }
+        if method == "GET" and parts == ["flights"]:
+            return HTTPStatus.OK, await self.pools.read(view_flights, query)
+        if method == "GET" and len(parts) == 3 and parts[0] == "pilots" and parts[2] == "schedule":
+            return HTTPStatus.OK, await self.pools.read(view_pilot_schedule, parts[1])
+        if method == "GET" and parts == ["summary"]:
+            return HTTPStatus.OK, await self.pools.read(view_summary)
+        if method == "GET" and parts == ["itinerary"]:
+            return HTTPStatus.OK, await self.pools.read(view_itinerary, self.route_graph, query)
+        if method == "GET" and parts == ["reachable"]:
+            return HTTPStatus.OK, await self.pools.read(view_reachable_airports, self.route_graph, query)
+        if method == "POST" and parts == ["flights"]:
+            return HTTPStatus.CREATED, await self.pools.write(add_flight, body)
+        if method == "POST" and parts == ["assignments"]:
+            return HTTPStatus.CREATED, await self.pools.write(assign_pilot, body)
+        if parts[0] in ("health", "flights", "pilots", "summary", "assignments", "itinerary", "reachable"):
+            raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED, f"Method {method} not allowed for {path}.")
+        raise ServiceError(HTTPStatus.NOT_FOUND, f"No such resource: {path}.")
+
+    async def read_request(self, reader: asyncio.StreamReader):
+        """Read one request; returns (method, target, headers, body) or None when the client has closed the connection."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise ServiceError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large.") from None
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from None
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        headers[":version"] = version
+
+        body = b""
+        try:
+            content_length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.") from None
+        if content_length < 0:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if content_length > MAX_REQUEST_BODY_BYTES:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body larger than {MAX_REQUEST_BODY_BYTES} bytes.")
+        if content_length:
+            body = await asyncio.wait_for(reader.readexactly(content_length), self.idle_timeout)
+        return method.upper(), target, headers, body
+
+    async def handle_request(self, method: str, target: str, body: bytes):
+        """Parse the target and the JSON body, and route the request; returns (HTTP status, result)."""
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        data = {}
+        if method == "POST":
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "The request body is not valid JSON.") from None
+            if not isinstance(data, dict):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "The request body must be a JSON object.")
+        return await self.route(method, url.path, query, data)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of a client connection, one after the other, until it is closed or idle."""
+        try:
+            while True:
+                keep_alive = False # Until a complete request has been read: the stream cannot be resynchronised after a malformed one.
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close" and headers[":version"] == "HTTP/1.1"
+                    self.n_requests += 1
+                    status, result = await self.handle_request(method, target, body)
+                except ServiceError as e:
+                    status, result = e.status, {"error": e.message}
+                except asyncio.TimeoutError:
+                    break
+                except Exception as e: # An unexpected error answers 500 but keeps the service running.
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+                    keep_alive = False
+
+                payload = json.dumps(result).encode("utf-8")
+                response_headers = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}",
+                    "Connection: " + ("keep-alive" if keep_alive else "close"),
+                ]
+                if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                    response_headers.append("Retry-After: 1")
+                writer.write(("\r\n".join(response_headers) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(db_path: Path, host: str = SERVICE_HOST, port: int = SERVICE_PORT, read_pool_size: int = READ_POOL_SIZE,
+                request_timeout: float = REQUEST_TIMEOUT, ready: asyncio.Event = None) -> None:
+    """Run the service until it is cancelled (Ctrl+C). The database is created and initialised first if needed, like for a command."""
+    main.open_database(db_path).close()
+    pools = DatabasePools(db_path, read_pool_size, request_timeout=request_timeout)
+    service = FlightService(pools)
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_REQUEST_BODY_BYTES)
+    print(f"Flight service listening on http://{host}:{port} ({read_pool_size} read connections, 1 writer).", file=sys.stderr)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pools.close()
+
+# ==============================================================
+# Local client - load test
+# ==============================================================
+async def send_requests(host: str, port: int, paths: list, n_requests: int, latencies: list, statuses: dict) -> None:
+    """Send n_requests GET requests (cycling over paths) on one keep-alive connection, recording latency and status."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n_requests):
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            status_line, *header_lines = head.decode("latin-1").split("\r\n")
+            content_length = next(int(line.split(":", 1)[1]) for line in header_lines if line.lower().startswith("content-length:"))
+            await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start)
+            status = int(status_line.split(" ")[1])
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def load_test(host: str, port: int, paths: list, n_requests: int, concurrency: int) -> dict:
+    """Send n_requests GET requests from concurrency connections; returns the throughput, latency percentiles and statuses."""
+    latencies = []
+    statuses = {}
+    requests_per_connection = [n_requests // concurrency + (i < n_requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(send_requests(host, port, paths, n, latencies, statuses) for n in requests_per_connection if n))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "statuses": statuses,
+    }
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main_service(argv: list = None) -> None:
+    """Run the service (python service.py serve) or a load test against a running service (python service.py load-test)."""
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service of the flight operations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the service on localhost.")
+    serve_parser.add_argument("--db", type=Path, default=DB_PATH, help="Path to the SQLite database file.")
+    serve_parser.add_argument("--port", type=int, default=SERVICE_PORT, help="TCP port on 127.0.0.1.")
+    serve_parser.add_argument("--read-connections", type=int, default=READ_POOL_SIZE, help="Number of threads (and read-only connections) of the read pool.")
+    serve_parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="Seconds before a request is answered with 504.")
+
+    load_test_parser = commands.add_parser("load-test", help="Send concurrent GET requests to a running service and report the throughput.")
+    load_test_parser.add_argument("paths", nargs="+", help="Request paths, e.g., '/flights?destination=JFK' /summary.")
+    load_test_parser.add_argument("--port", type=int, default=SERVICE_PORT, help="TCP port of the service on 127.0.0.1.")
+    load_test_parser.add_argument("--requests", type=int, default=2000, help="Total number of requests.")
+    load_test_parser.add_argument("--concurrency", type=int, default=100, help="Number of concurrent client connections.")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.db, SERVICE_HOST, args.port, args.read_connections, args.timeout))
+        except KeyboardInterrupt:
+            print("Flight service stopped.", file=sys.stderr)
+    else:
+        print(json.dumps(asyncio.run(load_test(SERVICE_HOST, args.port, args.paths, args.requests, args.concurrency)), indent=2))
+
+if __name__ == "__main__":
+    main_service()
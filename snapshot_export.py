@@ -0,0 +1,408 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+import main
+from change_log import get_change_cursor
+from flight_archive import ARCHIVED_FLIGHT_STATUSES, attach_archive, find_archive_periods, qualify_archive_tables
+from seed_data import batched
+
+# ==============================================================
+# Parameters
+# ==============================================================
+SNAPSHOT_DIR = Path("./snapshots/flights")
+MANIFEST_NAME = "manifest.json"
+
+# Number of flights read per query and written per row group (the memory used by the export is bounded by one row group).
+SNAPSHOT_ROW_GROUP_SIZE = 100_000
+
+# Compression of the column chunks: zlib, or none (the INTEGER columns are then read straight from the memory-mapped file).
+SNAPSHOT_CODECS = ("zlib", "none")
+ZLIB_LEVEL = 6
+
+# A part file starts with PART_MAGIC and ends with the JSON footer, its length (8 bytes, little-endian) and PART_MAGIC.
+PART_MAGIC = b"FMSCOL01"
+
+# Columns of the snapshot: Flight joined with Aircraft, Destination (departure and destination airports) and the license numbers
+# of the assigned pilots. INTEGER columns are stored as arrays of 64-bit integers, text columns as a dictionary of the distinct
+# values and an array of 32-bit indices into it (most columns repeat a few values, e.g., FlightStatus).
+SNAPSHOT_COLUMNS = (
+    ("FlightId", "int"),
+    ("FlightNumber", "text"),
+    ("AircraftModel", "text"),
+    ("PassengerCapacity", "int"),
+    ("DepartureAirportCode", "text"),
+    ("DestinationAirportCode", "text"),
+    ("DestinationCity", "text"),
+    ("DestinationCountry", "text"),
+    ("DepartureMinute", "int"),
+    ("DestinationArrivalMinute", "int"),
+    ("FlightStatus", "text"),
+    ("PilotLicenseNumbers", "text"),
+)
+
+# One row group of the full export (keyset pages on FlightId), in the order of SNAPSHOT_COLUMNS. The archived flights are read
+# with the same query on each archive (see qualify_archive_tables()).
+SNAPSHOT_ROWS_QUERY = """
+    SELECT
+      f.FlightId,
+      f.FlightNumber,
+      a.Model,
+      a.PassengerCapacity,
+      da.AirportCode,
+      aa.AirportCode,
+      aa.City,
+      aa.Country,
+      f.DepartureMinute,
+      f.DestinationArrivalMinute,
+      f.FlightStatus,
+      (SELECT group_concat(p.LicenseNumber, ',')
+       FROM Flight_Pilot AS fp
+       JOIN Pilot AS p
+           ON p.PilotId = fp.PilotId
+       WHERE fp.FlightId = f.FlightId) AS PilotLicenseNumbers
+    FROM Flight AS f
+    JOIN Aircraft AS a
+        ON a.AircraftId = f.AircraftId
+    JOIN Destination AS da
+        ON da.DestinationId = f.DepartureAirportId
+    JOIN Destination AS aa
+        ON aa.DestinationId = f.DestinationAirportId
+    WHERE f.FlightId > ?
+    ORDER BY f.FlightId
+    LIMIT ?;
+"""
+
+# The same columns for the flights of a JSON array of FlightIds (the flights changed since the last snapshot).
+CHANGED_SNAPSHOT_ROWS_QUERY = """
+    SELECT
+      f.FlightId,
+      f.FlightNumber,
+      a.Model,
+      a.PassengerCapacity,
+      da.AirportCode,
+      aa.AirportCode,
+      aa.City,
+      aa.Country,
+      f.DepartureMinute,
+      f.DestinationArrivalMinute,
+      f.FlightStatus,
+      (SELECT group_concat(p.LicenseNumber, ',')
+       FROM Flight_Pilot AS fp
+       JOIN Pilot AS p
+           ON p.PilotId = fp.PilotId
+       WHERE fp.FlightId = f.FlightId) AS PilotLicenseNumbers
+    FROM Flight AS f
+    JOIN Aircraft AS a
+        ON a.AircraftId = f.AircraftId
+    JOIN Destination AS da
+        ON da.DestinationId = f.DepartureAirportId
+    JOIN Destination AS aa
+        ON aa.DestinationId = f.DestinationAirportId
+    WHERE f.FlightId IN (SELECT value FROM json_each(?))
+    ORDER BY f.FlightId;
+"""
+
+# FlightIds of the flights (and pilot assignments) changed after a ChangeSeq, read from the change log.
+CHANGED_FLIGHT_IDS_QUERY = """
+    SELECT DISTINCT json_extract(RowKey, '$.FlightId')
+    FROM ChangeLog
+    WHERE ChangeSeq > ? AND ChangeSeq <= ? AND TableName IN ('Flight', 'Flight_Pilot');
+"""
+
+# ==============================================================
+# Write the part files
+# ==============================================================
+def encode_column(values: list, column_type: str) -> bytes:
+    """Encode the values of one column of a row group (see SNAPSHOT_COLUMNS), little-endian."""
+    if column_type == "int":
+        encoded = array("q", values)
+    else:
+        dictionary = {}
+        encoded = array("i", (dictionary.setdefault(value, len(dictionary)) for value in values))
+    if sys.byteorder == "big":
+        encoded.byteswap()
+    if column_type == "int":
+        return encoded.tobytes()
+    dictionary_json = json.dumps(list(dictionary)).encode("utf-8")
+    return struct.pack("<I", len(dictionary_json)) + dictionary_json + encoded.tobytes()
+
+def write_part(path: Path, row_groups, codec: str, deleted_flight_ids: list = ()) -> int:
+    """
+    Write the row groups (lists of rows in the order of SNAPSHOT_COLUMNS) to a part file, one row group in memory at a time.
+    Every column chunk is compressed on its own, so that a reader only decompresses the columns it reads.
+    deleted_flight_ids is only read once the row groups are written (iter_changed_row_groups() fills it while it yields them).
+    The file is written under a temporary name and renamed once complete. Returns the number of rows written.
+    """
+    temporary_path = path.with_name(path.name + ".tmp")
+    footer = {"columns": SNAPSHOT_COLUMNS, "codec": codec, "row_groups": []}
+    n_rows = 0
+    with open(temporary_path, "wb") as file:
+        file.write(PART_MAGIC)
+        for rows in row_groups:
+            row_group = {"rows": len(rows), "columns": {}}
+            for (name, column_type), values in zip(SNAPSHOT_COLUMNS, zip(*rows)):
+                chunk = encode_column(values, column_type)
+                if codec == "zlib":
+                    chunk = zlib.compress(chunk, ZLIB_LEVEL)
+                elif column_type == "int":
+                    # Align the INTEGER arrays on 8 bytes, so that they can be cast to 64-bit integers in place.
+                    file.write(b"\0" * (-file.tell() % 8))
+                row_group["columns"][name] = [file.tell(), len(chunk)]
+                file.write(chunk)
+            footer["row_groups"].append(row_group)
+            n_rows += len(rows)
+        footer["deleted_flight_ids"] = list(deleted_flight_ids)
+        footer_json = json.dumps(footer).encode("utf-8")
+        file.write(footer_json + struct.pack("<Q", len(footer_json)) + PART_MAGIC)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+    return n_rows
+
+def read_manifest(snapshot_dir: Path) -> dict:
+    """Return the manifest of the snapshot, or None if the directory has no snapshot."""
+    manifest_path = snapshot_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+def write_manifest(snapshot_dir: Path, manifest: dict) -> None:
+    """Replace the manifest atomically: a reader sees either the previous parts or the new ones."""
+    temporary_path = snapshot_dir / (MANIFEST_NAME + ".tmp")
+    temporary_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(temporary_path, snapshot_dir / MANIFEST_NAME)
+
+# ==============================================================
+# Export the snapshots
+# ==============================================================
+def iter_snapshot_row_groups(conn: sqlite3.Connection, row_group_size: int, query: str = SNAPSHOT_ROWS_QUERY):
+    """Yield the rows of all flights in row groups of row_group_size, in FlightId order (keyset pages)."""
+    last_flight_id = 0
+    while True:
+        rows = conn.execute(query, (last_flight_id, row_group_size)).fetchall()
+        if rows:
+            yield rows
+        if len(rows) < row_group_size:
+            return
+        last_flight_id = rows[-1][0]
+
+def iter_full_row_groups(conn: sqlite3.Connection, row_group_size: int):
+    """
+    Yield the rows of the flights of the Flight table, then those of each archived month, in row groups (the months are read
+    at the start of the read transaction). SQLite does not attach a database inside a transaction, so the read transaction
+    ends once the Flight table is read and the archives are read afterwards. A flight archived in the meantime is then in
+    both: the FlightIds of the flights that could be archived are kept, and their archived rows are left out.
+    """
+    periods = find_archive_periods(conn)
+    archivable_flight_ids = set()
+    for rows in iter_snapshot_row_groups(conn, row_group_size):
+        archivable_flight_ids.update(row[0] for row in rows if row[10] in ARCHIVED_FLIGHT_STATUSES)
+        yield rows
+    conn.rollback()
+
+    for period in periods:
+        archive_query = qualify_archive_tables(SNAPSHOT_ROWS_QUERY, attach_archive(conn, period))
+        for rows in iter_snapshot_row_groups(conn, row_group_size, archive_query):
+            rows = [row for row in rows if row[0] not in archivable_flight_ids]
+            if rows:
+                yield rows
+
+def iter_changed_row_groups(conn: sqlite3.Connection, flight_ids: list, row_group_size: int, deleted_flight_ids: list):
+    """Yield the rows of the changed flights in row groups; the FlightIds no longer found are appended to deleted_flight_ids."""
+    for batch in batched(flight_ids, row_group_size):
+        rows = conn.execute(CHANGED_SNAPSHOT_ROWS_QUERY, (json.dumps(batch),)).fetchall()
+        found_flight_ids = {row[0] for row in rows}
+        deleted_flight_ids.extend(flight_id for flight_id in batch if flight_id not in found_flight_ids)
+        if rows:
+            yield rows
+
+def export_snapshot(db_path: Path, snapshot_dir: Path, incremental: bool = False, codec: str = "zlib",
+                    row_group_size: int = SNAPSHOT_ROW_GROUP_SIZE) -> dict:
+    """
+    Export the flights to a columnar snapshot: a directory with a manifest and one or more part files.
+    The flights are read on a read-only connection in one read transaction, so the export sees one consistent state of the
+    database without blocking its writers (WAL mode). The ChangeSeq of the change log at that state is kept in the manifest.
+    - A full export writes all flights, including the archived flights (see iter_full_row_groups()), to a new part file and
+      replaces the previous parts.
+    - An incremental export appends a part file with the current rows of the flights changed since the last export (changes
+      to Flight and Flight_Pilot recorded in the change log) and the FlightIds of the deleted flights. A row of a later part
+      replaces the row of the same flight in the earlier parts.
+    Raises ValueError if an incremental export has no previous snapshot, or the changes since it have been removed by the
+    retention policy of the change log (a full export is needed).
+    Returns the number of rows written, the number of deleted flights and the new cursor.
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(snapshot_dir)
+    if incremental and not manifest:
+        raise ValueError(f"No snapshot found in {snapshot_dir}. Please, run a full export first.")
+
+    conn = main.connect_db(db_path, read_only=True)
+    try:
+        conn.execute("BEGIN;")
+        cursor = get_change_cursor(conn)
+        deleted_flight_ids = []
+        if incremental:
+            purged_through = conn.execute("SELECT PurgedThroughSeq FROM ChangeLogState WHERE StateId = 1;").fetchone()[0]
+            if manifest["change_cursor"] < purged_through:
+                raise ValueError(f"The changes up to {purged_through} have been removed from the change log. Please, run a full export.")
+            flight_ids = sorted(flight_id for (flight_id,) in conn.execute(CHANGED_FLIGHT_IDS_QUERY, (manifest["change_cursor"], cursor)))
+            row_groups = iter_changed_row_groups(conn, flight_ids, row_group_size, deleted_flight_ids)
+            part_number = len(manifest["parts"]) + 1
+        else:
+            row_groups = iter_full_row_groups(conn, row_group_size)
+            part_number = 1
+
+        part_name = f"part-{part_number:05d}-{cursor}.fmscol"
+        n_rows = write_part(snapshot_dir / part_name, row_groups, codec, deleted_flight_ids)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    old_parts = [] if incremental or not manifest else manifest["parts"]
+    parts = (manifest["parts"] if incremental else []) + [{"name": part_name, "rows": n_rows, "deleted": len(deleted_flight_ids), "change_cursor": cursor}]
+    write_manifest(snapshot_dir, {"columns": SNAPSHOT_COLUMNS, "change_cursor": cursor, "parts": parts})
+    for part in old_parts:
+        if part["name"] != part_name:
+            (snapshot_dir / part["name"]).unlink(missing_ok=True)
+    return {"rows": n_rows, "deleted": len(deleted_flight_ids), "change_cursor": cursor, "part": part_name}
+
+# ==============================================================
+# Read the snapshots
+# ==============================================================
+class SnapshotPart:
+    """
+    A memory-mapped part file. Only the chunks of the requested columns are read (and decompressed); with the codec none,
+    the INTEGER columns are memoryviews of the mapped file, so they must be released before the part is closed.
+    """
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_length = struct.unpack("<Q", self._mmap[-16:-8])[0]
+        if self._mmap[:8] != PART_MAGIC or self._mmap[-8:] != PART_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a snapshot part file.")
+        footer = json.loads(self._mmap[-16 - footer_length:-16])
+        self.column_types = dict(footer["columns"])
+        self.codec = footer["codec"]
+        self.row_groups = footer["row_groups"]
+        self.deleted_flight_ids = footer["deleted_flight_ids"]
+
+    def read_column(self, row_group: dict, name: str):
+        """Return the values of one column of a row group (a sequence of int or str / None)."""
+        offset, length = row_group["columns"][name]
+        if self.codec == "zlib":
+            chunk = memoryview(zlib.decompress(self._mmap[offset:offset + length]))
+        else:
+            chunk = memoryview(self._mmap)[offset:offset + length]
+        if self.column_types[name] == "int":
+            if sys.byteorder == "big":
+                values = array("q")
+                values.frombytes(chunk)
+                values.byteswap()
+                return values
+            return chunk.cast("q")
+        dictionary_length = struct.unpack("<I", chunk[:4])[0]
+        dictionary = json.loads(bytes(chunk[4:4 + dictionary_length]))
+        indices = array("i")
+        indices.frombytes(chunk[4 + dictionary_length:])
+        if sys.byteorder == "big":
+            indices.byteswap()
+        return [dictionary[index] for index in indices]
+
+    def read_flight_ids(self) -> set:
+        """Return the FlightIds of the rows and of the deleted flights of the part."""
+        flight_ids = set(self.deleted_flight_ids)
+        for row_group in self.row_groups:
+            flight_ids.update(self.read_column(row_group, "FlightId"))
+        return flight_ids
+
+    def iter_row_groups(self, columns: list):
+        """Yield, for each row group, the list of the requested columns."""
+        for row_group in self.row_groups:
+            yield [self.read_column(row_group, name) for name in columns]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+def iter_snapshot_rows(snapshot_dir: Path, columns: list):
+    """
+    Yield the rows of the latest version of every flight in the snapshot, with only the requested columns, one row group
+    at a time. The rows of a part superseded by a later part (changed or deleted flights) are skipped; only the FlightIds of
+    the later (incremental) parts are held in memory.
+    """
+    manifest = read_manifest(snapshot_dir)
+    if not manifest:
+        raise ValueError(f"No snapshot found in {snapshot_dir}.")
+    unknown_columns = [name for name in columns if name not in dict(manifest["columns"])]
+    if unknown_columns:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown_columns)}. Columns: {', '.join(name for name, _ in manifest['columns'])}.")
+
+    parts = [SnapshotPart(snapshot_dir / part["name"]) for part in manifest["parts"]]
+    try:
+        # FlightIds superseded by each part: those of every later part.
+        superseded_flight_ids = [set() for _ in parts]
+        for index in range(len(parts) - 1, 0, -1):
+            superseded_flight_ids[index - 1] = superseded_flight_ids[index] | parts[index].read_flight_ids()
+
+        for part, superseded in zip(parts, superseded_flight_ids):
+            for row_group in part.iter_row_groups(["FlightId", *columns]):
+                page = [row[1:] for row in zip(*row_group) if row[0] not in superseded]
+                # No memoryview of the mapped file may outlive the page, so that the parts can be closed.
+                del row_group
+                yield page
+    finally:
+        for part in parts:
+            part.close()
+
+# ==============================================================
+# Command-line interface
+# ==============================================================
+def main_snapshot() -> None:
+    """Export the flights to a columnar snapshot, or print columns of a snapshot."""
+    parser = argparse.ArgumentParser(description="Columnar snapshots of the flights for offline analysis.")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export the flights (joined with aircraft, airports and pilots) to a snapshot.")
+    export_parser.add_argument("--db", type=Path, default=main.DB_PATH, help="Path to the SQLite database file.")
+    export_parser.add_argument("--output", type=Path, default=SNAPSHOT_DIR, help="Directory of the snapshot.")
+    export_parser.add_argument("--incremental", action="store_true", help="Only append the flights changed since the last export.")
+    export_parser.add_argument("--codec", choices=SNAPSHOT_CODECS, default="zlib", help="Compression of the column chunks.")
+    export_parser.add_argument("--row-group-size", type=int, default=SNAPSHOT_ROW_GROUP_SIZE, help="Number of flights per row group.")
+
+    read_parser = commands.add_parser("read", help="Print columns of the latest version of every flight of a snapshot.")
+    read_parser.add_argument("snapshot", type=Path, nargs="?", default=SNAPSHOT_DIR, help="Directory of the snapshot.")
+    read_parser.add_argument("--columns", type=main.parse_list_argument, default=[name for name, _ in SNAPSHOT_COLUMNS],
+                             help="Columns to read (comma-separated). Default: all.")
+    read_parser.add_argument("--format", choices=main.OUTPUT_FORMATS, default="csv", help="Output format of the results.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if not args.db.exists():
+            sys.exit(f"Error. Database {args.db} not found.")
+        start = time.perf_counter()
+        try:
+            statistics = export_snapshot(args.db, args.output, args.incremental, args.codec, args.row_group_size)
+        except ValueError as e:
+            sys.exit(f"Error. {e}")
+        print(f"Exported {statistics['rows']:,} flight(s) and {statistics['deleted']:,} deleted flight(s) to {args.output / statistics['part']} "
+              f"in {time.perf_counter() - start:.2f} s. Change cursor: {statistics['change_cursor']}.")
+    else:
+        try:
+            main.print_row_pages(iter_snapshot_rows(args.snapshot, args.columns), args.columns, args.format)
+        except ValueError as e:
+            sys.exit(f"Error. {e}")
+
+if __name__ == "__main__":
+    main_snapshot()
@@ -0,0 +1,91 @@
+# ==============================================================
+# Import libraries
+# ==============================================================
+import sqlite3
+
+# ==============================================================
+# Parameters
+# ==============================================================
+# For each summary table: the query that computes its rows from the raw data (key, FlightCount). The flights moved to the
+# archives (see flight_archive.py) still count, through their counts per archived month.
+SUMMARY_TABLE_QUERIES = {
+    "DestinationFlightSummary": """
+        SELECT DestinationId, SUM(FlightCount)
+        FROM (
+            SELECT DestinationAirportId AS DestinationId, COUNT(*) AS FlightCount FROM Flight GROUP BY DestinationAirportId
+            UNION ALL
+            SELECT DestinationId, FlightCount FROM ArchivedDestinationFlightCount
+        )
+        GROUP BY DestinationId;
+    """,
+    "PilotFlightSummary": """
+        SELECT PilotId, SUM(FlightCount)
+        FROM (
+            SELECT PilotId, COUNT(*) AS FlightCount FROM Flight_Pilot GROUP BY PilotId
+            UNION ALL
+            SELECT PilotId, FlightCount FROM ArchivedPilotFlightCount
+        )
+        GROUP BY PilotId;
+    """,
+}
+
+SUMMARY_TABLE_KEYS = {
+    "DestinationFlightSummary": "DestinationId",
+    "PilotFlightSummary": "PilotId",
+}
+
+# The rows of PilotAssignmentInterval computed from the raw data, and the stored rows (same column order).
+PILOT_ASSIGNMENT_INTERVAL_QUERY = """
+    SELECT fp.FlightId, fp.PilotId, f.DepartureMinute, f.DestinationArrivalMinute, f.FlightStatus
+    FROM Flight_Pilot AS fp
+    JOIN Flight AS f
+        ON f.FlightId = fp.FlightId
+"""
+STORED_PILOT_ASSIGNMENT_INTERVAL_QUERY = """
+    SELECT FlightId, PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus
+    FROM PilotAssignmentInterval
+"""
+
+# ==============================================================
+# Maintain the summary tables
+# ==============================================================
+def rebuild_summary_tables(conn: sqlite3.Connection) -> None:
+    """Recompute the summary tables and the pilot assignment intervals from the Flight and Flight_Pilot tables in one transaction."""
+    with conn:
+        for table, query in SUMMARY_TABLE_QUERIES.items():
+            conn.execute(f"DELETE FROM {table};")
+            conn.execute(f"INSERT INTO {table}({SUMMARY_TABLE_KEYS[table]}, FlightCount) {query}")
+        conn.execute("DELETE FROM PilotAssignmentInterval;")
+        conn.execute(f"INSERT INTO PilotAssignmentInterval(FlightId, PilotId, DepartureMinute, DestinationArrivalMinute, FlightStatus) {PILOT_ASSIGNMENT_INTERVAL_QUERY};")
+
+def verify_summary_tables(conn: sqlite3.Connection) -> dict:
+    """
+    Compare the summary tables with the counts computed from the raw data.
+    Returns, for each table, the list of (key, stored count, actual count) that differ (empty lists if the tables are correct).
+    """
+    mismatches = {}
+    for table, query in SUMMARY_TABLE_QUERIES.items():
+        actual_counts = dict(conn.execute(query))
+        stored_counts = {key: count for key, count in conn.execute(f"SELECT {SUMMARY_TABLE_KEYS[table]}, FlightCount FROM {table};") if count}
+        mismatches[table] = [
+            (key, stored_counts.get(key, 0), actual_counts.get(key, 0))
+            for key in sorted(actual_counts.keys() | stored_counts.keys())
+            if stored_counts.get(key, 0) != actual_counts.get(key, 0)
+        ]
+
+    # Pilot assignment intervals: keyed on FlightId/PilotId, with the number of stored and actual rows (0 or 1) that differ.
+    missing_rows = conn.execute(f"{PILOT_ASSIGNMENT_INTERVAL_QUERY} EXCEPT {STORED_PILOT_ASSIGNMENT_INTERVAL_QUERY};").fetchall()
+    stale_rows = conn.execute(f"{STORED_PILOT_ASSIGNMENT_INTERVAL_QUERY} EXCEPT {PILOT_ASSIGNMENT_INTERVAL_QUERY};").fetchall()
+    mismatches["PilotAssignmentInterval"] = sorted(
+        [(f"{flight_id}/{pilot_id}", 0, 1) for flight_id, pilot_id, *_ in missing_rows]
+        + [(f"{flight_id}/{pilot_id}", 1, 0) for flight_id, pilot_id, *_ in stale_rows]
+    )
+    return mismatches
+
+def ensure_summary_tables(conn: sqlite3.Connection) -> None:
+    """Fill the summary tables of a database that already held flights before the summary tables (or intervals) were added."""
+    summaries_are_empty = not any(conn.execute(f"SELECT 1 FROM {table} LIMIT 1;").fetchone() for table in SUMMARY_TABLE_QUERIES)
+    intervals_are_empty = not conn.execute("SELECT 1 FROM PilotAssignmentInterval LIMIT 1;").fetchone()
+    if (summaries_are_empty and conn.execute("SELECT 1 FROM Flight LIMIT 1;").fetchone()) or \
+            (intervals_are_empty and conn.execute("SELECT 1 FROM Flight_Pilot LIMIT 1;").fetchone()):
+        rebuild_summary_tables(conn)